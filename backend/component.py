@@ -1,11 +1,40 @@
 from aws_cdk import (
+    Duration,
     Stack,
+    aws_cloudwatch as cloudwatch,
     aws_dynamodb as dynamodb,
     aws_ecs_patterns as ecs_patterns,
     aws_ecs as ecs,
 )
 from constructs import Construct
 
+# Custom metrics written by the containers in CloudWatch Embedded Metric Format
+# (backend/scaling_metrics.py and flights-mcp's session_metrics.py)
+METRICS_NAMESPACE = "TripPlanner"
+
+BACKEND_WORKERS = 2
+# Scaling targets per task; the backend reports per worker, so they are divided by the worker count
+ACTIVE_STREAMS_PER_TASK = 40
+BEDROCK_QUEUE_DEPTH_PER_TASK = 8
+MCP_SESSION_UTILIZATION = 60
+
+# Recommendation streams can run for several minutes, including silent stretches
+# while a reasoning model thinks
+STREAM_IDLE_TIMEOUT = Duration.minutes(5)
+DEREGISTRATION_DELAY = Duration.minutes(5)
+# Fargate's maximum time between SIGTERM and SIGKILL
+STOP_TIMEOUT = Duration.minutes(2)
+
+
+def scaling_metric(metric_name: str, service: str) -> cloudwatch.Metric:
+    return cloudwatch.Metric(
+        namespace=METRICS_NAMESPACE,
+        metric_name=metric_name,
+        dimensions_map={"Service": service},
+        statistic="Average",
+        period=Duration.minutes(1),
+    )
+
 
 class Backend(Stack):
     def __init__(
@@ -39,6 +68,20 @@ class Backend(Stack):
                 container_port=6000,
             ),
         )
+        flight_mcp_service.target_group.set_attribute(
+            "deregistration_delay.timeout_seconds", str(DEREGISTRATION_DELAY.to_seconds())
+        )
+
+        flight_mcp_scaling = flight_mcp_service.service.auto_scale_task_count(
+            min_capacity=1, max_capacity=6
+        )
+        flight_mcp_scaling.scale_to_track_custom_metric(
+            "McpSessionScaling",
+            metric=scaling_metric("McpSessionUtilization", "flights-mcp"),
+            target_value=MCP_SESSION_UTILIZATION,
+            scale_in_cooldown=Duration.minutes(5),
+            scale_out_cooldown=Duration.minutes(1),
+        )
 
         # Backend API service
         self.backend_service = ecs_patterns.ApplicationLoadBalancedFargateService(
@@ -48,6 +91,7 @@ class Backend(Stack):
             cpu=2048,
             memory_limit_mib=4096,
             desired_count=1,
+            idle_timeout=STREAM_IDLE_TIMEOUT,
             runtime_platform=ecs.RuntimePlatform(
                 cpu_architecture=ecs.CpuArchitecture.ARM64
             ),
@@ -58,9 +102,40 @@ class Backend(Stack):
                     "DYNAMODB_TABLE_NAME": self.trip_table.table_name,
                     "MCP_ENDPOINT": flight_mcp_service.load_balancer.load_balancer_dns_name
                     + ":6000",
+                    "WEB_CONCURRENCY": str(BACKEND_WORKERS),
+                    # Keep-alive must outlast the load balancer's idle timeout
+                    "KEEPALIVE": str(STREAM_IDLE_TIMEOUT.to_seconds() + 15),
+                    "GRACEFUL_TIMEOUT": str(STOP_TIMEOUT.to_seconds() - 10),
                 },
             ),
         )
+        # Let in-flight streams finish on the old task before ECS stops it
+        self.backend_service.target_group.set_attribute(
+            "deregistration_delay.timeout_seconds", str(DEREGISTRATION_DELAY.to_seconds())
+        )
+        backend_task_definition = self.backend_service.task_definition.node.default_child
+        backend_task_definition.add_property_override(
+            "ContainerDefinitions.0.StopTimeout", STOP_TIMEOUT.to_seconds()
+        )
+
+        # LLM streams are long-lived and mostly idle on CPU, so scale on stream concurrency instead
+        backend_scaling = self.backend_service.service.auto_scale_task_count(
+            min_capacity=1, max_capacity=10
+        )
+        backend_scaling.scale_to_track_custom_metric(
+            "ActiveStreamsScaling",
+            metric=scaling_metric("ActiveStreams", "backend"),
+            target_value=ACTIVE_STREAMS_PER_TASK / BACKEND_WORKERS,
+            scale_in_cooldown=Duration.minutes(5),
+            scale_out_cooldown=Duration.minutes(1),
+        )
+        backend_scaling.scale_to_track_custom_metric(
+            "BedrockQueueDepthScaling",
+            metric=scaling_metric("BedrockQueueDepth", "backend"),
+            target_value=BEDROCK_QUEUE_DEPTH_PER_TASK / BACKEND_WORKERS,
+            scale_in_cooldown=Duration.minutes(5),
+            scale_out_cooldown=Duration.minutes(1),
+        )
 
         # Grant DynamoDB permissions to backend
         self.trip_table.grant_read_write_data(
@@ -0,0 +1,84 @@
+import gzip
+import os
+import sys
+from typing import Any, Dict, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # gzip is always available; zstd is faster and smaller when installed
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Short texts are stored as plain strings; compressing them costs more than it saves
+MIN_COMPRESS_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "256"))
+
+
+def compress_text(text: str) -> Union[str, bytes]:
+    """Encode text for storage, compressing it when it is large enough to matter."""
+    data = text.encode("utf-8")
+    if len(data) < MIN_COMPRESS_BYTES:
+        return text
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _is_dynamodb_binary(value: Any) -> bool:
+    # DynamoDB returns binary attributes wrapped in boto3's Binary type. Only the
+    # DynamoDB store imports boto3, so without it loaded there is nothing to unwrap.
+    types = sys.modules.get("boto3.dynamodb.types")
+    return types is not None and isinstance(value, types.Binary)
+
+
+def _raw_bytes(value: Any) -> bytes:
+    return bytes(value.value if _is_dynamodb_binary(value) else value)
+
+
+def decompress_text(value: Any) -> Optional[str]:
+    """Inverse of compress_text; the codec is detected from the frame magic."""
+    if value is None or isinstance(value, str):
+        return value
+    data = _raw_bytes(value)
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed recommendations")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if data.startswith(GZIP_MAGIC):
+        return gzip.decompress(data).decode("utf-8")
+    return data.decode("utf-8")
+
+
+class CompressedText:
+    """Stored text that is only decompressed the first time it is read."""
+
+    __slots__ = ("raw", "_text")
+
+    def __init__(self, raw: Any) -> None:
+        self.raw = _raw_bytes(raw)
+        self._text: Optional[str] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.raw)
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = decompress_text(self.raw) or ""
+        return self._text
+
+    def __repr__(self) -> str:
+        return f"CompressedText({len(self.raw)} bytes)"
+
+
+def wrap_compressed(trip: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace binary attributes of a stored trip with lazily decompressed text."""
+    for name, value in trip.items():
+        if isinstance(value, (bytes, bytearray, memoryview)) or _is_dynamodb_binary(value):
+            trip[name] = CompressedText(value)
+    return trip
+
+
+def expand(trip: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a trip with every lazily compressed attribute decompressed."""
+    return {name: str(value) if isinstance(value, CompressedText) else value for name, value in trip.items()}
@@ -0,0 +1,179 @@
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .telemetry import meter
+
+logger = logging.getLogger(__name__)
+
+worker_bus_messages = meter.create_counter(
+    "trip_planner.worker_bus.messages",
+    description="Messages between worker processes by direction (sent/received/dropped)",
+)
+
+# One datagram per message; trip ids and keys are far smaller than this
+MAX_MESSAGE_BYTES = 8192
+
+
+class WorkerBus:
+    """Broadcasts small messages to the other worker processes of this server.
+
+    Each process binds a Unix datagram socket in a directory shared by the
+    workers and sends to every other socket there. Without a directory (a
+    single process) the bus is disabled and publish() does nothing.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._receiver: Optional[socket.socket] = None
+        self._sender: Optional[socket.socket] = None
+        self._path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "WorkerBus":
+        return cls(os.getenv("WORKER_COORDINATION_DIR") or None)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def subscribe(self, topic: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def start(self) -> None:
+        """Start receiving on the running event loop."""
+        if not self.enabled or self._receiver is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(self.directory, f"{os.getpid()}-{id(self):x}.sock")
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(self._path)
+        receiver.setblocking(False)
+        asyncio.get_running_loop().add_reader(receiver.fileno(), self._receive)
+        self._receiver = receiver
+
+    def close(self) -> None:
+        if self._receiver is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._receiver.fileno())
+        self._receiver.close()
+        self._receiver = None
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+
+    def publish(self, topic: str, **fields: Any) -> None:
+        """Send a message to every other worker. Safe to call from any thread; never blocks."""
+        if not self.enabled:
+            return
+        payload = json.dumps({"topic": topic, **fields}, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            if self._sender is None:
+                self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._sender.setblocking(False)
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                return
+            for name in names:
+                path = os.path.join(self.directory, name)
+                if not name.endswith(".sock") or path == self._path:
+                    continue
+                try:
+                    self._sender.sendto(payload, path)
+                    worker_bus_messages.add(1, {"topic": topic, "direction": "sent"})
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The worker exited without cleaning up
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                except BlockingIOError:
+                    # A worker too busy to drain its socket; cache TTLs bound the staleness
+                    worker_bus_messages.add(1, {"topic": topic, "direction": "dropped"})
+                    logger.warning("Dropped %s message to busy worker %s", topic, name)
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                data = self._receiver.recv(MAX_MESSAGE_BYTES)
+            except BlockingIOError:
+                return
+            try:
+                message = json.loads(data)
+            except ValueError:
+                logger.warning("Ignoring malformed worker bus message")
+                continue
+            worker_bus_messages.add(1, {"topic": message.get("topic", ""), "direction": "received"})
+            for handler in self._handlers.get(message.get("topic"), ()):
+                try:
+                    handler(message)
+                except Exception:
+                    logger.exception("Worker bus handler for %s failed", message.get("topic"))
+
+
+class PeerLocks:
+    """Claims on keys shared by the worker processes, using flock on files in a shared directory."""
+
+    def __init__(
+        self, directory: Optional[str] = None, timeout: float = 120.0, poll_interval: float = 0.1
+    ) -> None:
+        self.directory = directory
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_env(cls) -> "PeerLocks":
+        return cls(
+            os.getenv("WORKER_COORDINATION_DIR") or None,
+            timeout=float(os.getenv("PEER_WAIT_TIMEOUT", "120")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    @asynccontextmanager
+    async def claim(self, key: str) -> AsyncIterator[bool]:
+        """Hold key for the duration of the block.
+
+        Yields whether another worker held it first. In that case the block only
+        starts once that worker let go of it, or after timeout seconds without it.
+        """
+        if not self.enabled:
+            yield False
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        fd = os.open(os.path.join(self.directory, f"{name}.lock"), os.O_CREAT | os.O_RDWR, 0o600)
+        contended = False
+        deadline = time.monotonic() + self.timeout
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    contended = True
+                    if time.monotonic() >= deadline:
+                        logger.warning("Gave up waiting for a peer worker to release %s", key)
+                        break
+                    await asyncio.sleep(self.poll_interval)
+            yield contended
+        finally:
+            # Closing the descriptor releases the lock
+            os.close(fd)
@@ -0,0 +1,267 @@
+import calendar
+import csv
+import datetime
+import os
+import unicodedata
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), "data", "destinations.csv")
+
+# Shares of the total trip budget the prompts plan with
+LODGING_SHARE = 0.50
+FOOD_SHARE = 0.25
+
+# Monthly thresholds above or below which the weather is worth planning around
+HOT_HIGH_C = 30
+COLD_LOW_C = 0
+RAINY_MM = 150
+# Outside the tropics seasons follow the calendar, inside them the rain
+TROPICS_LATITUDE = 23.5
+NORTHERN_SEASONS = ("winter",) * 2 + ("spring",) * 3 + ("summer",) * 3 + ("autumn",) * 3 + ("winter",)
+
+
+def destination_key(name: str) -> str:
+    """Case, accent and whitespace insensitive form of a place name."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+@dataclass(frozen=True)
+class Destination:
+    name: str
+    country: str
+    latitude: float
+    aliases: Tuple[str, ...]
+    # Row in the index's monthly and price arrays
+    row: int
+
+
+@dataclass(frozen=True)
+class Climate:
+    """Climate normals averaged over the days of a trip."""
+
+    months: Tuple[int, ...]
+    high_c: float
+    low_c: float
+    rain_mm: float
+    season: str
+
+    @property
+    def notes(self) -> List[str]:
+        notes = []
+        if self.high_c >= HOT_HIGH_C:
+            notes.append("hot")
+        if self.low_c <= COLD_LOW_C:
+            notes.append("freezing nights")
+        if self.rain_mm >= RAINY_MM:
+            notes.append("rainy")
+        return notes
+
+
+@dataclass(frozen=True)
+class Prices:
+    lodging_budget: int
+    lodging_mid: int
+    food_daily: int
+
+
+class DestinationIndex:
+    """Climate normals and price levels per city, held in flat arrays.
+
+    Monthly values live in one signed-byte or unsigned-short array per measure,
+    twelve entries per city, so the whole index stays a few kilobytes and a
+    lookup is a dict probe plus array reads.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, str]]) -> None:
+        self.destinations: List[Destination] = []
+        self._by_key: Dict[str, Destination] = {}
+        self._high = array("b")
+        self._low = array("b")
+        self._rain = array("H")
+        self._prices = array("H")
+        for row in rows:
+            destination = Destination(
+                name=row["name"],
+                country=row["country"],
+                latitude=float(row["latitude"]),
+                aliases=tuple(alias for alias in row["aliases"].split("|") if alias),
+                row=len(self.destinations),
+            )
+            for column, values in (("high_c", self._high), ("low_c", self._low), ("rain_mm", self._rain)):
+                monthly = [int(value) for value in row[column].split(";")]
+                if len(monthly) != 12:
+                    raise ValueError(f"{destination.name} needs 12 {column} values, not {len(monthly)}")
+                values.extend(monthly)
+            self._prices.extend(int(row[column]) for column in ("lodging_budget", "lodging_mid", "food_daily"))
+            self.destinations.append(destination)
+            for name in (destination.name, *destination.aliases):
+                self._by_key[destination_key(name)] = destination
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "DestinationIndex":
+        with open(path, newline="", encoding="utf-8") as source:
+            return cls(csv.DictReader(line for line in source if not line.startswith("#")))
+
+    def __len__(self) -> int:
+        return len(self.destinations)
+
+    def lookup(self, name: str) -> Optional[Destination]:
+        return self._by_key.get(destination_key(name))
+
+    def prices(self, destination: Destination) -> Prices:
+        offset = destination.row * 3
+        return Prices(*self._prices[offset : offset + 3])
+
+    def climate(self, destination: Destination, from_date: datetime.date, to_date: datetime.date) -> Climate:
+        """Normals weighted by how many of the trip's days fall in each month."""
+        days = _days_per_month(from_date, to_date)
+        total = sum(days.values())
+        offset = destination.row * 12
+
+        def average(values: array) -> float:
+            return sum(values[offset + month - 1] * count for month, count in days.items()) / total
+
+        months = tuple(days)
+        # The season of the month most of the trip falls in
+        main_month = max(days, key=days.get)
+        rain = average(self._rain)
+        if abs(destination.latitude) < TROPICS_LATITUDE:
+            season = "wet season" if self._rain[offset + main_month - 1] >= RAINY_MM else "dry season"
+        else:
+            # Southern hemisphere seasons are six months apart
+            shift = 0 if destination.latitude >= 0 else 6
+            season = NORTHERN_SEASONS[(main_month - 1 + shift) % 12]
+        return Climate(months, average(self._high), average(self._low), rain, season)
+
+
+def _days_per_month(from_date: datetime.date, to_date: datetime.date) -> Dict[int, int]:
+    if to_date < from_date:
+        from_date, to_date = to_date, from_date
+    days: Dict[int, int] = {}
+    day = from_date
+    # Night by night, so a same-day trip still counts its one day
+    while True:
+        days[day.month] = days.get(day.month, 0) + 1
+        day += datetime.timedelta(days=1)
+        if day >= to_date:
+            break
+    return days
+
+
+@lru_cache(maxsize=1)
+def destination_index() -> DestinationIndex:
+    """The bundled index, loaded on first use."""
+    return DestinationIndex.load(os.getenv("DESTINATION_INDEX_PATH", DEFAULT_INDEX_PATH))
+
+
+def _money(amount: float) -> str:
+    return f"${amount:,.0f}"
+
+
+def _temperature(celsius: float) -> str:
+    return f"{celsius:.0f}°C ({celsius * 9 / 5 + 32:.0f}°F)"
+
+
+def _month_names(months: Tuple[int, ...]) -> str:
+    names = [calendar.month_name[month] for month in months]
+    return names[0] if len(names) == 1 else f"{names[0]}–{names[-1]}"
+
+
+@dataclass(frozen=True)
+class TripFacts:
+    """Deterministic facts about a trip, computed here so the model doesn't have to."""
+
+    destination: str
+    nights: int
+    budget: float
+    known: Optional[Destination] = None
+    climate: Optional[Climate] = None
+    prices: Optional[Prices] = None
+
+    @property
+    def lodging_budget(self) -> float:
+        return self.budget * LODGING_SHARE
+
+    @property
+    def food_budget(self) -> float:
+        return self.budget * FOOD_SHARE
+
+    def _weather_line(self) -> Optional[str]:
+        if self.climate is None:
+            return None
+        climate = self.climate
+        line = (
+            f"- Weather in {self.known.name} in {_month_names(climate.months)} ({climate.season}): "
+            f"highs around {_temperature(climate.high_c)}, lows around {_temperature(climate.low_c)}, "
+            f"about {climate.rain_mm:.0f} mm of rain per month"
+        )
+        if climate.notes:
+            line += f" ({', '.join(climate.notes)})"
+        return line
+
+    def lodging(self) -> str:
+        per_night = self.lodging_budget / self.nights
+        lines = [
+            f"- Duration: {self.nights} nights",
+            f"- Lodging budget: {_money(self.lodging_budget)} of {_money(self.budget)} total "
+            f"({LODGING_SHARE:.0%}), about {_money(per_night)}/night",
+        ]
+        weather = self._weather_line()
+        if weather:
+            lines.append(weather)
+        if self.prices is not None:
+            if per_night >= self.prices.lodging_mid:
+                fit = "mid-range or better"
+            elif per_night >= self.prices.lodging_budget:
+                fit = "budget to mid-range"
+            else:
+                fit = "below typical budget rates; shared or discounted stays only"
+            lines.append(
+                f"- Typical lodging in {self.known.name}: budget about {_money(self.prices.lodging_budget)}/night, "
+                f"mid-range about {_money(self.prices.lodging_mid)}/night; this budget affords {fit}"
+            )
+        return "\n".join(lines)
+
+    def food(self) -> str:
+        per_day = self.food_budget / self.nights
+        lines = [
+            f"- Duration: {self.nights} days",
+            f"- Food budget: {_money(self.food_budget)} of {_money(self.budget)} total "
+            f"({FOOD_SHARE:.0%}), about {_money(per_day)}/day",
+        ]
+        if self.prices is not None:
+            ratio = per_day / self.prices.food_daily
+            fit = "generous" if ratio >= 1.5 else "comfortable" if ratio >= 1 else "tight"
+            lines.append(
+                f"- Typical food spending in {self.known.name}: about {_money(self.prices.food_daily)}/day "
+                f"per person; this budget is {fit}"
+            )
+        return "\n".join(lines)
+
+
+def trip_facts(
+    destination: str, from_date, to_date, budget, index: Optional[DestinationIndex] = None
+) -> TripFacts:
+    """Budget arithmetic for any trip, plus weather and prices when the destination is in the index."""
+    from_date = datetime.date.fromisoformat(str(from_date))
+    to_date = datetime.date.fromisoformat(str(to_date))
+    nights = max(1, abs((to_date - from_date).days))
+    # DynamoDB returns numbers as Decimal
+    budget = float(budget)
+    index = index if index is not None else destination_index()
+    known = index.lookup(str(destination))
+    if known is None:
+        return TripFacts(str(destination), nights, budget)
+    return TripFacts(
+        str(destination),
+        nights,
+        budget,
+        known=known,
+        climate=index.climate(known, from_date, to_date),
+        prices=index.prices(known),
+    )
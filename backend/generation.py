@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import os
+import threading
+from enum import Enum
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from .coordination import PeerLocks
+from .telemetry import meter
+
+logger = logging.getLogger(__name__)
+
+generation_outcomes = meter.create_counter(
+    "trip_planner.recommendation.generations",
+    description="Recommendation generations by outcome (completed/peer/cancelled/failed)",
+)
+# Tokens already paid for by generations that never stored a result
+cancelled_tokens = meter.create_counter(
+    "trip_planner.recommendation.cancelled_tokens",
+    unit="{token}",
+    description="Tokens streamed by generations cancelled before finishing, by reason",
+)
+client_disconnects = meter.create_counter(
+    "trip_planner.recommendation.disconnects",
+    description="Clients that left mid-stream, by what happened to the generation (shared/background/cancelled)",
+)
+
+# Streams recommendation chunks; the agent aborts its model stream when the event is set
+Producer = Callable[[threading.Event], AsyncIterator[str]]
+# Reads back a recommendation another worker stored, if there is one
+StoredReader = Callable[[], Optional[str]]
+
+
+class DisconnectPolicy(str, Enum):
+    CANCEL = "cancel"
+    COMPLETE = "complete"
+
+
+class Generation:
+    """A recommendation being generated, streamed to every client that asks for it."""
+
+    def __init__(self, key: Hashable, recommendation_type: str) -> None:
+        self.key = key
+        self.recommendation_type = recommendation_type
+        self.chunks: List[str] = []
+        # UTF-8 bytes produced so far
+        self.size = 0
+        self.done = False
+        self.subscribers = 0
+        self.cancel_signal = threading.Event()
+        self.cancel_reason: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _append(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self.size += len(chunk.encode("utf-8"))
+
+
+class GenerationManager:
+    """Runs recommendation generations as tasks apart from the requests streaming them.
+
+    Concurrent requests for the same key share one generation. When the last
+    client disconnects, the generation is cancelled, which aborts the model
+    stream, or with the "complete" policy left to finish in the background so
+    its result is still stored. On shutdown, drain() waits for generations
+    up to a deadline and cancels the rest.
+
+    With several worker processes, peers extends the sharing across them: a
+    worker that finds the key claimed by another waits for it to finish and
+    serves the stored result instead of generating it again.
+    """
+
+    def __init__(
+        self,
+        disconnect_policy: DisconnectPolicy = DisconnectPolicy.CANCEL,
+        cancel_grace: float = 2.0,
+        peers: Optional[PeerLocks] = None,
+    ) -> None:
+        self.disconnect_policy = DisconnectPolicy(disconnect_policy)
+        self.cancel_grace = cancel_grace
+        self.peers = peers if peers is not None else PeerLocks()
+        self.closing = False
+        self._generations: Dict[Hashable, Generation] = {}
+        # Set and replaced whenever a generation starts or finishes
+        self._activity = asyncio.Event()
+
+    @classmethod
+    def from_env(cls) -> "GenerationManager":
+        return cls(
+            disconnect_policy=DisconnectPolicy(os.getenv("GENERATION_DISCONNECT_POLICY", "cancel")),
+            cancel_grace=float(os.getenv("GENERATION_CANCEL_GRACE", "2")),
+            peers=PeerLocks.from_env(),
+        )
+
+    def __len__(self) -> int:
+        return len(self._generations)
+
+    def get(self, key: Hashable) -> Optional[Generation]:
+        """The generation running for key on this process, if any."""
+        return self._generations.get(key)
+
+    async def wait_for_activity(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for a generation to start or finish. Returns whether one did."""
+        try:
+            await asyncio.wait_for(self._activity.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _notify_activity(self) -> None:
+        activity, self._activity = self._activity, asyncio.Event()
+        activity.set()
+
+    @property
+    def active_streams(self) -> int:
+        """Client streams currently open on this process."""
+        return sum(generation.subscribers for generation in self._generations.values())
+
+    def start(
+        self,
+        key: Hashable,
+        recommendation_type: str,
+        produce: Producer,
+        stored: Optional[StoredReader] = None,
+        settle: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> Generation:
+        """The generation running for key, starting it with produce if there is none.
+
+        stored reads the result a peer worker saved while this one waited, and
+        settle waits until this generation's own result is saved; the claim on
+        the key is held until then.
+        """
+        generation = self._generations.get(key)
+        if generation is not None:
+            return generation
+        if self.closing:
+            raise RuntimeError("Not starting new generations while shutting down")
+        generation = Generation(key, recommendation_type)
+        self._generations[key] = generation
+        generation.task = asyncio.create_task(
+            self._run(generation, produce, stored, settle), name=f"generate-{recommendation_type}"
+        )
+        self._notify_activity()
+        return generation
+
+    async def stream(self, generation: Generation) -> AsyncIterator[str]:
+        """Every chunk of a generation, from the first, as it is produced."""
+        generation.subscribers += 1
+        sent = 0
+        try:
+            while True:
+                changed = generation._changed
+                while sent < len(generation.chunks):
+                    yield generation.chunks[sent]
+                    sent += 1
+                if generation.done:
+                    return
+                await changed.wait()
+        finally:
+            # Runs when the client disconnects, which cancels or closes this generator
+            generation.subscribers -= 1
+            if not generation.done:
+                self._abandoned(generation)
+
+    def _abandoned(self, generation: Generation) -> None:
+        if generation.subscribers > 0:
+            outcome = "shared"
+        elif self.disconnect_policy == DisconnectPolicy.COMPLETE or self.closing:
+            # Left for drain() while shutting down
+            outcome = "background"
+        else:
+            outcome = "cancelled"
+            self.cancel(generation, "client_disconnect")
+        client_disconnects.add(1, {"recommendation.type": generation.recommendation_type, "outcome": outcome})
+
+    def cancel(self, generation: Generation, reason: str) -> None:
+        """Signal the agent to stop, and cancel the task if it has not within cancel_grace."""
+        if generation.done or generation.cancel_signal.is_set():
+            return
+        generation.cancel_reason = reason
+        generation.cancel_signal.set()
+        generation.task.get_loop().call_later(self.cancel_grace, generation.task.cancel)
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting generations and wait for running ones, cancelling any left at the deadline."""
+        self.closing = True
+        tasks = [generation.task for generation in self._generations.values()]
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        if not pending:
+            return
+
+        logger.warning("Cancelling %d recommendation generations still running at shutdown", len(pending))
+        for generation in list(self._generations.values()):
+            self.cancel(generation, "shutdown")
+        _, pending = await asyncio.wait(pending, timeout=self.cancel_grace)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def _finish(self, generation: Generation) -> None:
+        if generation.done:
+            return
+        generation.done = True
+        generation._notify()
+        if self._generations.get(generation.key) is generation:
+            del self._generations[generation.key]
+        self._notify_activity()
+
+    async def _run(
+        self,
+        generation: Generation,
+        produce: Producer,
+        stored: Optional[StoredReader],
+        settle: Optional[Callable[[], Awaitable[None]]],
+    ) -> None:
+        outcome = "failed"
+        try:
+            async with self.peers.claim(repr(generation.key)) as contended:
+                text = await asyncio.to_thread(stored) if contended and stored is not None else None
+                if text:
+                    generation._append(text)
+                    outcome = "peer"
+                else:
+                    async for chunk in produce(generation.cancel_signal):
+                        generation._append(chunk)
+                        generation._notify()
+                    outcome = "cancelled" if generation.cancel_signal.is_set() else "completed"
+                # Clients finish now, while the claim is held until the result is saved
+                self._finish(generation)
+                if outcome == "completed" and settle is not None and self.peers.enabled:
+                    await settle()
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception:
+            logger.exception("Generating %s recommendation failed", generation.recommendation_type)
+        finally:
+            self._finish(generation)
+
+            attributes = {"recommendation.type": generation.recommendation_type}
+            generation_outcomes.add(1, {**attributes, "outcome": outcome})
+            if outcome == "cancelled":
+                reason = generation.cancel_reason or "cancelled"
+                cancelled_tokens.add(len(generation.chunks), {**attributes, "reason": reason})
+                logger.info(
+                    "Cancelled %s recommendation after %d chunks (%s)",
+                    generation.recommendation_type,
+                    len(generation.chunks),
+                    reason,
+                )
@@ -0,0 +1,41 @@
+import importlib
+import os
+import tempfile
+
+# Production server profile: gunicorn -c app/gunicorn.conf.py app.main:app
+
+bind = f"0.0.0.0:{os.getenv('PORT', '80')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(len(os.sched_getaffinity(0)))))
+worker_class = os.getenv("WORKER_CLASS", "app.workers.TripPlannerWorker")
+
+# Longer than the load balancer's idle timeout, so the balancer always closes idle connections first
+keepalive = int(os.getenv("KEEPALIVE", "75"))
+# In-flight streams and the write-behind flush get this long after SIGTERM
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "60"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+
+accesslog = "-"
+forwarded_allow_ips = "*"
+
+# Imported once in the master and inherited by every forked worker. The app
+# itself is not preloaded: its store clients and sockets must be per worker.
+PRELOAD_MODULES = (
+    "boto3",
+    "botocore.session",
+    "fastapi",
+    "pydantic",
+    "mcp",
+    "strands",
+    "strands.models.bedrock",
+    "strands.tools.mcp",
+    "opentelemetry.sdk.metrics",
+    "opentelemetry.sdk.trace",
+)
+
+
+def on_starting(server):
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+    # Workers share cache invalidations and generation claims through this directory
+    if workers > 1:
+        os.environ.setdefault("WORKER_COORDINATION_DIR", tempfile.mkdtemp(prefix="trip-planner-"))
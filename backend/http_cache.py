@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import os
+from typing import Callable, Iterable, Optional
+
+from fastapi import Request, Response, status
+
+try:
+    import brotli
+except ImportError:  # gzip is always available
+    brotli = None
+
+# Regenerating a recommendation or replacing its trip changes it under the same URL,
+# so caches keep it but revalidate with the ETag, which is a 304 when nothing changed
+RECOMMENDATION_CACHE_CONTROL = os.getenv("RECOMMENDATION_CACHE_CONTROL", "no-cache")
+# Plans gain recommendations over time, so caches must revalidate them
+PLAN_CACHE_CONTROL = os.getenv("PLAN_CACHE_CONTROL", "no-cache")
+# In-progress streams must never be cached
+STREAM_CACHE_CONTROL = "no-store"
+
+MIN_ENCODE_BYTES = int(os.getenv("HTTP_COMPRESSION_MIN_BYTES", "1024"))
+ENCODED_SUFFIXES = ("-br", "-gzip")
+
+
+def content_etag(*parts: Iterable) -> str:
+    """Content hash used as the opaque part of an ETag."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    # Encoded representations share the validator of the identity body
+    for suffix in ENCODED_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def matching_tag(request: Request, etag: str) -> Optional[str]:
+    """The If-None-Match entry that already covers this ETag, if the client sent one."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return f'"{etag}"'
+    for tag in header.split(","):
+        if _opaque(tag) == etag:
+            return tag.strip()
+    return None
+
+
+def _negotiate(request: Request) -> Optional[str]:
+    accepted = {}
+    for entry in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = entry.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def cached_response(
+    request: Request,
+    etag: str,
+    body: Callable[[], str],
+    media_type: str,
+    cache_control: str,
+) -> Response:
+    """Conditional, compressed response for content identified by etag.
+
+    body is only called when the client does not already hold this version.
+    """
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    matched = matching_tag(request, etag)
+    if matched:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "ETag": matched})
+
+    content = body().encode("utf-8")
+    encoding = _negotiate(request) if len(content) >= MIN_ENCODE_BYTES else None
+    if encoding == "br":
+        content = brotli.compress(content, quality=5)
+    elif encoding == "gzip":
+        content = gzip.compress(content, compresslevel=6)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = f'"{etag}-{encoding}"'
+    else:
+        headers["ETag"] = f'"{etag}"'
+    return Response(content=content, media_type=media_type, headers=headers)
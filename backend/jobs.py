@@ -0,0 +1,408 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .telemetry import meter
+
+logger = logging.getLogger(__name__)
+
+job_outcomes = meter.create_counter(
+    "trip_planner.recommendation.jobs",
+    description="Recommendation job deliveries by outcome (succeeded/retried/failed/released)",
+)
+
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+# States in which a job is still going to produce a result
+ACTIVE_JOB_STATES = (JobState.QUEUED.value, JobState.RUNNING.value)
+
+
+class FatalJobError(Exception):
+    """A job failure that retrying cannot fix, such as a trip that no longer exists."""
+
+
+@dataclass
+class Job:
+    """A request to generate one recommendation for a trip, outside of any client request."""
+
+    trip_id: str
+    recommendation_type: str
+    tier: str = "auto"
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    # Deliveries so far, counting the current one
+    attempts: int = 0
+    # Identifies the current delivery to the queue when acking or releasing it
+    receipt: Optional[str] = None
+
+    def to_message(self) -> str:
+        return json.dumps(
+            {"id": self.id, "trip_id": self.trip_id, "type": self.recommendation_type, "tier": self.tier},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_message(cls, body: str, attempts: int = 0, receipt: Optional[str] = None) -> "Job":
+        message = json.loads(body)
+        return cls(
+            trip_id=message["trip_id"],
+            recommendation_type=message["type"],
+            tier=message["tier"],
+            id=message["id"],
+            attempts=attempts,
+            receipt=receipt,
+        )
+
+    def status(self, state: JobState, error: Optional[str] = None) -> Dict[str, Any]:
+        """The job's progress as recorded on its trip."""
+        return {
+            "id": self.id,
+            "state": state.value,
+            "tier": self.tier,
+            "attempts": self.attempts,
+            "error": error,
+            "updated_at": time.time(),
+        }
+
+
+class JobQueue(ABC):
+    """Durable queue of recommendation jobs.
+
+    Delivery is at least once: a received job is leased to one worker for a
+    visibility timeout and is delivered again unless it is acked before the
+    lease runs out, e.g. because the worker died.
+    """
+
+    @abstractmethod
+    def put(self, job: Job, delay: float = 0) -> None: ...
+
+    @abstractmethod
+    def receive(self, visibility_timeout: float, wait: float = 0) -> Optional[Job]:
+        """Lease the next visible job, waiting up to wait seconds for one."""
+
+    @abstractmethod
+    def ack(self, job: Job) -> None:
+        """Remove a finished job."""
+
+    @abstractmethod
+    def release(self, job: Job, delay: float = 0) -> None:
+        """Give up the lease on a job, making it visible again after delay seconds."""
+
+    @abstractmethod
+    def extend(self, job: Job, visibility_timeout: float) -> None:
+        """Keep the lease on a job that is still running for another visibility_timeout seconds."""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteJobQueue(JobQueue):
+    """Queue in a SQLite file, for development and tests.
+
+    Jobs survive restarts, and the worker processes of one host can share the
+    file: receiving takes the write lock, so a job is only leased once.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            body TEXT NOT NULL,
+            visible_at REAL NOT NULL,
+            receipt TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS jobs_visible_at ON jobs (visible_at);
+    """
+
+    def __init__(self, path: str = "jobs.db", poll_interval: float = 0.1) -> None:
+        self.poll_interval = poll_interval
+        # One connection shared across threads; the lock serialises access
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def put(self, job: Job, delay: float = 0) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, body, visible_at) VALUES (?, ?, ?)",
+                (job.id, job.to_message(), time.time() + delay),
+            )
+
+    def receive(self, visibility_timeout: float, wait: float = 0) -> Optional[Job]:
+        deadline = time.monotonic() + wait
+        while True:
+            job = self._lease(visibility_timeout)
+            if job is not None or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+
+    def _lease(self, visibility_timeout: float) -> Optional[Job]:
+        now = time.time()
+        receipt = uuid.uuid4().hex
+        with self._lock, self._conn:
+            # Taking the write lock up front keeps two processes from leasing the same job
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT id, body, attempts FROM jobs WHERE visible_at <= ? ORDER BY visible_at LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET visible_at = ?, receipt = ?, attempts = attempts + 1 WHERE id = ?",
+                (now + visibility_timeout, receipt, row["id"]),
+            )
+        return Job.from_message(row["body"], attempts=row["attempts"] + 1, receipt=receipt)
+
+    def ack(self, job: Job) -> None:
+        # A lease that ran out may already belong to another worker; the receipt check leaves it alone
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE id = ? AND receipt = ?", (job.id, job.receipt))
+
+    def release(self, job: Job, delay: float = 0) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET visible_at = ?, receipt = NULL WHERE id = ? AND receipt = ?",
+                (time.time() + delay, job.id, job.receipt),
+            )
+
+    def extend(self, job: Job, visibility_timeout: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET visible_at = ? WHERE id = ? AND receipt = ?",
+                (time.time() + visibility_timeout, job.id, job.receipt),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SQSJobQueue(JobQueue):
+    """Amazon SQS queue, for production. Leases are the messages' visibility timeouts."""
+
+    # SQS limits on long polling and message delays
+    MAX_WAIT_SECONDS = 20
+    MAX_DELAY_SECONDS = 900
+
+    def __init__(self, queue_url: str, endpoint_url: Optional[str] = None) -> None:
+        # Imported here so the SQLite queue doesn't load boto3
+        import boto3
+
+        self.queue_url = queue_url
+        self.sqs = boto3.client("sqs", endpoint_url=endpoint_url)
+
+    def put(self, job: Job, delay: float = 0) -> None:
+        self.sqs.send_message(
+            QueueUrl=self.queue_url,
+            MessageBody=job.to_message(),
+            DelaySeconds=min(int(delay), self.MAX_DELAY_SECONDS),
+        )
+
+    def receive(self, visibility_timeout: float, wait: float = 0) -> Optional[Job]:
+        response = self.sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=1,
+            WaitTimeSeconds=min(int(wait), self.MAX_WAIT_SECONDS),
+            VisibilityTimeout=int(visibility_timeout),
+            AttributeNames=["ApproximateReceiveCount"],
+        )
+        messages = response.get("Messages") or []
+        if not messages:
+            return None
+        message = messages[0]
+        return Job.from_message(
+            message["Body"],
+            attempts=int(message.get("Attributes", {}).get("ApproximateReceiveCount", 1)),
+            receipt=message["ReceiptHandle"],
+        )
+
+    def ack(self, job: Job) -> None:
+        self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=job.receipt)
+
+    def release(self, job: Job, delay: float = 0) -> None:
+        self.sqs.change_message_visibility(
+            QueueUrl=self.queue_url, ReceiptHandle=job.receipt, VisibilityTimeout=int(delay)
+        )
+
+    def extend(self, job: Job, visibility_timeout: float) -> None:
+        self.sqs.change_message_visibility(
+            QueueUrl=self.queue_url, ReceiptHandle=job.receipt, VisibilityTimeout=int(visibility_timeout)
+        )
+
+
+def create_job_queue() -> JobQueue:
+    """Build the queue selected by JOB_QUEUE (sqlite or sqs)."""
+    engine = os.getenv("JOB_QUEUE", "sqlite").lower()
+    if engine == "sqlite":
+        return SQLiteJobQueue(os.getenv("JOB_QUEUE_PATH", "jobs.db"))
+    if engine == "sqs":
+        return SQSJobQueue(os.environ["JOB_QUEUE_URL"], endpoint_url=os.getenv("SQS_ENDPOINT") or None)
+    raise ValueError(f"Unknown JOB_QUEUE engine: {engine}")
+
+
+# Runs a job to completion; raising makes the worker retry it
+JobHandler = Callable[[Job], Awaitable[None]]
+# Told about a failed delivery, and whether the job will be retried
+FailureHandler = Callable[[Job, Exception, bool], Awaitable[None]]
+
+
+class JobWorker:
+    """Takes jobs off a queue and runs up to concurrency of them at a time.
+
+    A running job's lease is extended every half visibility timeout. Failed
+    jobs are retried with exponential backoff up to max_attempts deliveries;
+    on stop(), jobs still running at the deadline are cancelled and released
+    so another worker picks them up straight away.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        queue: Optional[JobQueue] = None,
+        concurrency: int = 2,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 3,
+        retry_delay: float = 5.0,
+        poll_interval: float = 1.0,
+        on_failure: Optional[FailureHandler] = None,
+    ) -> None:
+        self.handler = handler
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.on_failure = on_failure
+        self.running = 0
+        self._queue = queue
+        self._stopping = False
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls, handler: JobHandler, on_failure: Optional[FailureHandler] = None) -> "JobWorker":
+        return cls(
+            handler,
+            concurrency=int(os.getenv("JOB_WORKERS", "2")),
+            visibility_timeout=float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300")),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+            retry_delay=float(os.getenv("JOB_RETRY_DELAY", "5")),
+            poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "1")),
+            on_failure=on_failure,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.concurrency > 0
+
+    @property
+    def queue(self) -> JobQueue:
+        # Opened on first use, so importing the app creates no queue file or client
+        if self._queue is None:
+            self._queue = create_job_queue()
+        return self._queue
+
+    async def enqueue(self, job: Job) -> None:
+        await asyncio.to_thread(self.queue.put, job)
+
+    def start(self) -> None:
+        if not self.enabled or self._tasks:
+            return
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._consume(), name=f"job-worker-{index}") for index in range(self.concurrency)
+        ]
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop taking jobs and wait for running ones, cancelling any left at the deadline."""
+        if not self._tasks:
+            return
+        self._stopping = True
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        if pending:
+            logger.warning("Releasing %d recommendation jobs still running at shutdown", len(pending))
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    def close(self) -> None:
+        if self._queue is not None:
+            self._queue.close()
+
+    async def _consume(self) -> None:
+        while not self._stopping:
+            try:
+                job = await asyncio.to_thread(self.queue.receive, self.visibility_timeout, self.poll_interval)
+            except Exception:
+                logger.exception("Receiving recommendation jobs failed")
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if job is None:
+                continue
+            if self._stopping:
+                await asyncio.to_thread(self.queue.release, job)
+                break
+            try:
+                await self.run(job)
+            except Exception:
+                # Unacked, the job is delivered again once its lease runs out
+                logger.exception("Settling recommendation job %s failed", job.id)
+
+    async def run(self, job: Job) -> None:
+        """Run one delivered job, then ack, retry or release it."""
+        attributes = {"recommendation.type": job.recommendation_type}
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        self.running += 1
+        try:
+            await self.handler(job)
+        except asyncio.CancelledError:
+            await asyncio.shield(asyncio.to_thread(self.queue.release, job))
+            job_outcomes.add(1, {**attributes, "outcome": "released"})
+            raise
+        except Exception as error:
+            retry = not isinstance(error, FatalJobError) and job.attempts < self.max_attempts
+            if retry:
+                delay = self.retry_delay * 2 ** (job.attempts - 1)
+                logger.warning("Recommendation job %s failed, retrying in %.0fs: %s", job.id, delay, error)
+                await asyncio.to_thread(self.queue.release, job, delay)
+            else:
+                logger.error("Recommendation job %s failed after %d attempts: %s", job.id, job.attempts, error)
+                await asyncio.to_thread(self.queue.ack, job)
+            job_outcomes.add(1, {**attributes, "outcome": "retried" if retry else "failed"})
+            if self.on_failure is not None:
+                await self.on_failure(job, error, retry)
+        else:
+            await asyncio.to_thread(self.queue.ack, job)
+            job_outcomes.add(1, {**attributes, "outcome": "succeeded"})
+        finally:
+            self.running -= 1
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 2)
+            try:
+                await asyncio.to_thread(self.queue.extend, job, self.visibility_timeout)
+            except Exception:
+                logger.exception("Extending the lease on recommendation job %s failed", job.id)
@@ -0,0 +1,21 @@
+import importlib
+from typing import Any, Callable
+
+
+def lazy_callable(module: str, name: str) -> Callable[..., Any]:
+    """Stand-in for a class or function that only imports its module on the first call.
+
+    Keeps heavy dependencies (strands, mcp) off the import path of the app, so
+    workers and tests that never generate a recommendation don't pay for them.
+    """
+    target = None
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        nonlocal target
+        if target is None:
+            target = getattr(importlib.import_module(module), name)
+        return target(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__doc__ = f"{module}.{name}, imported on first use."
+    return call
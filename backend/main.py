@@ -1,21 +1,71 @@
+import asyncio
 import datetime
+import json
+import logging
 import os
+import time
+from contextlib import asynccontextmanager
 from enum import Enum
+from typing import Any, Dict
 
 from pydantic import BaseModel
 
-from fastapi import FastAPI, Response, status
+from fastapi import FastAPI, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-
-from strands import Agent
-from strands.tools.mcp import MCPClient
-from mcp import stdio_client, StdioServerParameters
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from dotenv import load_dotenv
-from .service import TripPlanningService, TripPlan
+from .compression import expand
+from .destinations import TripFacts, trip_facts
+from .generation import Generation, GenerationManager, Producer
+from .http_cache import (
+    PLAN_CACHE_CONTROL,
+    RECOMMENDATION_CACHE_CONTROL,
+    STREAM_CACHE_CONTROL,
+    cached_response,
+    content_etag,
+    matching_tag,
+)
+from .jobs import ACTIVE_JOB_STATES, FatalJobError, Job, JobState, JobWorker
+from .lazy import lazy_callable
+from .persistence import Checkpointer
+from .prompts import (
+    FOOD_PROMPT,
+    LODGING_PROMPT,
+    TRAVEL_PROMPT,
+    TRAVEL_SYSTEM_PROMPT,
+    ToolResultBudget,
+    build_model,
+)
+from .routing import ModelRouter, Route, Tier
+from .scaling_metrics import ScalingMetricsReporter
+from .service import METADATA_SUFFIXES, TripPlanningService, TripPlan
+from .telemetry import (
+    TelemetryMiddleware,
+    ToolLatencyHooks,
+    bedrock_queue_depth,
+    instrumented_stream,
+    metrics_payload,
+    record_cache_lookup,
+    setup_telemetry,
+)
 
 load_dotenv()
+setup_telemetry()
+
+logger = logging.getLogger(__name__)
+
+# strands and mcp take most of the import time; they are loaded by the first generation
+Agent = lazy_callable("strands", "Agent")
+MCPClient = lazy_callable("strands.tools.mcp", "MCPClient")
+stdio_client = lazy_callable("mcp", "stdio_client")
+StdioServerParameters = lazy_callable("mcp", "StdioServerParameters")
+
+
+# Longest a status request may wait for a change, and how often it rechecks for changes made by other workers
+STATUS_MAX_WAIT = float(os.getenv("STATUS_MAX_WAIT", "30"))
+STATUS_POLL_INTERVAL = float(os.getenv("STATUS_POLL_INTERVAL", "1"))
 
 
 class RecommendationType(str, Enum):
@@ -36,7 +86,35 @@ class PlanHistory(BaseModel):
     travel: str
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    service.writer.start()
+    service.bus.start()
+    scaling_metrics.start()
+    job_worker.start()
+    yield
+    await scaling_metrics.stop()
+    # Jobs wait on generations, so both share one deadline: in-flight generations
+    # finish and reach the write-behind queue, and jobs still running at the
+    # deadline go back on the queue for another worker
+    drain_timeout = float(os.getenv("GENERATION_DRAIN_TIMEOUT", "25"))
+    await asyncio.gather(job_worker.stop(timeout=drain_timeout), generations.drain(timeout=drain_timeout))
+    job_worker.close()
+    # Persist recommendations that finished streaming before shutting down
+    await service.writer.drain(timeout=float(os.getenv("WRITE_BEHIND_DRAIN_TIMEOUT", "10")))
+    service.bus.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def begin_shutdown() -> None:
+    """Called by the server as soon as it starts shutting down, before it closes any stream."""
+    # New streams get 503, and streams the server cuts off finish in the background for drain()
+    generations.closing = True
+
+
+app.state.begin_shutdown = begin_shutdown
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -44,76 +122,221 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TelemetryMiddleware)
 
 service = TripPlanningService()
+router = ModelRouter.from_env()
+generations = GenerationManager.from_env()
+scaling_metrics = ScalingMetricsReporter.from_env(
+    {
+        "ActiveStreams": lambda: generations.active_streams,
+        "BedrockQueueDepth": bedrock_queue_depth,
+    }
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
 
 
 @app.get("/plan/{id}")
-async def get_plan(id: str, response: Response):
+async def get_plan(id: str, request: Request, response: Response):
     trip = service.get_trip(id)
 
     if not trip:
         response.status_code = status.HTTP_404_NOT_FOUND
         return {"error": "Trip not found"}
 
-    return trip
+    def body():
+        plan = {name: value for name, value in expand(trip).items() if not name.endswith(METADATA_SUFFIXES)}
+        return json.dumps(jsonable_encoder(plan))
+
+    return cached_response(
+        request, service.get_trip_etag(trip), body, "application/json", PLAN_CACHE_CONTROL
+    )
+
+
+def recommendation_status(id: str, record) -> Dict[str, Dict[str, Any]]:
+    """Whether each recommendation of a trip is absent, in progress or complete, without reading its text."""
+    statuses = {}
+    for recommendation_type in RecommendationType:
+        name = recommendation_type.value
+        if record.get(name):
+            statuses[name] = {
+                "state": "complete",
+                "etag": service.get_recommendation_etag(record, name),
+                "size": service.get_recommendation_size(record, name),
+                "tier": record.get(f"{name}_tier"),
+            }
+            continue
+        for tier in (Tier.DEEP, Tier.FAST):
+            generation = generations.get((id, name, tier.value))
+            if generation is not None:
+                statuses[name] = {"state": "in_progress", "bytes": generation.size, "tier": tier.value}
+                break
+        else:
+            # A job may be generating it on another worker
+            job = json.loads(record[f"{name}_job"]) if record.get(f"{name}_job") else None
+            if job and job["state"] in ACTIVE_JOB_STATES:
+                statuses[name] = {"state": "in_progress", "bytes": None, "tier": job["tier"], "job": job["id"]}
+            else:
+                statuses[name] = {"state": "absent"}
+    return statuses
 
 
-@app.post("/plan")
-async def new_plan(request: TripPlan):
-    service.add_trip(request)
-    return {"id": request.id}
+def status_etag(statuses: Dict[str, Dict[str, Any]]) -> str:
+    # Progress is left out, so long-polling clients only wake up when a state changes
+    versions = {name: {k: v for k, v in entry.items() if k != "bytes"} for name, entry in statuses.items()}
+    return content_etag(json.dumps(versions, sort_keys=True))
 
 
-@app.get("/plan/{id}/recommendation/lodging")
-async def get_plan_lodging_recommendation(id: str):
-    async def generate():
-        # service = TripPlanningService()
-        record = service.get_trip(id)
-        if record.get(RecommendationType.LODGING):
-            yield record[RecommendationType.LODGING]
+# Attributes that change whenever a stored recommendation or its job does, so a poll can read only these
+STATUS_ATTRIBUTES = tuple(
+    f"{recommendation_type.value}{suffix}" for recommendation_type in RecommendationType for suffix in ("_etag", "_job")
+)
 
-        else:
-            try:
-                destination = record["destination"]
-                from_date = record["from_date"]
-                to_date = record["to_date"]
-                budget = record["budget"]
-                agent = Agent(
-                    model="us.deepseek.r1-v1:0",
-                    # DeepSeek R1 recommends not to use system prompt
-                    # See https://docs.together.ai/docs/prompting-deepseek-r1
-                    # system_prompt=f"""You are a helpful travel agent, who provides lodging recommendations.
-                    # Provide hotel and accommodation recommendations.""",
-                    callback_handler=None,
-                )
 
-                prompt = f"""
-                Act as a travel advisor specializing in budget-conscious lodging recommendations. You are CONCISE in your response. The user has provided:
+@app.get("/plan/{id}/status")
+async def get_plan_status(id: str, request: Request, wait: float = 0):
+    """Recommendation states of a trip. With wait, holds the request until they differ from If-None-Match."""
+    trip = service.get_trip(id)
+    if not trip:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": "Trip not found"})
+
+    statuses = recommendation_status(id, trip)
+    etag = status_etag(statuses)
+    deadline = time.monotonic() + min(max(wait, 0.0), STATUS_MAX_WAIT)
+    stamp = {name: trip.get(name) for name in STATUS_ATTRIBUTES}
+    while matching_tag(request, etag) and not generations.closing:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or await request.is_disconnected():
+            break
+        # Local generations wake the request at once; changes from other workers are seen on the next check
+        await generations.wait_for_activity(min(remaining, STATUS_POLL_INTERVAL))
+        # The whole trip is only read again once its recommendations or jobs have changed
+        current = service.get_trip_attributes(id, STATUS_ATTRIBUTES)
+        if current is not None and current != stamp:
+            trip = service.get_trip(id) or trip
+            stamp = current
+        statuses = recommendation_status(id, trip)
+        etag = status_etag(statuses)
+
+    headers = {"Cache-Control": PLAN_CACHE_CONTROL, "ETag": f'W/"{etag}"'}
+    if matching_tag(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content={"id": id, "recommendations": statuses}, headers=headers)
 
-                1. {destination}
-                2. Travel start {from_date} and end date {to_date} (to determine duration and season)
-                3. Total trip budget {budget} (lodging should use ≤50% of this).
-                
-                Your task is to:
 
-                Calculate the maximum lodging budget (50% of total) and per-night allowance (total lodging budget ÷ duration).
-                Analyze weather patterns at the destination during the travel dates (e.g., rainy season, extreme temperatures, peak summer/winter). Highlight how this might impact lodging choices (e.g., need for AC, heating, or indoor amenities).
-                Recommend 3-4 accommodation categories (e.g., boutique hotels, hostels, vacation rentals) suited to the budget, duration, and weather. Explain why each fits (e.g., 'Vacation rentals offer kitchens for longer stays' or 'Hostels save costs for solo travelers').
-                Suggest specific features to prioritize (e.g., proximity to public transit if rainy, pools for summer, cozy common areas for winter).
-                Provide a budget breakdown example (e.g., 'With a $2,000 total budget, allocate $1,000 for 7 nights = ~$143/night. Opt for mid-range hotels or private Airbnb rooms').
-                
-                Example response structure:
+@app.post("/plan")
+async def new_plan(request: TripPlan):
+    service.add_trip(request)
+    return {"id": request.id}
 
-                Weather Insights: 'Expect warm, humid days (85°F) in Bali during July. Prioritize AC and pool access.'
-                Budget Analysis: '$1,500 total budget → $750 for lodging. At 10 nights, aim for ≤$75/night.'
-                Recommendations: '1. Guesthouses ($50–$70/night): Budget-friendly with AC. 2. Boutique hotels ($80–$100/night: Splurge for shorter stays). 3. Hostels ($20–$30/bed: Ideal for extending your trip).'
-                """
 
-                reasoning = "<reasoning>"
-                response = "<response>"
+def stored_recommendation(
+    request: Request, record, recommendation_type: str, include_reasoning: bool = False
+) -> Response:
+    etag = service.get_recommendation_etag(record, recommendation_type)
+    if not include_reasoning:
+        # Without the reasoning trace the body is a different representation
+        etag = content_etag(etag, "reasoning=false")
+
+    def body():
+        text = str(record[recommendation_type])
+        # The reasoning trace is stored apart from the trip and only loaded when asked for
+        reasoning = service.get_trip_reasoning(record["id"], recommendation_type) if include_reasoning else None
+        if reasoning:
+            text = "<reasoning>" + reasoning + "</reasoning>" + text
+        return text
+
+    response = cached_response(request, etag, body, "text/plain", RECOMMENDATION_CACHE_CONTROL)
+    tier = record.get(f"{recommendation_type}_tier")
+    if tier:
+        response.headers["X-Model-Tier"] = tier
+    return response
+
+
+def has_recommendation(record, recommendation_type: str, tier: Tier) -> bool:
+    """Whether a stored recommendation can answer this request.
+
+    Asking for the deep tier regenerates recommendations that were made by the fast tier.
+    """
+    if not record.get(recommendation_type):
+        return False
+    return tier != Tier.DEEP or record.get(f"{recommendation_type}_tier") != Tier.FAST.value
+
+
+def start_generation(id: str, recommendation_type: str, route: Route, produce: Producer) -> Generation:
+    """The generation for a trip, type and tier, shared by client streams and jobs."""
+    return generations.start(
+        (id, recommendation_type, route.tier.value),
+        recommendation_type,
+        produce,
+        stored=lambda: service.get_fresh_recommendation(id, recommendation_type),
+        settle=lambda: service.writer.flushed(id),
+    )
+
+
+def stream_generation(id: str, recommendation_type: str, route: Route, produce: Producer) -> Response:
+    """Stream a recommendation, joining a generation already running for the same trip and tier."""
+    if generations.closing:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"error": "Shutting down"},
+            headers={"Retry-After": "5"},
+        )
+    generation = start_generation(id, recommendation_type, route, produce)
+    return StreamingResponse(
+        generations.stream(generation),
+        media_type="text/plain",
+        headers={"Cache-Control": STREAM_CACHE_CONTROL, "X-Model-Tier": route.tier.value},
+    )
+
+
+def recommendation_checkpoints(id: str, recommendation_type: str) -> Checkpointer:
+    """Checkpoints of a recommendation's partial output, so an interrupted stream leaves it behind."""
+    return Checkpointer.from_env(lambda text: service.checkpoint_recommendation(id, recommendation_type, text))
+
+
+def record_facts(record) -> TripFacts:
+    """Budget, weather and price facts for a stored trip, injected into the prompts."""
+    return trip_facts(record["destination"], record["from_date"], record["to_date"], record["budget"])
+
+
+def lodging_producer(id: str, record, route: Route) -> Producer:
+    """Generates a lodging recommendation with streamed reasoning, and stores it."""
+
+    async def generate(cancel_signal):
+        try:
+            lodging_model = route.model
+            agent = Agent(
+                model=build_model(lodging_model.model_id),
+                # DeepSeek R1 recommends not to use system prompt
+                # See https://docs.together.ai/docs/prompting-deepseek-r1
+                callback_handler=None,
+            )
+
+            _, prompt = lodging_model.prompts(
+                None,
+                LODGING_PROMPT.render(
+                    destination=record["destination"],
+                    from_date=record["from_date"],
+                    to_date=record["to_date"],
+                    budget=record["budget"],
+                    facts=record_facts(record).lodging(),
+                ),
+            )
+
+            reasoning = ""
+            response = "<response>"
+            checkpoints = recommendation_checkpoints(id, "lodging")
 
-                async for event in agent.stream_async(prompt):
+            with router.track():
+                async for event in instrumented_stream(
+                    agent.stream_async(prompt, cancel_signal=cancel_signal), "lodging", lodging_model.model_id
+                ):
                     if "reasoningText" in event:
                         chunk = "<reasoning>" + event["reasoningText"] + "</reasoning>"
                         reasoning += event["reasoningText"]
@@ -122,146 +345,260 @@ async def get_plan_lodging_recommendation(id: str):
                         chunk = "<response>" + event["data"] + "</response>"
                         response += event["data"]
                         yield chunk
-
-                reasoning += "</reasoning>"
-                response += "</response>"
-                full_response = reasoning + response
-                # Store the complete response in DynamoDB
-                service.set_trip_recommendation(id, "lodging", full_response)
-                # table.update_item(
-                #     Key={"id": id},
-                #     UpdateExpression="SET lodging = :response",
-                #     ExpressionAttributeValues={":response": full_response},
-                # )
-                print("Stored lodging response in DynamoDB")
-            except Exception as e:
-                yield f"Error: {str(e)}"
-
-    return StreamingResponse(generate(), media_type="text/plain")
-
-
-@app.get("/plan/{id}/recommendation/food")
-async def get_plan_food_recommendation(id: str):
-    async def generate():
-        # retrieve the plan values from DynamoDB
-        record = service.get_trip(id)
-        if record.get(RecommendationType.FOOD):
-            yield record[RecommendationType.FOOD]
-
-        else:
-            destination = record["destination"]
-            from_date = record["from_date"]
-            to_date = record["to_date"]
-            budget = record["budget"]
-            agent = Agent(
-                model="us.deepseek.r1-v1:0",
-                # system_prompt=f"""You are a helpful food and dining specialist for {destination}
-                # from {from_date} to {to_date} with a budget of ${budget}.
-                # """,
-                callback_handler=None,
+                        await checkpoints.update(response)
+
+            if cancel_signal.is_set():
+                # Never store a partial recommendation, only keep it as a checkpoint
+                await checkpoints.flush(response)
+                return
+            response += "</response>"
+            # Hand the response to the write-behind queue, with the reasoning kept separately
+            await service.save_trip_recommendation(
+                id, "lodging", response, reasoning=reasoning, tier=route.tier.value
+            )
+            # table.update_item(
+            #     Key={"id": id},
+            #     UpdateExpression="SET lodging = :response",
+            #     ExpressionAttributeValues={":response": full_response},
+            # )
+            logger.info("Stored lodging recommendation for trip %s", id)
+        except Exception as e:
+            yield f"Error: {str(e)}"
+
+    return generate
+
+
+def food_producer(id: str, record, route: Route) -> Producer:
+    """Generates a food recommendation and stores it."""
+
+    async def generate(cancel_signal):
+        food_model = route.model
+        agent = Agent(model=build_model(food_model.model_id), callback_handler=None)
+
+        full_response = ""
+        checkpoints = recommendation_checkpoints(id, "food")
+        try:
+            _, prompt = food_model.prompts(
+                None,
+                FOOD_PROMPT.render(
+                    destination=record["destination"],
+                    from_date=record["from_date"],
+                    to_date=record["to_date"],
+                    budget=record["budget"],
+                    facts=record_facts(record).food(),
+                ),
             )
 
-            prompt = f"""
-            Act as a travel advisor specializing in food and dining recommendations. The user has provided:
-
-            1. {destination}
-            2. Travel dates {from_date} to {to_date}
-            3. Total trip budget ${budget} (food should use ≤25% of this).
-
-            Your task is to:
-
-            1. Calculate the maximum food budget (25% of total).
-            2. Recommend 3-4 food categories (e.g., fine dining, local cuisine, street food) suited to the budget and duration.
-            3. Suggest specific features to prioritize (e.g., proximity to public transit, local cuisine, street food).
-            4. Provide a budget breakdown example (e.g., 'With a $2, 000 total budget, allocate $500 for 7 days stay = ~$71/day. Provide breakdowns for lunch and dinner').
-
-            Example response structure:
-
-            Budget Analysis: '$1,500 total budget → $375 for food. At 10 nights, aim for ≤$37.5/day.'
-            Recommendations: '1. Fine dining ($100–$200/meal): Budget-friendly with AC. 2. Local cuisine ($50–$70/meal: Splurge for shorter stays). 3. Street food ($20–$30/meal: Ideal for extending your trip).'
-            """
-
-            reasoning = "<reasoning>"
-
-            full_response = ""
-            try:
-                async for event in agent.stream_async(prompt):
+            with router.track():
+                async for event in instrumented_stream(
+                    agent.stream_async(prompt, cancel_signal=cancel_signal), "food", food_model.model_id
+                ):
                     if "data" in event:
                         chunk = event["data"]
                         full_response += chunk
                         yield chunk
-
-                # Store the complete response in DynamoDB
-                service.set_trip_recommendation(id, "food", full_response)
-                print("Stored food response in DynamoDB")
-            except Exception as e:
-                yield f"Error: {str(e)}"
-
-    return StreamingResponse(generate(), media_type="text/plain")
-
-
-@app.get("/plan/{id}/recommendation/travel")
-async def get_plan_travel_recommendation(id: str):
-    async def generate():
-        record = service.get_trip(id)
-        if record.get(RecommendationType.TRAVEL):
-            yield record[RecommendationType.TRAVEL]
-
-        else:
-            mcp_endpoint = os.getenv("MCP_ENDPOINT", "localhost:6000")
-            flights_mcp_client = MCPClient(
-                lambda: stdio_client(
-                    StdioServerParameters(
-                        command="socat",
-                        args=["-", f"TCP:{mcp_endpoint}"],
-                    )
+                        await checkpoints.update(full_response)
+
+            if cancel_signal.is_set():
+                await checkpoints.flush(full_response)
+                return
+            # Hand the complete response to the write-behind queue
+            await service.save_trip_recommendation(id, "food", full_response, tier=route.tier.value)
+            logger.info("Stored food recommendation for trip %s", id)
+        except Exception as e:
+            yield f"Error: {str(e)}"
+
+    return generate
+
+
+def travel_producer(id: str, record, route: Route) -> Producer:
+    """Generates a travel recommendation with the flights MCP tools, and stores it."""
+
+    async def generate(cancel_signal):
+        mcp_endpoint = os.getenv("MCP_ENDPOINT", "localhost:6000")
+        flights_mcp_client = MCPClient(
+            lambda: stdio_client(
+                StdioServerParameters(
+                    command="socat",
+                    args=["-", f"TCP:{mcp_endpoint}"],
                 )
             )
+        )
 
-            with flights_mcp_client:
-                origin = record["origin"]
-                destination = record["destination"]
-                from_date = record["from_date"]
-                to_date = record["to_date"]
-                budget = record["budget"]
+        with flights_mcp_client:
+            travel_model = route.model
+            tools = flights_mcp_client.list_tools_sync()
 
-                tools = flights_mcp_client.list_tools_sync()
+            full_response = ""
+            checkpoints = recommendation_checkpoints(id, "travel")
+            try:
+                system_prompt, prompt = travel_model.prompts(
+                    TRAVEL_SYSTEM_PROMPT.text,
+                    TRAVEL_PROMPT.render(
+                        origin=record["origin"],
+                        destination=record["destination"],
+                        from_date=record["from_date"],
+                        to_date=record["to_date"],
+                        budget=record["budget"],
+                    ),
+                    tools=True,
+                )
                 agent = Agent(
-                    model="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+                    model=build_model(travel_model.model_id),
                     tools=[tools],
                     callback_handler=None,
-                    system_prompt="""You are a helpful travel agent helping search flights and 
-                    local transportation information. Use the flight search tools to find flights. 
-                    Always use SFO as the origin airport code.""",
+                    hooks=[ToolLatencyHooks(), ToolResultBudget(travel_model.tool_result_tokens)],
+                    system_prompt=system_prompt,
                 )
 
-                prompt = f"""
-                Provide flights recommendation from {origin} to {destination} for dates {from_date} to {to_date}.
-                Only use 25% of ${budget} for flights and local transportation.
-                Return the response in markdown format.
-                Please provide brief travel recommendation during my travel.
-                Output the response with: \n\n"Here is your travel and transportation recommendations."
-                
-                Break down the recommendation in two sections:
-                - *Flights*
-                - *Location Transportation*
-
-                For each section provide tips, that can be helpful and relevant to the {destination}.
-                Maximum use 150 words to limit your response.
-                """
-
-                full_response = ""
-                try:
-                    async for event in agent.stream_async(prompt):
+                with router.track():
+                    async for event in instrumented_stream(
+                        agent.stream_async(prompt, cancel_signal=cancel_signal),
+                        "travel",
+                        travel_model.model_id,
+                    ):
                         if "data" in event:
                             chunk = event["data"]
                             full_response += chunk
                             yield chunk
+                            await checkpoints.update(full_response)
+
+                if cancel_signal.is_set():
+                    await checkpoints.flush(full_response)
+                    return
+                # Hand the complete response to the write-behind queue
+                await service.save_trip_recommendation(
+                    id, "travel", full_response, tier=route.tier.value
+                )
+                logger.info("Stored travel recommendation for trip %s", id)
+            except Exception as e:
+                yield f"Error: {str(e)}"
+
+    return generate
+
+
+PRODUCERS = {
+    RecommendationType.LODGING.value: lodging_producer,
+    RecommendationType.FOOD.value: food_producer,
+    RecommendationType.TRAVEL.value: travel_producer,
+}
 
-                    # Store the complete response in DynamoDB
-                    service.set_trip_recommendation(id, "travel", full_response)
-                    print("Stored travel response in DynamoDB")
-                except Exception as e:
-                    yield f"Error: {str(e)}"
 
-    return StreamingResponse(generate(), media_type="text/plain")
+@app.get("/plan/{id}/recommendation/lodging")
+async def get_plan_lodging_recommendation(
+    id: str, request: Request, include_reasoning: bool = True, tier: Tier = Tier.AUTO
+):
+    record = service.get_trip(id)
+    if not record:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": "Trip not found"})
+
+    stored = has_recommendation(record, "lodging", tier)
+    record_cache_lookup("lodging", stored)
+    if stored:
+        return stored_recommendation(request, record, "lodging", include_reasoning)
+
+    route = router.route("lodging", tier)
+    return stream_generation(id, "lodging", route, lodging_producer(id, record, route))
+
+
+@app.get("/plan/{id}/recommendation/food")
+async def get_plan_food_recommendation(id: str, request: Request, tier: Tier = Tier.AUTO):
+    record = service.get_trip(id)
+    if not record:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": "Trip not found"})
+
+    stored = has_recommendation(record, "food", tier)
+    record_cache_lookup("food", stored)
+    if stored:
+        return stored_recommendation(request, record, "food")
+
+    route = router.route("food", tier)
+    return stream_generation(id, "food", route, food_producer(id, record, route))
+
+
+@app.get("/plan/{id}/recommendation/travel")
+async def get_plan_travel_recommendation(id: str, request: Request, tier: Tier = Tier.AUTO):
+    record = service.get_trip(id)
+    if not record:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": "Trip not found"})
+
+    stored = has_recommendation(record, "travel", tier)
+    record_cache_lookup("travel", stored)
+    if stored:
+        return stored_recommendation(request, record, "travel")
+
+    route = router.route("travel", tier)
+    return stream_generation(id, "travel", route, travel_producer(id, record, route))
+
+
+async def run_job(job: Job) -> None:
+    """Generate a queued recommendation, returning once it is stored."""
+    record = service.get_trip(job.trip_id)
+    if not record:
+        raise FatalJobError("Trip not found")
+    tier = Tier(job.tier)
+    if has_recommendation(record, job.recommendation_type, tier):
+        service.save_job(job.trip_id, job.recommendation_type, job.status(JobState.SUCCEEDED))
+        return
+
+    route = router.route(job.recommendation_type, tier)
+    service.save_job(job.trip_id, job.recommendation_type, job.status(JobState.RUNNING))
+    generation = start_generation(
+        job.trip_id, job.recommendation_type, route, PRODUCERS[job.recommendation_type](job.trip_id, record, route)
+    )
+    # Reading the generation like a client keeps it from being cancelled when streaming clients leave
+    chunks = [chunk async for chunk in generations.stream(generation)]
+    await service.writer.flushed(job.trip_id)
+    if not service.get_fresh_recommendation(job.trip_id, job.recommendation_type):
+        errors = [chunk for chunk in chunks if chunk.startswith("Error: ")]
+        raise RuntimeError(errors[-1][len("Error: "):] if errors else "No recommendation was stored")
+    service.save_job(job.trip_id, job.recommendation_type, job.status(JobState.SUCCEEDED))
+
+
+async def job_failed(job: Job, error: Exception, retry: bool) -> None:
+    state = JobState.QUEUED if retry else JobState.FAILED
+    service.save_job(job.trip_id, job.recommendation_type, job.status(state, error=str(error)))
+
+
+job_worker = JobWorker.from_env(run_job, on_failure=job_failed)
+
+
+def job_response(id: str, recommendation_type: str, job, status_code: int = status.HTTP_200_OK) -> Response:
+    body = {"trip_id": id, "type": recommendation_type, **job}
+    if job["state"] == JobState.SUCCEEDED.value:
+        body["result"] = f"/plan/{id}/recommendation/{recommendation_type}"
+    headers = {"Cache-Control": "no-store"}
+    if "id" in job:
+        headers["Location"] = f"/plan/{id}/recommendation/{recommendation_type}/jobs/{job['id']}"
+    return JSONResponse(status_code=status_code, content=body, headers=headers)
+
+
+@app.post("/plan/{id}/recommendation/{recommendation_type}/jobs")
+async def enqueue_recommendation_job(id: str, recommendation_type: RecommendationType, tier: Tier = Tier.AUTO):
+    record = service.get_trip(id)
+    if not record:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": "Trip not found"})
+
+    name = recommendation_type.value
+    if has_recommendation(record, name, tier):
+        return job_response(id, name, {"state": JobState.SUCCEEDED.value, "tier": record.get(f"{name}_tier")})
+
+    # A job already queued or running for the same tier answers this request too
+    current = service.get_job(id, name)
+    if current and current["state"] in ACTIVE_JOB_STATES and current["tier"] == tier.value:
+        return job_response(id, name, current, status.HTTP_202_ACCEPTED)
+
+    job = Job(id, name, tier.value)
+    status_record = job.status(JobState.QUEUED)
+    # Recorded before it is queued, so a worker's progress is never overwritten by it
+    service.save_job(id, name, status_record)
+    await job_worker.enqueue(job)
+    return job_response(id, name, status_record, status.HTTP_202_ACCEPTED)
+
+
+@app.get("/plan/{id}/recommendation/{recommendation_type}/jobs/{job_id}")
+async def get_recommendation_job(id: str, recommendation_type: RecommendationType, job_id: str):
+    job = service.get_job(id, recommendation_type.value)
+    if not job or job["id"] != job_id:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": "Job not found"})
+    return job_response(id, recommendation_type.value, job)
@@ -0,0 +1,37 @@
+import datetime
+from typing import Any, Dict, Tuple
+
+from .destinations import NORTHERN_SEASONS, destination_index, destination_key
+
+# Upper bounds of the budget per night buckets, in USD
+BUDGET_BUCKETS = ((75, "shoestring"), (200, "moderate"), (400, "comfortable"))
+# Upper bounds of the trip length buckets, in nights
+DURATION_BUCKETS = ((3, "weekend"), (8, "week"), (16, "fortnight"))
+
+
+def _bucket(value: float, buckets: Tuple[Tuple[float, str], ...], above: str) -> str:
+    for limit, name in buckets:
+        if value <= limit:
+            return name
+    return above
+
+
+def trip_keys(destination: str, from_date: datetime.date, to_date: datetime.date, budget: float) -> Dict[str, Any]:
+    """Derived keys stored with a trip, for caches and indexes to group trips by."""
+    nights = max(1, (to_date - from_date).days)
+    index = destination_index()
+    # Only an exact name or alias, so "Paris, Texas" is not taken for Paris
+    known = index.lookup(destination)
+    if known is not None:
+        season = index.climate(known, from_date, to_date).season
+    else:
+        # Without a latitude, assume the northern hemisphere calendar
+        season = NORTHERN_SEASONS[from_date.month - 1]
+    return {
+        "destination_key": destination_key(destination),
+        "destination_canonical": known.name if known is not None else None,
+        "duration_nights": nights,
+        "duration_bucket": _bucket(nights, DURATION_BUCKETS, "extended"),
+        "season": season,
+        "budget_bucket": _bucket(float(budget) / nights, BUDGET_BUCKETS, "luxury"),
+    }
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .storage import TripStore
+from .telemetry import meter
+
+logger = logging.getLogger(__name__)
+
+write_behind_flushes = meter.create_counter(
+    "trip_planner.write_behind.flushes", description="Coalesced trip writes by outcome (ok/retry/dropped)"
+)
+write_behind_batch_size = meter.create_histogram(
+    "trip_planner.write_behind.batch_size", unit="{attribute}", description="Attributes written per trip update"
+)
+
+
+class _TripWrites:
+    __slots__ = ("attributes", "details")
+
+    def __init__(self) -> None:
+        self.attributes: Dict[str, Any] = {}
+        self.details: Dict[str, Any] = {}
+
+    def merge_under(self, newer: Optional["_TripWrites"]) -> "_TripWrites":
+        """Combine with writes queued later, which take precedence."""
+        if newer is not None:
+            self.attributes.update(newer.attributes)
+            self.details.update(newer.details)
+        return self
+
+
+class WriteBehindQueue:
+    """Buffers attribute and detail writes and flushes them to the store in the background.
+
+    Writes for the same trip that arrive before the next flush are coalesced
+    into a single store update. At most max_pending trips are buffered; once
+    full, put() waits for the flusher to catch up. Failed writes are retried
+    with exponential backoff, then dropped after max_attempts.
+    """
+
+    def __init__(
+        self,
+        store: TripStore,
+        max_pending: int = 1000,
+        flush_interval: float = 0.05,
+        max_attempts: int = 5,
+        retry_delay: float = 0.5,
+    ) -> None:
+        self.store = store
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._pending: Dict[str, _TripWrites] = {}
+        self._inflight: Dict[str, _TripWrites] = {}
+        self._attempts: Dict[str, int] = {}
+        self._condition: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @classmethod
+    def from_env(cls, store: TripStore) -> "WriteBehindQueue":
+        return cls(
+            store,
+            max_pending=int(os.getenv("WRITE_BEHIND_MAX_PENDING", "1000")),
+            flush_interval=float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "0.05")),
+            max_attempts=int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "5")),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._closing = False
+        self._condition = asyncio.Condition()
+        self._task = asyncio.create_task(self._run(), name="write-behind-flusher")
+
+    async def put(
+        self,
+        _id: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Queue attribute and detail updates for a trip; they are written together."""
+        attributes, details = attributes or {}, details or {}
+        if not self.running:
+            # No flusher (e.g. outside the app lifespan): write through
+            await asyncio.to_thread(self.store.write, _id, attributes, details)
+            return
+
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: _id in self._pending or len(self._pending) < self.max_pending
+            )
+            writes = self._pending.setdefault(_id, _TripWrites())
+            writes.attributes.update(attributes)
+            writes.details.update(details)
+            self._condition.notify_all()
+
+    def overlay(self, _id: str) -> Dict[str, Any]:
+        """Attributes accepted for a trip but not yet confirmed by the store."""
+        overlay: Dict[str, Any] = {}
+        for writes in (self._inflight.get(_id), self._pending.get(_id)):
+            if writes is not None:
+                overlay.update(writes.attributes)
+        return overlay
+
+    def pending_detail(self, _id: str, name: str) -> Any:
+        """A detail accepted for a trip but not yet confirmed by the store, if any."""
+        for writes in (self._pending.get(_id), self._inflight.get(_id)):
+            if writes is not None and name in writes.details:
+                return writes.details[name]
+        return None
+
+    async def flushed(self, _id: str) -> None:
+        """Wait until the writes queued so far for a trip have reached the store (or been dropped)."""
+        if not self.running:
+            return
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._closing or (_id not in self._pending and _id not in self._inflight)
+            )
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Flush everything still buffered and stop the flusher."""
+        if not self.running:
+            return
+        async with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            logger.error("Write-behind drain timed out with %d trips unflushed", len(self._pending))
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._pending or self._closing)
+                if not self._pending and self._closing:
+                    return
+
+            if not self._closing:
+                # Give concurrent streams for the same trip a moment to coalesce
+                await asyncio.sleep(self.flush_interval)
+
+            async with self._condition:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+                self._condition.notify_all()
+
+            failed = await self._flush(batch)
+
+            async with self._condition:
+                for _id, writes in failed.items():
+                    # Newer values written while this batch was in flight win
+                    self._pending[_id] = writes.merge_under(self._pending.get(_id))
+                self._inflight = {}
+                self._condition.notify_all()
+
+            if failed:
+                attempt = max(self._attempts[_id] for _id in failed)
+                await asyncio.sleep(min(30.0, self.retry_delay * 2 ** (attempt - 1)))
+
+    async def _flush(self, batch: Dict[str, _TripWrites]) -> Dict[str, _TripWrites]:
+        """Write a batch, returning the writes that should be retried."""
+        failed: Dict[str, _TripWrites] = {}
+        results = await asyncio.gather(
+            *(
+                asyncio.to_thread(self.store.write, _id, writes.attributes, writes.details)
+                for _id, writes in batch.items()
+            ),
+            return_exceptions=True,
+        )
+        for (_id, writes), result in zip(batch.items(), results):
+            write_behind_batch_size.record(len(writes.attributes) + len(writes.details))
+            if not isinstance(result, Exception):
+                self._attempts.pop(_id, None)
+                write_behind_flushes.add(1, {"outcome": "ok"})
+                if result is False:
+                    logger.warning("Dropped write-behind update for missing trip %s", _id)
+                continue
+
+            attempts = self._attempts.get(_id, 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(_id, None)
+                write_behind_flushes.add(1, {"outcome": "dropped"})
+                logger.error(
+                    "Dropping write-behind update for trip %s after %d attempts: %r", _id, attempts, result
+                )
+                continue
+
+            self._attempts[_id] = attempts
+            write_behind_flushes.add(1, {"outcome": "retry"})
+            logger.warning("Write-behind update for trip %s failed (attempt %d): %r", _id, attempts, result)
+            failed[_id] = writes
+        return failed
+
+
+class Checkpointer:
+    """Saves the output of a stream still in progress at most once every interval seconds.
+
+    Checkpoints go through the write-behind queue, where they coalesce with
+    any other write pending for the trip, so an interrupted stream leaves its
+    output behind at the cost of at most one store update per interval.
+    """
+
+    def __init__(self, save: Callable[[str], Awaitable[None]], interval: float = 5.0) -> None:
+        self.save = save
+        self.interval = interval
+        self._last = time.monotonic()
+        self._saved_length = 0
+
+    @classmethod
+    def from_env(cls, save: Callable[[str], Awaitable[None]]) -> "Checkpointer":
+        return cls(save, interval=float(os.getenv("RECOMMENDATION_CHECKPOINT_INTERVAL", "5")))
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    async def update(self, text: str) -> None:
+        """Checkpoint text if the interval has passed since the last checkpoint."""
+        if self.enabled and time.monotonic() - self._last >= self.interval:
+            await self.flush(text)
+
+    async def flush(self, text: str) -> None:
+        """Checkpoint text now, unless nothing was added since the last checkpoint."""
+        if not self.enabled or len(text) == self._saved_length:
+            return
+        self._last = time.monotonic()
+        self._saved_length = len(text)
+        await self.save(text)
@@ -0,0 +1,261 @@
+import json
+import math
+import os
+import re
+import textwrap
+from dataclasses import dataclass
+from functools import lru_cache
+from string import Formatter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from strands.hooks import AfterToolCallEvent, HookRegistry
+    from strands.models import BedrockModel
+
+# Conservative average for English prose and JSON; over-counting only costs a little context
+CHARS_PER_TOKEN = 3.5
+
+# Dropped first when a tool result is over budget: detail the agent rarely needs
+SUMMARY_DROP_KEYS = ("connections", "stops_description")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def normalize(text: str) -> str:
+    """Strip indentation and trailing spaces and collapse runs of blank lines."""
+    lines = [line.strip() for line in textwrap.dedent(text).strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+class PromptTemplate:
+    """Whitespace-normalized str.format template, compiled once at import."""
+
+    def __init__(self, name: str, text: str) -> None:
+        self.name = name
+        self.text = normalize(text)
+        self.fields = {field for _, field, _, _ in Formatter().parse(self.text) if field}
+
+    def render(self, **values: Any) -> str:
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f"{self.name} prompt is missing {sorted(missing)}")
+        return self.text.format(**values)
+
+
+class PromptTooLong(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    model_id: str
+    max_input_tokens: int
+    # Bedrock prompt caching of the system prompt and tool definitions
+    prompt_cache: bool = False
+    # DeepSeek R1 recommends putting everything in the user turn
+    system_prompt: bool = True
+
+    @property
+    def tool_result_tokens(self) -> int:
+        """Largest single tool result passed back to the model."""
+        limit = int(os.getenv("TOOL_RESULT_MAX_TOKENS", "4000"))
+        return min(limit, self.max_input_tokens // 8)
+
+    def prompts(self, system: Optional[str], prompt: str, tools: bool = False) -> Tuple[Optional[str], str]:
+        """System and user prompt to send, checked against the input budget.
+
+        Models without system prompt support get the system prompt at the top
+        of the user turn. With tools, room for one tool result is kept free.
+        """
+        if system and not self.system_prompt:
+            system, prompt = None, f"{system}\n\n{prompt}"
+        budget = self.max_input_tokens - (self.tool_result_tokens if tools else 0)
+        tokens = estimate_tokens(system or "") + estimate_tokens(prompt)
+        if tokens > budget:
+            raise PromptTooLong(f"Prompt needs about {tokens} tokens, {self.model_id} allows {budget}")
+        return system, prompt
+
+
+DEEPSEEK_R1 = "us.deepseek.r1-v1:0"
+CLAUDE_SONNET = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+CLAUDE_HAIKU = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+
+MODELS: Dict[str, ModelProfile] = {
+    DEEPSEEK_R1: ModelProfile(DEEPSEEK_R1, max_input_tokens=128_000, system_prompt=False),
+    CLAUDE_SONNET: ModelProfile(CLAUDE_SONNET, max_input_tokens=200_000, prompt_cache=True),
+    CLAUDE_HAIKU: ModelProfile(CLAUDE_HAIKU, max_input_tokens=200_000, prompt_cache=True),
+}
+
+
+def profile(model_id: str) -> ModelProfile:
+    # Unknown models get a small budget and no caching
+    return MODELS.get(model_id) or ModelProfile(model_id, max_input_tokens=32_000)
+
+
+@lru_cache(maxsize=None)
+def build_model(model_id: str) -> "BedrockModel":
+    """Shared Bedrock model for a model id, with prompt caching where supported.
+
+    Models are reused across requests so the boto3 client is only created once.
+    """
+    from strands.models import BedrockModel, CacheConfig
+
+    if profile(model_id).prompt_cache:
+        return BedrockModel(model_id=model_id, cache_config=CacheConfig(strategy="auto", tools_ttl=True))
+    return BedrockModel(model_id=model_id)
+
+
+# The trip details come last so every request shares the same instruction prefix
+
+LODGING_PROMPT = PromptTemplate("lodging", """
+    Act as a travel advisor specializing in budget-conscious lodging recommendations. You are CONCISE in your response.
+
+    The trip facts below are precomputed: use their figures as given and do not redo the arithmetic.
+
+    Your task is to:
+    State the lodging budget and per-night allowance from the trip facts.
+    Summarize the weather from the trip facts (if none are given, what is typical at the destination for the travel dates). Highlight how it might impact lodging choices (e.g., need for AC, heating, or indoor amenities).
+    Recommend 3-4 accommodation categories (e.g., boutique hotels, hostels, vacation rentals) suited to the budget, duration, and weather. Explain why each fits (e.g., 'Vacation rentals offer kitchens for longer stays' or 'Hostels save costs for solo travelers').
+    Suggest specific features to prioritize (e.g., proximity to public transit if rainy, pools for summer, cozy common areas for winter).
+
+    Example response structure:
+    Weather Insights: 'Expect warm, humid days (85°F) in Bali during July. Prioritize AC and pool access.'
+    Budget Analysis: '$1,500 total budget → $750 for lodging. At 10 nights, aim for ≤$75/night.'
+    Recommendations: '1. Guesthouses ($50–$70/night): Budget-friendly with AC. 2. Boutique hotels ($80–$100/night: Splurge for shorter stays). 3. Hostels ($20–$30/bed: Ideal for extending your trip).'
+
+    The user has provided:
+    1. {destination}
+    2. Travel start {from_date} and end date {to_date}
+    3. Total trip budget {budget} (lodging should use ≤50% of this).
+
+    Trip facts:
+    {facts}
+""")
+
+FOOD_PROMPT = PromptTemplate("food", """
+    Act as a travel advisor specializing in food and dining recommendations.
+
+    The trip facts below are precomputed: use their figures as given and do not redo the arithmetic.
+
+    Your task is to:
+    1. State the food budget and daily allowance from the trip facts.
+    2. Recommend 3-4 food categories (e.g., fine dining, local cuisine, street food) suited to the budget and duration.
+    3. Suggest specific features to prioritize (e.g., proximity to public transit, local cuisine, street food).
+    4. Split the daily allowance between lunch and dinner.
+
+    Example response structure:
+    Budget Analysis: '$1,500 total budget → $375 for food. At 10 nights, aim for ≤$37.5/day.'
+    Recommendations: '1. Fine dining ($100–$200/meal): Budget-friendly with AC. 2. Local cuisine ($50–$70/meal: Splurge for shorter stays). 3. Street food ($20–$30/meal: Ideal for extending your trip).'
+
+    The user has provided:
+    1. {destination}
+    2. Travel dates {from_date} to {to_date}
+    3. Total trip budget ${budget} (food should use ≤25% of this).
+
+    Trip facts:
+    {facts}
+""")
+
+# Static, so Bedrock can cache it together with the flight tool definitions
+TRAVEL_SYSTEM_PROMPT = PromptTemplate("travel_system", """
+    You are a helpful travel agent helping search flights and local transportation information.
+    Use the flight search tools to find flights. Always use SFO as the origin airport code.
+
+    Return the response in markdown format and keep it brief.
+    Start the response with: "Here is your travel and transportation recommendations."
+    Break down the recommendation in two sections:
+    - *Flights*
+    - *Location Transportation*
+    For each section provide tips that are helpful and relevant to the destination.
+    Use at most 150 words.
+""")
+
+TRAVEL_PROMPT = PromptTemplate("travel", """
+    Provide flights recommendation from {origin} to {destination} for dates {from_date} to {to_date}.
+    Only use 25% of ${budget} for flights and local transportation.
+    Please provide brief travel recommendation during my travel.
+""")
+
+
+def _compact(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _strip_keys(data: Any, keys: Tuple[str, ...]) -> Any:
+    if isinstance(data, dict):
+        return {key: _strip_keys(value, keys) for key, value in data.items() if key not in keys}
+    if isinstance(data, list):
+        return [_strip_keys(value, keys) for value in data]
+    return data
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    limit = int(max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    marker = f"…[truncated {len(text) - limit} characters]"
+    return text[: max(0, limit - len(marker))] + marker
+
+
+def fit_text(text: str, max_tokens: int) -> str:
+    """Shrink a tool result to max_tokens.
+
+    JSON is re-serialized compactly, then detail fields are dropped, then the
+    longest top-level list (e.g. flight offers) is cut short. Anything still
+    too large, or not JSON, is truncated.
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return _truncate(text, max_tokens)
+
+    compact = _compact(data)
+    if estimate_tokens(compact) <= max_tokens:
+        return compact
+
+    data = _strip_keys(data, SUMMARY_DROP_KEYS)
+    compact = _compact(data)
+    if estimate_tokens(compact) <= max_tokens or not isinstance(data, dict):
+        return _truncate(compact, max_tokens)
+
+    lists = [key for key, value in data.items() if isinstance(value, list) and value]
+    if not lists:
+        return _truncate(compact, max_tokens)
+    key = max(lists, key=lambda name: len(data[name]))
+    items: List[Any] = data[key]
+
+    # Largest prefix of the list that fits, by binary search
+    low, high = 0, len(items)
+    while low < high:
+        middle = (low + high + 1) // 2
+        candidate = _compact({**data, key: items[:middle], f"omitted_{key}": len(items) - middle})
+        if estimate_tokens(candidate) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return _truncate(_compact({**data, key: items[:low], f"omitted_{key}": len(items) - low}), max_tokens)
+
+
+class ToolResultBudget:
+    """Strands hook provider that shrinks tool results to the model's tool result budget."""
+
+    def __init__(self, max_tokens: int) -> None:
+        self.max_tokens = max_tokens
+
+    def register_hooks(self, registry: "HookRegistry", **kwargs: Any) -> None:
+        from strands.hooks import AfterToolCallEvent
+
+        registry.add_callback(AfterToolCallEvent, self._after)
+
+    def _after(self, event: "AfterToolCallEvent") -> None:
+        result: Optional[Dict[str, Any]] = event.result
+        if not result or not result.get("content"):
+            return
+        content = []
+        for block in result["content"]:
+            if "text" in block:
+                block = {**block, "text": fit_text(block["text"], self.max_tokens)}
+            content.append(block)
+        event.result = {**result, "content": content}
@@ -0,0 +1,93 @@
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterator
+
+from opentelemetry.metrics import Observation
+
+from .prompts import CLAUDE_HAIKU, CLAUDE_SONNET, DEEPSEEK_R1, ModelProfile, profile
+from .telemetry import meter
+
+routing_decisions = meter.create_counter(
+    "trip_planner.routing.decisions", description="Model tier chosen per recommendation by requested tier"
+)
+
+_routers: "weakref.WeakSet[ModelRouter]" = weakref.WeakSet()
+meter.create_observable_gauge(
+    "trip_planner.routing.in_flight",
+    callbacks=[lambda options: [Observation(sum(router.in_flight for router in list(_routers)))]],
+    description="Model streams currently generating recommendations",
+)
+
+
+class Tier(str, Enum):
+    FAST = "fast"
+    DEEP = "deep"
+    AUTO = "auto"
+
+
+# Deep keeps the original models; fast trades reasoning for latency
+ROUTES: Dict[Tier, Dict[str, str]] = {
+    Tier.DEEP: {"lodging": DEEPSEEK_R1, "food": DEEPSEEK_R1, "travel": CLAUDE_SONNET},
+    Tier.FAST: {"lodging": CLAUDE_HAIKU, "food": CLAUDE_HAIKU, "travel": CLAUDE_HAIKU},
+}
+
+
+@dataclass(frozen=True)
+class Route:
+    tier: Tier
+    model: ModelProfile
+
+
+class ModelRouter:
+    """Picks a model tier per recommendation request.
+
+    The automatic policy watches how many model streams are in flight. Above
+    high_watermark it routes new requests to the fast tier, and it only goes
+    back to the deep tier once load drops to low_watermark, so it does not
+    flap around a single threshold.
+    """
+
+    def __init__(self, high_watermark: int = 8, low_watermark: int = 4) -> None:
+        self.high_watermark = high_watermark
+        self.low_watermark = min(low_watermark, high_watermark)
+        self.in_flight = 0
+        self.degraded = False
+        self._lock = threading.Lock()
+        _routers.add(self)
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        return cls(
+            high_watermark=int(os.getenv("ROUTING_FAST_ABOVE", "8")),
+            low_watermark=int(os.getenv("ROUTING_DEEP_BELOW", "4")),
+        )
+
+    def _auto_tier(self) -> Tier:
+        with self._lock:
+            if self.in_flight >= self.high_watermark:
+                self.degraded = True
+            elif self.in_flight <= self.low_watermark:
+                self.degraded = False
+            return Tier.FAST if self.degraded else Tier.DEEP
+
+    def route(self, recommendation_type: str, requested: Tier = Tier.AUTO) -> Route:
+        tier = self._auto_tier() if requested == Tier.AUTO else requested
+        routing_decisions.add(
+            1, {"recommendation.type": recommendation_type, "requested": requested.value, "tier": tier.value}
+        )
+        return Route(tier, profile(ROUTES[tier][recommendation_type]))
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count a model stream as in flight for the duration of the block."""
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Must match the metrics the CDK scaling policies track (backend/component.py)
+NAMESPACE = "TripPlanner"
+
+
+def emf_record(service: str, values: Dict[str, float], timestamp: Optional[float] = None) -> Dict[str, Any]:
+    """CloudWatch Embedded Metric Format document for one sample of each metric."""
+    return {
+        "_aws": {
+            "Timestamp": int((timestamp if timestamp is not None else time.time()) * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": NAMESPACE,
+                    "Dimensions": [["Service"]],
+                    "Metrics": [{"Name": name, "Unit": "Count"} for name in values],
+                }
+            ],
+        },
+        "Service": service,
+        **values,
+    }
+
+
+class ScalingMetricsReporter:
+    """Writes the metrics the service autoscales on to stdout, in CloudWatch Embedded Metric Format.
+
+    ECS ships stdout to CloudWatch Logs, which turns each line into metrics.
+    Every worker process reports its own values, so the scaling policies
+    track the average per worker.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        probes: Dict[str, Callable[[], float]],
+        interval: float = 60.0,
+        stream: TextIO = sys.stdout,
+    ) -> None:
+        self.service = service
+        self.probes = probes
+        self.interval = interval
+        self.stream = stream
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, probes: Dict[str, Callable[[], float]]) -> "ScalingMetricsReporter":
+        # Only report by default when running as an ECS task
+        default = "60" if os.getenv("ECS_CONTAINER_METADATA_URI_V4") else "0"
+        return cls(
+            os.getenv("SCALING_METRICS_SERVICE", "backend"),
+            probes,
+            interval=float(os.getenv("SCALING_METRICS_INTERVAL", default)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def report(self) -> None:
+        values = {name: probe() for name, probe in self.probes.items()}
+        self.stream.write(json.dumps(emf_record(self.service, values), separators=(",", ":")) + "\n")
+        self.stream.flush()
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="scaling-metrics")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.report()
+            except Exception:
+                logger.exception("Reporting scaling metrics failed")
+            await asyncio.sleep(self.interval)
@@ -1,81 +1,201 @@
 import datetime
-import os
-import re
-from typing import Optional
+import json
+from typing import Any, Dict, Iterable, Optional
 
-import boto3
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from .compression import CompressedText, compress_text, decompress_text, wrap_compressed
+from .coordination import WorkerBus
+from .http_cache import content_etag
+from .normalization import trip_keys
+from .persistence import WriteBehindQueue
+from .storage import TripStore, create_store
+from .trip_cache import CachedTripStore, TripCache
+
+# Bookkeeping attributes stored next to each recommendation, left out of the plan body and its ETag
+METADATA_SUFFIXES = ("_etag", "_tier", "_size", "_job")
 
 
 class TripPlan(BaseModel):
     id: str
     origin: str = Field(default="San Francisco")
-    from_date: datetime.date = Field(default=datetime.date.today())
-    to_date: datetime.date = Field(
-        default=datetime.date.today() + datetime.timedelta(days=7)
-    )
+    # Factories, so long-running workers don't keep the date they were started on
+    from_date: datetime.date = Field(default_factory=datetime.date.today)
+    # Defaults to a week after from_date
+    to_date: Optional[datetime.date] = None
     destination: str = Field(default="NYC")
-    budget: int = Field(default=1000)
+    budget: int = Field(default=1000, ge=0)
+
+    @field_validator("id")
+    @classmethod
+    def _plain_id(cls, value: str) -> str:
+        # Stores key a trip's details as "<id>#<name>"
+        if "#" in value:
+            raise ValueError("must not contain '#'")
+        return value
+
+    @field_validator("origin", "destination")
+    @classmethod
+    def _not_blank(cls, value: str) -> str:
+        # Kept as typed; the canonical destination is stored as a derived key
+        if not value.strip():
+            raise ValueError("must not be blank")
+        return value
+
+    @model_validator(mode="after")
+    def _default_to_date(self) -> "TripPlan":
+        if self.to_date is None:
+            self.to_date = self.from_date + datetime.timedelta(days=7)
+        elif self.to_date < self.from_date:
+            raise ValueError("to_date must not be before from_date")
+        return self
 
 
 class TripPlanningService:
-    def __init__(self) -> None:
-        self.dynamodb = boto3.resource(
-            "dynamodb",
-            endpoint_url=os.getenv("DYNAMODB_ENDPOINT", "http://localhost:8000"),
-            region_name="us-east-1",
-            aws_access_key_id="dummy",
-            aws_secret_access_key="dummy",
-        )  # type: ignore
+    def __init__(
+        self,
+        store: Optional[TripStore] = None,
+        writer: Optional[WriteBehindQueue] = None,
+        cache: Optional[TripCache] = None,
+        bus: Optional[WorkerBus] = None,
+    ) -> None:
+        store = store if store is not None else create_store()
+        self.cache = cache if cache is not None else TripCache.from_env()
+        self.bus = bus if bus is not None else WorkerBus.from_env()
+        # Every read and write, including write-behind flushes, goes through the cache
+        self.store = (
+            CachedTripStore(store, self.cache, on_change=self._trip_changed) if self.cache.enabled else store
+        )
+        # Other worker processes drop their cached copy of a trip this one wrote
+        self.bus.subscribe("trip_changed", lambda message: self.cache.invalidate(message["id"]))
+        self.writer = writer if writer is not None else WriteBehindQueue.from_env(self.store)
 
-    def add_trip(self, new_trip_plan: TripPlan) -> None:
-        # Create table if it doesn't exist
-        try:
-            table = self.dynamodb.Table("trip-history")  # type: ignore
-            table.load()
-        except:
-            table = self.dynamodb.create_table(  # pyright: ignore[reportAttributeAccessIssue]
-                TableName="trip-history",
-                KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
-                AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
-                BillingMode="PAY_PER_REQUEST",
-            )
-            table.wait_until_exists()
+    def _trip_changed(self, _id: str) -> None:
+        self.bus.publish("trip_changed", id=_id)
 
+    def add_trip(self, new_trip_plan: TripPlan) -> None:
         item = new_trip_plan.model_dump()
         item["from_date"] = str(item["from_date"])
         item["to_date"] = str(item["to_date"])
-        table.put_item(Item=item)  # type: ignore)
+        # Stored with the trip so caches and indexes can group trips without parsing them again
+        item.update(
+            trip_keys(new_trip_plan.destination, new_trip_plan.from_date, new_trip_plan.to_date, new_trip_plan.budget)
+        )
+        self.store.put_trip(item)
 
     def get_trip(self, _id: str):
-        table = self.dynamodb.Table("trip-history")  # type: ignore
-        result = table.get_item(Key={"id": _id})
-
-        if not result.get("Item"):
-            return None
-
-        return result["Item"]
+        """Trip with its recommendations; compressed ones are decompressed on first use."""
+        trip = self.store.get_trip(_id)
+        if trip is not None:
+            # Recommendations still queued for write-behind are already visible
+            trip.update(self.writer.overlay(_id))
+            wrap_compressed(trip)
+        return trip
+
+    def get_trip_attributes(self, _id: str, names: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """A few attributes of a trip, read without loading its recommendations unless it is cached."""
+        names = list(names)
+        attributes = self.store.get_attributes(_id, names)
+        if attributes is not None:
+            overlay = self.writer.overlay(_id)
+            attributes.update({name: overlay[name] for name in names if name in overlay})
+        return attributes
 
     def get_trip_recommendation(self, _id: str, recommendation_type) -> Optional[str]:
-        table = self.dynamodb.Table("trip-history")  # type: ignore
-        record = table.get_item(Key={"id": _id})
+        record = self.get_trip(_id)
 
-        if not record["Item"][recommendation_type]:
+        if not record or not record.get(recommendation_type):
             return None
 
-        return record["Item"][recommendation_type]
+        return str(record[recommendation_type])
+
+    def get_fresh_recommendation(self, _id: str, recommendation_type: str) -> Optional[str]:
+        """A recommendation read past the cache, e.g. one another worker just stored."""
+        self.cache.invalidate(_id)
+        return self.get_trip_recommendation(_id, recommendation_type)
+
+    def get_trip_reasoning(self, _id: str, recommendation_type: str) -> Optional[str]:
+        """Reasoning trace behind a recommendation, loaded separately from the trip."""
+        name = f"{recommendation_type}_reasoning"
+        value = self.writer.pending_detail(_id, name)
+        if value is None:
+            value = self.store.get_detail(_id, name)
+        return decompress_text(value)
+
+    async def checkpoint_recommendation(self, _id: str, recommendation_type: str, partial: str) -> None:
+        """Queue the output so far of a recommendation being generated, kept apart from the trip."""
+        await self.writer.put(_id, details={f"{recommendation_type}_checkpoint": compress_text(partial)})
+
+    def get_recommendation_checkpoint(self, _id: str, recommendation_type: str) -> Optional[str]:
+        """Last checkpoint of a recommendation that has not finished, if there is one."""
+        name = f"{recommendation_type}_checkpoint"
+        value = self.writer.pending_detail(_id, name)
+        if value is None:
+            value = self.store.get_detail(_id, name)
+        return decompress_text(value) or None
 
     def set_trip_recommendation(
         self, _id: str, recommendation_type: str, recommendation: str
     ) -> None:
-        table = self.dynamodb.Table("trip-history")  # type: ignore
-        record = table.get_item(Key={"id": _id})
-
-        if not record.get("Item"):
-            return
-
-        table.update_item(
-            Key={"id": _id},
-            UpdateExpression=f"SET {recommendation_type} = :val",
-            ExpressionAttributeValues={":val": recommendation},
-        )
+        self.store.set_attribute(_id, recommendation_type, compress_text(recommendation))
+
+    async def save_trip_recommendation(
+        self,
+        _id: str,
+        recommendation_type: str,
+        recommendation: str,
+        reasoning: Optional[str] = None,
+        tier: Optional[str] = None,
+    ) -> None:
+        # The finished recommendation supersedes any checkpoint of it
+        details = {f"{recommendation_type}_checkpoint": ""}
+        if reasoning:
+            details[f"{recommendation_type}_reasoning"] = compress_text(reasoning)
+        attributes = {
+            recommendation_type: compress_text(recommendation),
+            f"{recommendation_type}_etag": content_etag(reasoning or "", recommendation),
+            f"{recommendation_type}_size": len(recommendation.encode("utf-8")),
+        }
+        if tier:
+            # Lets a deep-tier request tell a fast-tier answer apart and regenerate it
+            attributes[f"{recommendation_type}_tier"] = tier
+        await self.writer.put(_id, attributes, details)
+
+    def save_job(self, _id: str, recommendation_type: str, status: Dict[str, Any]) -> bool:
+        """Record a recommendation job's progress on its trip, written through so pollers see it at once."""
+        return self.store.set_attribute(_id, f"{recommendation_type}_job", json.dumps(status))
+
+    def get_job(self, _id: str, recommendation_type: str) -> Optional[Dict[str, Any]]:
+        """Latest recorded job for a recommendation, read past the cache as it may run on another worker."""
+        self.cache.invalidate(_id)
+        record = self.store.get_trip(_id)
+        value = record.get(f"{recommendation_type}_job") if record else None
+        return json.loads(value) if value else None
+
+    def get_recommendation_etag(self, record, recommendation_type: str) -> str:
+        """Content hash of a finished recommendation, stored with it when it was saved."""
+        etag = record.get(f"{recommendation_type}_etag")
+        if etag:
+            return etag
+        # Recommendations saved before ETags were stored hash their stored bytes
+        value = record[recommendation_type]
+        return content_etag(value.raw if isinstance(value, CompressedText) else value)
+
+    def get_recommendation_size(self, record, recommendation_type: str) -> int:
+        """UTF-8 size of a finished recommendation, stored with it so it is known without decompressing."""
+        size = record.get(f"{recommendation_type}_size")
+        if size is not None:
+            return int(size)
+        # Recommendations saved before sizes were stored report their stored bytes
+        value = record[recommendation_type]
+        return len(value.raw) if isinstance(value, CompressedText) else len(str(value).encode("utf-8"))
+
+    def get_trip_etag(self, record) -> str:
+        """Version of a trip's plan body, derived without decompressing anything."""
+        parts = []
+        for name, value in sorted(record.items()):
+            if name.endswith(METADATA_SUFFIXES):
+                # Job progress and the like change without changing the plan
+                continue
+            parts += [name, value.raw if isinstance(value, CompressedText) else value]
+        return content_etag(*parts)
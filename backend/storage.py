@@ -0,0 +1,353 @@
+import copy
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional
+
+from .telemetry import dynamodb_span
+
+# Columns every trip has; anything else (recommendations) is a named attribute
+TRIP_FIELDS = ("id", "origin", "from_date", "to_date", "destination", "budget")
+
+
+class TripStore(ABC):
+    """Storage engine behind TripPlanningService.
+
+    A trip is a flat dict of TRIP_FIELDS plus any attributes set on it later,
+    such as the stored recommendations. Details are large values (reasoning
+    traces) kept apart from the trip so that reading a trip never loads them.
+    """
+
+    @abstractmethod
+    def put_trip(self, item: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def get_trip(self, _id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def set_attributes(self, _id: str, attributes: Dict[str, Any]) -> bool:
+        """Set attributes on an existing trip in one write. Returns False if there is no such trip."""
+
+    def set_attribute(self, _id: str, name: str, value: Any) -> bool:
+        return self.set_attributes(_id, {name: value})
+
+    def get_attributes(self, _id: str, names: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Just the named attributes of a trip (missing ones as None), or None if there is no such trip."""
+        item = self.get_trip(_id)
+        return {name: item.get(name) for name in names} if item is not None else None
+
+    @abstractmethod
+    def get_detail(self, _id: str, name: str) -> Any: ...
+
+    @abstractmethod
+    def set_detail(self, _id: str, name: str, value: Any) -> None: ...
+
+    def write(self, _id: str, attributes: Dict[str, Any], details: Dict[str, Any]) -> bool:
+        """Apply attribute and detail updates for a trip. Returns False if there is no such trip."""
+        if attributes and not self.set_attributes(_id, attributes):
+            return False
+        for name, value in details.items():
+            self.set_detail(_id, name, value)
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryTripStore(TripStore):
+    """Process-local dict engine for tests, benchmarks and throwaway runs."""
+
+    def __init__(self) -> None:
+        self._trips: Dict[str, Dict[str, Any]] = {}
+        self._details: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def put_trip(self, item: Dict[str, Any]) -> None:
+        with self._lock:
+            self._trips[item["id"]] = dict(item)
+            self._details.pop(item["id"], None)
+
+    def get_trip(self, _id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._trips.get(_id)
+            # Callers may mutate what they get back
+            return copy.copy(item) if item is not None else None
+
+    def set_attributes(self, _id: str, attributes: Dict[str, Any]) -> bool:
+        with self._lock:
+            item = self._trips.get(_id)
+            if item is None:
+                return False
+            item.update(attributes)
+            return True
+
+    def get_attributes(self, _id: str, names: Iterable[str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._trips.get(_id)
+            return {name: item.get(name) for name in names} if item is not None else None
+
+    def get_detail(self, _id: str, name: str) -> Any:
+        with self._lock:
+            return self._details.get(_id, {}).get(name)
+
+    def set_detail(self, _id: str, name: str, value: Any) -> None:
+        with self._lock:
+            self._details.setdefault(_id, {})[name] = value
+
+
+class SQLiteTripStore(TripStore):
+    """Single-node engine backed by a SQLite database in WAL mode."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS trips (
+            id TEXT PRIMARY KEY,
+            origin TEXT NOT NULL,
+            from_date TEXT NOT NULL,
+            to_date TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            budget INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS trip_attributes (
+            trip_id TEXT NOT NULL REFERENCES trips (id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            value,
+            PRIMARY KEY (trip_id, name)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS trip_details (
+            trip_id TEXT NOT NULL REFERENCES trips (id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            value,
+            PRIMARY KEY (trip_id, name)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS trips_destination_dates ON trips (destination, from_date);
+    """
+
+    def __init__(self, path: str = "trips.db") -> None:
+        # One connection shared across threads; the lock serialises access
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL with synchronous=NORMAL stays consistent, only the last commit can be lost on power failure
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(self.SCHEMA)
+
+    def put_trip(self, item: Dict[str, Any]) -> None:
+        fields = {name: item[name] for name in TRIP_FIELDS}
+        attributes = [(item["id"], name, value) for name, value in item.items() if name not in TRIP_FIELDS]
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            # Replacing a trip also drops its old attributes and details via the cascade
+            self._conn.execute(
+                "INSERT OR REPLACE INTO trips (id, origin, from_date, to_date, destination, budget) "
+                "VALUES (:id, :origin, :from_date, :to_date, :destination, :budget)",
+                fields,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO trip_attributes (trip_id, name, value) VALUES (?, ?, ?)", attributes
+            )
+
+    def get_trip(self, _id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM trips WHERE id = ?", (_id,)).fetchone()
+            if row is None:
+                return None
+            attributes = self._conn.execute(
+                "SELECT name, value FROM trip_attributes WHERE trip_id = ?", (_id,)
+            ).fetchall()
+        item = dict(row)
+        item.update({attribute["name"]: attribute["value"] for attribute in attributes})
+        return item
+
+    def get_attributes(self, _id: str, names: Iterable[str]) -> Optional[Dict[str, Any]]:
+        names = list(names)
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM trips WHERE id = ?", (_id,)).fetchone() is None:
+                return None
+            rows = self._conn.execute(
+                f"SELECT name, value FROM trip_attributes WHERE trip_id = ? AND name IN ({', '.join('?' * len(names))})",
+                (_id, *names),
+            ).fetchall()
+        found = {row["name"]: row["value"] for row in rows}
+        return {name: found.get(name) for name in names}
+
+    def set_attributes(self, _id: str, attributes: Dict[str, Any]) -> bool:
+        for name in attributes:
+            if name in TRIP_FIELDS:
+                raise ValueError(f"{name} is a trip field, not an attribute")
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO trip_attributes (trip_id, name, value) VALUES (?, ?, ?)",
+                        [(_id, name, value) for name, value in attributes.items()],
+                    )
+            except sqlite3.IntegrityError:
+                # Foreign key violation: the trip does not exist
+                return False
+        return True
+
+    def get_detail(self, _id: str, name: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM trip_details WHERE trip_id = ? AND name = ?", (_id, name)
+            ).fetchone()
+        return row["value"] if row else None
+
+    def set_detail(self, _id: str, name: str, value: Any) -> None:
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO trip_details (trip_id, name, value) VALUES (?, ?, ?)",
+                    (_id, name, value),
+                )
+            except sqlite3.IntegrityError:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Trip item attribute listing the names of its detail items, so replacing the trip can delete them
+DETAIL_NAMES = "detail_names"
+
+
+class DynamoDBTripStore(TripStore):
+    """DynamoDB engine. Details are stored as separate items keyed "<trip id>#<name>".
+
+    Trip ids must not contain "#", or one trip's id could name another's detail item.
+    """
+
+    def __init__(self, table_name: str = "trip-history", endpoint_url: Optional[str] = None) -> None:
+        # Imported here so the memory and SQLite engines don't load boto3
+        import boto3
+
+        self.table_name = table_name
+        self.dynamodb = boto3.resource(
+            "dynamodb",
+            endpoint_url=endpoint_url,
+            region_name="us-east-1",
+            aws_access_key_id="dummy",
+            aws_secret_access_key="dummy",
+        )  # type: ignore
+        self.table = self.dynamodb.Table(table_name)  # type: ignore
+        self._table_ready = False
+
+    def _ensure_table(self) -> None:
+        # Create table if it doesn't exist; checked once per process rather than on every write
+        if self._table_ready:
+            return
+        try:
+            with dynamodb_span("DescribeTable", self.table_name):
+                self.table.load()
+        except Exception:
+            with dynamodb_span("CreateTable", self.table_name):
+                self.table = self.dynamodb.create_table(  # pyright: ignore[reportAttributeAccessIssue]
+                    TableName=self.table_name,
+                    KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+                    AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+                    BillingMode="PAY_PER_REQUEST",
+                )
+                self.table.wait_until_exists()
+        self._table_ready = True
+
+    def put_trip(self, item: Dict[str, Any]) -> None:
+        if "#" in item["id"]:
+            raise ValueError(f"Trip id must not contain '#': {item['id']!r}")
+        self._ensure_table()
+        with dynamodb_span("PutItem", self.table_name):
+            result = self.table.put_item(Item=item, ReturnValues="ALL_OLD")
+        # Replacing a trip also drops the details of the one it replaces
+        old_details = result.get("Attributes", {}).get(DETAIL_NAMES, ())
+        if old_details:
+            with dynamodb_span("BatchWriteItem", self.table_name):
+                with self.table.batch_writer() as batch:
+                    for name in old_details:
+                        batch.delete_item(Key={"id": f"{item['id']}#{name}"})
+
+    def get_trip(self, _id: str) -> Optional[Dict[str, Any]]:
+        if "#" in _id:
+            return None
+        with dynamodb_span("GetItem", self.table_name):
+            result = self.table.get_item(Key={"id": _id})
+        item = result.get("Item")
+        if not item:
+            return None
+        item.pop(DETAIL_NAMES, None)
+        return item
+
+    def get_attributes(self, _id: str, names: Iterable[str]) -> Optional[Dict[str, Any]]:
+        if "#" in _id:
+            return None
+        names = list(names)
+        placeholders = {f"#a{index}": name for index, name in enumerate(names)}
+        with dynamodb_span("GetItem", self.table_name):
+            result = self.table.get_item(
+                Key={"id": _id},
+                # The id tells an existing trip without those attributes from a missing one
+                ProjectionExpression=", ".join(["id", *placeholders]),
+                ExpressionAttributeNames=placeholders,
+            )
+        item = result.get("Item")
+        return {name: item.get(name) for name in names} if item else None
+
+    def set_attributes(self, _id: str, attributes: Dict[str, Any]) -> bool:
+        names = {f"#a{index}": name for index, name in enumerate(attributes)}
+        values = {f":v{index}": value for index, value in enumerate(attributes.values())}
+        assignments = ", ".join(f"#a{index} = :v{index}" for index in range(len(attributes)))
+        try:
+            with dynamodb_span("UpdateItem", self.table_name):
+                self.table.update_item(
+                    Key={"id": _id},
+                    UpdateExpression=f"SET {assignments}",
+                    # Only update trips that exist instead of creating a partial item
+                    ConditionExpression="attribute_exists(id)",
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values,
+                )
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+    def get_detail(self, _id: str, name: str) -> Any:
+        with dynamodb_span("GetItem", self.table_name):
+            result = self.table.get_item(Key={"id": f"{_id}#{name}"})
+        item = result.get("Item")
+        return item["value"] if item else None
+
+    def set_detail(self, _id: str, name: str, value: Any) -> None:
+        self._ensure_table()
+        try:
+            # Recorded on the trip before the detail is written, so no detail item outlives its trip
+            with dynamodb_span("UpdateItem", self.table_name):
+                self.table.update_item(
+                    Key={"id": _id},
+                    UpdateExpression="ADD #names :name",
+                    ConditionExpression="attribute_exists(id)",
+                    ExpressionAttributeNames={"#names": DETAIL_NAMES},
+                    ExpressionAttributeValues={":name": {name}},
+                )
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return
+        with dynamodb_span("PutItem", self.table_name):
+            self.table.put_item(Item={"id": f"{_id}#{name}", "trip_id": _id, "value": value})
+
+
+def create_store() -> TripStore:
+    """Build the engine selected by TRIP_STORE (dynamodb, memory or sqlite)."""
+    engine = os.getenv("TRIP_STORE", "dynamodb").lower()
+    if engine == "memory":
+        return MemoryTripStore()
+    if engine == "sqlite":
+        return SQLiteTripStore(os.getenv("TRIP_STORE_PATH", "trips.db"))
+    if engine == "dynamodb":
+        return DynamoDBTripStore(
+            table_name=os.getenv("DYNAMODB_TABLE_NAME", "trip-history"),
+            endpoint_url=os.getenv("DYNAMODB_ENDPOINT", "http://localhost:8000"),
+        )
+    raise ValueError(f"Unknown TRIP_STORE engine: {engine}")
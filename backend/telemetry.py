@@ -0,0 +1,233 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
+
+from opentelemetry import metrics, propagate, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+if TYPE_CHECKING:
+    from strands.hooks import AfterToolCallEvent, BeforeToolCallEvent, HookRegistry
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "trip-planning-backend")
+
+# Instruments are created against the global proxies and bind to the real
+# providers once setup_telemetry() runs
+tracer = trace.get_tracer("trip_planning.backend")
+meter = metrics.get_meter("trip_planning.backend")
+
+request_duration = meter.create_histogram(
+    "trip_planner.http.request.duration", unit="s", description="HTTP request duration, including streaming"
+)
+time_to_first_token = meter.create_histogram(
+    "trip_planner.recommendation.time_to_first_token", unit="s", description="Time until the model's first token"
+)
+tokens_per_second = meter.create_histogram(
+    "trip_planner.recommendation.tokens_per_second", unit="{token}/s", description="Model output rate after the first token"
+)
+tool_duration = meter.create_histogram(
+    "trip_planner.tool.duration", unit="s", description="Agent tool call latency (MCP round trip)"
+)
+dynamodb_duration = meter.create_histogram(
+    "trip_planner.dynamodb.duration", unit="s", description="DynamoDB operation latency"
+)
+# Hit ratio is hits / (hits + misses) over this counter's "result" attribute
+cache_lookups = meter.create_counter(
+    "trip_planner.cache.lookups", description="Recommendation cache lookups by result (hit/miss)"
+)
+
+# Model streams waiting for their first token: requests queued or throttled at Bedrock
+awaiting_first_token = meter.create_up_down_counter(
+    "trip_planner.recommendation.awaiting_first_token", description="Model streams waiting for their first token"
+)
+_awaiting_first_token = 0
+
+_configured = False
+
+
+def _otlp_enabled() -> bool:
+    return bool(
+        os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+    )
+
+
+def setup_telemetry() -> None:
+    """Install tracer and meter providers.
+
+    Metrics are always exposed on /metrics. Traces and metrics are also pushed
+    over OTLP/HTTP when OTEL_EXPORTER_OTLP_ENDPOINT points at a collector.
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    from opentelemetry.exporter.prometheus import PrometheusMetricReader
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    resource = Resource.create({"service.name": SERVICE_NAME})
+    tracer_provider = TracerProvider(resource=resource)
+    readers = [PrometheusMetricReader()]
+
+    if _otlp_enabled():
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        tracer_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        readers.append(PeriodicExportingMetricReader(OTLPMetricExporter()))
+
+    # Strands emits its own agent, model and tool spans against the global provider
+    trace.set_tracer_provider(tracer_provider)
+    metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=readers))
+
+
+def metrics_payload() -> tuple[bytes, str]:
+    """Prometheus exposition of every metric, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class TelemetryMiddleware:
+    """ASGI middleware that opens a server span per request.
+
+    Unlike BaseHTTPMiddleware, the span stays open until the last body chunk
+    is sent, so streamed recommendations are timed end to end.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        with tracer.start_as_current_span(
+            method, context=propagate.extract(headers), kind=SpanKind.SERVER
+        ) as span:
+            span.set_attribute("http.request.method", method)
+            span.set_attribute("url.path", scope["path"])
+
+            async def send_wrapper(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    span.set_attribute("http.response.status_code", status_code)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                span.update_name(f"{method} {route}")
+                span.set_attribute("http.route", route)
+                if status_code >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
+                request_duration.record(
+                    time.perf_counter() - started,
+                    {"http.request.method": method, "http.route": route, "http.response.status_code": status_code},
+                )
+
+
+@contextmanager
+def dynamodb_span(operation: str, table: str):
+    """Span and latency measurement for a single DynamoDB call."""
+    started = time.perf_counter()
+    with tracer.start_as_current_span(f"DynamoDB.{operation}", kind=SpanKind.CLIENT) as span:
+        span.set_attribute("db.system", "dynamodb")
+        span.set_attribute("db.operation", operation)
+        span.set_attribute("aws.dynamodb.table_names", [table])
+        try:
+            yield span
+        finally:
+            dynamodb_duration.record(time.perf_counter() - started, {"db.operation": operation})
+
+
+def bedrock_queue_depth() -> int:
+    """Model streams in this process still waiting for their first token."""
+    return _awaiting_first_token
+
+
+def record_cache_lookup(recommendation_type: str, hit: bool) -> None:
+    cache_lookups.add(1, {"recommendation.type": recommendation_type, "result": "hit" if hit else "miss"})
+
+
+class ToolLatencyHooks:
+    """Strands hook provider that times each tool call the agent makes."""
+
+    def __init__(self) -> None:
+        self._started: Dict[str, float] = {}
+
+    def register_hooks(self, registry: "HookRegistry", **kwargs: Any) -> None:
+        from strands.hooks import AfterToolCallEvent, BeforeToolCallEvent
+
+        registry.add_callback(BeforeToolCallEvent, self._before)
+        registry.add_callback(AfterToolCallEvent, self._after)
+
+    def _before(self, event: "BeforeToolCallEvent") -> None:
+        self._started[event.tool_use["toolUseId"]] = time.perf_counter()
+
+    def _after(self, event: "AfterToolCallEvent") -> None:
+        started = self._started.pop(event.tool_use["toolUseId"], None)
+        if started is None:
+            return
+        status = (event.result or {}).get("status", "unknown")
+        tool_duration.record(
+            time.perf_counter() - started, {"tool.name": event.tool_use["name"], "tool.status": status}
+        )
+
+
+async def instrumented_stream(
+    events: AsyncIterator[Dict[str, Any]], recommendation_type: str, model_id: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """Pass agent stream events through while recording token timings."""
+    global _awaiting_first_token
+    attributes = {"recommendation.type": recommendation_type, "gen_ai.request.model": model_id}
+    started = time.perf_counter()
+    first_token: Optional[float] = None
+    chunks = 0
+    output_tokens: Optional[int] = None
+
+    def got_first_token() -> None:
+        global _awaiting_first_token
+        _awaiting_first_token -= 1
+        awaiting_first_token.add(-1, attributes)
+
+    _awaiting_first_token += 1
+    awaiting_first_token.add(1, attributes)
+    with tracer.start_as_current_span("recommendation.stream", attributes=attributes) as span:
+        try:
+            async for event in events:
+                if "data" in event or "reasoningText" in event:
+                    chunks += 1
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                        got_first_token()
+                        time_to_first_token.record(first_token - started, attributes)
+                        span.add_event("first_token")
+                if "result" in event:
+                    usage = getattr(getattr(event["result"], "metrics", None), "accumulated_usage", None) or {}
+                    output_tokens = usage.get("outputTokens")
+                yield event
+        finally:
+            if first_token is None:
+                got_first_token()
+
+        tokens = output_tokens or chunks
+        span.set_attribute("gen_ai.usage.output_tokens", tokens)
+        if first_token is not None:
+            elapsed = time.perf_counter() - first_token
+            if elapsed > 0:
+                tokens_per_second.record(tokens / elapsed, attributes)
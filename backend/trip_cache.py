@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from opentelemetry.metrics import Observation
+
+from .storage import TripStore
+from .telemetry import meter
+
+# Hit ratio is hits / (hits + misses) over this counter's "result" attribute
+trip_cache_lookups = meter.create_counter(
+    "trip_planner.trip_cache.lookups", description="Trip cache lookups by result (hit/miss)"
+)
+trip_cache_evictions = meter.create_counter(
+    "trip_planner.trip_cache.evictions", description="Trip cache evictions by reason (capacity/expired)"
+)
+
+_caches: "weakref.WeakSet[TripCache]" = weakref.WeakSet()
+meter.create_observable_gauge(
+    "trip_planner.trip_cache.size",
+    callbacks=[lambda options: [Observation(sum(cache.size for cache in list(_caches)))]],
+    unit="By",
+    description="Bytes held by trip caches",
+)
+
+# Rough per-entry and per-attribute bookkeeping cost on top of the values themselves
+ENTRY_OVERHEAD = 256
+ATTRIBUTE_OVERHEAD = 64
+
+
+def item_size(item: Dict[str, Any]) -> int:
+    """Approximate memory held by a cached trip, dominated by recommendation texts."""
+    size = ENTRY_OVERHEAD
+    for name, value in item.items():
+        size += ATTRIBUTE_OVERHEAD + len(name)
+        raw = getattr(value, "value", value)
+        if isinstance(raw, (str, bytes, bytearray)):
+            size += len(raw)
+    return size
+
+
+class TripCache:
+    """LRU of trip records bounded by total size in bytes, with a TTL per entry."""
+
+    def __init__(
+        self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        # Bumped on every write so a read that raced with one is not cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches.add(self)
+
+    @classmethod
+    def from_env(cls) -> "TripCache":
+        return cls(
+            max_bytes=int(os.getenv("TRIP_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl=float(os.getenv("TRIP_CACHE_TTL", "300")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, _id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(_id)
+            if entry is not None and entry[0] <= self._clock():
+                self._remove(_id, "expired")
+                entry = None
+            if entry is None:
+                self.misses += 1
+                trip_cache_lookups.add(1, {"result": "miss"})
+                return None
+            self._entries.move_to_end(_id)
+            self.hits += 1
+            trip_cache_lookups.add(1, {"result": "hit"})
+            # Callers may mutate what they get back
+            return dict(entry[2])
+
+    def put(self, _id: str, item: Dict[str, Any], generation: Optional[int] = None) -> None:
+        """Cache a trip. With a generation, skip it if any write happened since that generation was read."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._insert(_id, dict(item))
+
+    def update(self, _id: str, attributes: Dict[str, Any]) -> None:
+        """Write-through of new attributes into a cached trip, if it is cached."""
+        with self._lock:
+            self.generation += 1
+            entry = self._entries.get(_id)
+            if entry is not None:
+                self._insert(_id, {**entry[2], **attributes})
+
+    def invalidate(self, _id: str) -> None:
+        with self._lock:
+            self.generation += 1
+            if _id in self._entries:
+                self._remove(_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _insert(self, _id: str, item: Dict[str, Any]) -> None:
+        if _id in self._entries:
+            self._remove(_id)
+        size = item_size(item)
+        if size > self.max_bytes:
+            return
+        self._entries[_id] = (self._clock() + self.ttl, size, item)
+        self.size += size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)), "capacity")
+
+    def _remove(self, _id: str, reason: Optional[str] = None) -> None:
+        _, size, _ = self._entries.pop(_id)
+        self.size -= size
+        if reason:
+            self.evictions += 1
+            trip_cache_evictions.add(1, {"reason": reason})
+
+
+class CachedTripStore(TripStore):
+    """Read-through, write-through TripCache in front of another engine.
+
+    Details are large and rarely read, so they bypass the cache. on_change is
+    called with the trip id after every write, so other processes can drop
+    their copy.
+    """
+
+    def __init__(
+        self, store: TripStore, cache: TripCache, on_change: Optional[Callable[[str], None]] = None
+    ) -> None:
+        self.store = store
+        self.cache = cache
+        self.on_change = on_change
+
+    def _changed(self, _id: str) -> None:
+        if self.on_change is not None:
+            self.on_change(_id)
+
+    def put_trip(self, item: Dict[str, Any]) -> None:
+        self.cache.invalidate(item["id"])
+        self.store.put_trip(item)
+        self.cache.put(item["id"], item)
+        self._changed(item["id"])
+
+    def get_trip(self, _id: str) -> Optional[Dict[str, Any]]:
+        item = self.cache.get(_id)
+        if item is not None:
+            return item
+        generation = self.cache.generation
+        item = self.store.get_trip(_id)
+        if item is not None:
+            self.cache.put(_id, item, generation)
+            # The cache keeps its own copy; the caller gets one it may mutate
+            item = dict(item)
+        return item
+
+    def set_attributes(self, _id: str, attributes: Dict[str, Any]) -> bool:
+        try:
+            updated = self.store.set_attributes(_id, attributes)
+        except Exception:
+            # The write may or may not have landed
+            self.cache.invalidate(_id)
+            self._changed(_id)
+            raise
+        if updated:
+            self.cache.update(_id, attributes)
+        else:
+            self.cache.invalidate(_id)
+        self._changed(_id)
+        return updated
+
+    def get_detail(self, _id: str, name: str) -> Any:
+        return self.store.get_detail(_id, name)
+
+    def set_detail(self, _id: str, name: str, value: Any) -> None:
+        self.store.set_detail(_id, name, value)
+
+    def close(self) -> None:
+        self.store.close()
@@ -0,0 +1,30 @@
+import asyncio
+import logging
+import signal
+
+from .main import app, begin_shutdown, job_worker, lifespan
+
+logger = logging.getLogger(__name__)
+
+
+async def serve() -> None:
+    """Run recommendation jobs without serving HTTP, until SIGTERM or SIGINT."""
+    stopping = asyncio.Event()
+
+    def stop() -> None:
+        begin_shutdown()
+        stopping.set()
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop)
+    if not job_worker.enabled:
+        logger.warning("JOB_WORKERS is 0, so this worker will not take any jobs")
+    # The app's lifespan starts the job worker and the write-behind queue, and drains both on the way out
+    async with lifespan(app):
+        await stopping.wait()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve())
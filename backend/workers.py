@@ -0,0 +1,53 @@
+import math
+import os
+import sys
+from typing import List, Optional
+
+from gunicorn.arbiter import Arbiter
+from uvicorn.server import Server
+from uvicorn_worker import UvicornWorker
+
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "60"))
+# Part of gunicorn's graceful timeout kept for the lifespan drain: generations and
+# recommendation jobs drain together, then stragglers get their cancel grace, then writes flush
+LIFESPAN_DRAIN = (
+    int(os.getenv("GENERATION_DRAIN_TIMEOUT", "25"))
+    + math.ceil(float(os.getenv("GENERATION_CANCEL_GRACE", "2")))
+    + int(os.getenv("WRITE_BEHIND_DRAIN_TIMEOUT", "10"))
+)
+
+
+class TripPlannerServer(Server):
+    """Uvicorn server that tells the app it is shutting down before it closes any connection.
+
+    Uvicorn only sends the lifespan shutdown event after open streams have
+    finished or been cut off, too late for the app to treat those streams as
+    part of the shutdown. The app's begin_shutdown hook, if it sets one on its
+    state, runs first instead.
+    """
+
+    async def shutdown(self, sockets: Optional[List] = None) -> None:
+        begin_shutdown = getattr(getattr(self.config.app, "state", None), "begin_shutdown", None)
+        if begin_shutdown is not None:
+            begin_shutdown()
+        await super().shutdown(sockets=sockets)
+
+
+class TripPlannerWorker(UvicornWorker):
+    """Gunicorn worker running uvicorn on uvloop with the httptools parser."""
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        # Streams get this long to finish after SIGTERM before their connections are closed
+        "timeout_graceful_shutdown": max(1, GRACEFUL_TIMEOUT - LIFESPAN_DRAIN),
+    }
+
+    async def _serve(self) -> None:
+        # UvicornWorker._serve, with the server that announces shutdown
+        self.config.app = self.wsgi
+        server = TripPlannerServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
@@ -0,0 +1,328 @@
+"""End-to-end benchmark for the trip planning backend.
+
+Runs the FastAPI app under uvicorn with a deterministic fake Bedrock model
+and any of the trip storage engines (memory, SQLite or DynamoDB Local), then
+measures:
+
+- POST /plan throughput and latency
+- time-to-first-byte and total stream time for each recommendation endpoint,
+  both while generating and when serving a stored recommendation
+- event-loop lag inside the server while under load
+- optionally, the app's cold start with a per-package import-time breakdown
+
+Results are written as JSON so runs can be compared for regressions.
+
+Usage:
+    python -m benchmarks.backend_bench --output results.json
+    python -m benchmarks.backend_bench --store sqlite --sqlite-path /tmp/bench.db
+    python -m benchmarks.backend_bench --store dynamodb --dynamodb-endpoint http://localhost:8000
+    python -m benchmarks.backend_bench --compare baseline.json --output results.json
+    python -m benchmarks.backend_bench --profile-startup --plans 0 --streams 0
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+
+from benchmarks.fakes import FakeStreamingModel, patch_backend
+from benchmarks.startup import format_profile, profile_imports
+
+RECOMMENDATION_TYPES = ("lodging", "food", "travel")
+
+# Metrics where a larger value is an improvement; everything else is a latency
+HIGHER_IS_BETTER = ("throughput_rps",)
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    """Percentile summary of samples given in seconds, reported in ms."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+class LagProbe:
+    """Measures how late the server's event loop wakes up from short sleeps."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self.running = True
+
+    async def run(self) -> None:
+        while self.running:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+
+class BackgroundServer:
+    """Runs uvicorn on its own thread and event loop."""
+
+    def __init__(self, app, port: int):
+        self.config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+        self.server = uvicorn.Server(self.config)
+        self.probe = LagProbe()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        probe = loop.create_task(self.probe.run())
+        loop.run_until_complete(self.server.serve())
+        self.probe.running = False
+        loop.run_until_complete(probe)
+        loop.close()
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _trip(index: int) -> Dict:
+    start = datetime.date(2030, 6, 1) + datetime.timedelta(days=index % 60)
+    return {
+        "id": f"bench-{uuid.uuid4().hex[:12]}",
+        "origin": "San Francisco",
+        "destination": ["Paris", "Tokyo", "New York", "Lisbon"][index % 4],
+        "from_date": start.isoformat(),
+        "to_date": (start + datetime.timedelta(days=7)).isoformat(),
+        "budget": 2000 + 250 * (index % 8),
+    }
+
+
+async def _bounded(concurrency: int, jobs):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(job):
+        async with semaphore:
+            return await job()
+
+    return await asyncio.gather(*(run(job) for job in jobs), return_exceptions=True)
+
+
+async def bench_plan_create(client: httpx.AsyncClient, count: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+
+    async def create(index: int):
+        nonlocal errors
+        started = time.perf_counter()
+        response = await client.post("/plan", json=_trip(index))
+        if response.status_code != 200:
+            errors += 1
+            return
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await _bounded(concurrency, [lambda i=i: create(i) for i in range(count)])
+    elapsed = time.perf_counter() - started
+    return {"throughput_rps": round(count / elapsed, 2), "errors": errors, "latency": _summary(latencies)}
+
+
+async def bench_stream(client: httpx.AsyncClient, trip_ids: List[str], kind: str, concurrency: int) -> Dict:
+    ttfb: List[float] = []
+    total: List[float] = []
+    sizes: List[int] = []
+    errors = 0
+
+    async def stream(trip_id: str):
+        nonlocal errors
+        started = time.perf_counter()
+        first: Optional[float] = None
+        size = 0
+        async with client.stream("GET", f"/plan/{trip_id}/recommendation/{kind}") as response:
+            async for chunk in response.aiter_raw():
+                if first is None and chunk:
+                    first = time.perf_counter() - started
+                size += len(chunk)
+        if response.status_code != 200 or first is None:
+            errors += 1
+            return
+        ttfb.append(first)
+        total.append(time.perf_counter() - started)
+        sizes.append(size)
+
+    started = time.perf_counter()
+    await _bounded(concurrency, [lambda t=t: stream(t) for t in trip_ids])
+    elapsed = time.perf_counter() - started
+    return {
+        "throughput_rps": round(len(trip_ids) / elapsed, 2),
+        "errors": errors,
+        "ttfb": _summary(ttfb),
+        "total": _summary(total),
+        "mean_bytes": round(statistics.fmean(sizes)) if sizes else 0,
+    }
+
+
+async def run_benchmark(args, base_url: str) -> Dict:
+    results: Dict = {}
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    timeout = httpx.Timeout(300.0)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        results["plan_create"] = await bench_plan_create(client, args.plans, args.concurrency)
+
+        results["recommendations"] = {}
+        results["stored_recommendations"] = {}
+        for kind in RECOMMENDATION_TYPES:
+            trip_ids = []
+            for index in range(args.streams):
+                trip = _trip(index)
+                await client.post("/plan", json=trip)
+                trip_ids.append(trip["id"])
+            results["recommendations"][kind] = await bench_stream(client, trip_ids, kind, args.concurrency)
+            # The second read is served from the stored recommendation
+            results["stored_recommendations"][kind] = await bench_stream(client, trip_ids, kind, args.concurrency)
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Describe metrics that regressed by more than threshold percent."""
+    old = _flatten(baseline["results"])
+    new = _flatten(current["results"])
+    regressions = []
+    for name, before in old.items():
+        after = new.get(name)
+        if after is None or not before or name.endswith(("count", "errors", "mean_bytes")):
+            continue
+        change = (after - before) / before * 100
+        if name.endswith(HIGHER_IS_BETTER):
+            change = -change
+        if change > threshold:
+            regressions.append(f"{name}: {before} -> {after} ({change:+.1f}% worse)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the trip planning backend")
+    parser.add_argument("--store", choices=["memory", "sqlite", "dynamodb"], default="memory")
+    parser.add_argument("--sqlite-path", default=":memory:", help="Database file for --store sqlite")
+    parser.add_argument("--dynamodb-endpoint", default="http://localhost:8000")
+    parser.add_argument("--plans", type=int, default=500, help="POST /plan requests")
+    parser.add_argument("--streams", type=int, default=50, help="Streams per recommendation type")
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--tokens", type=int, default=200, help="Response tokens per recommendation")
+    parser.add_argument("--reasoning-tokens", type=int, default=100, help="Reasoning tokens for lodging")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--first-token-latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    parser.add_argument(
+        "--profile-startup", action="store_true", help="Also measure the app's cold start and import-time breakdown"
+    )
+    args = parser.parse_args()
+
+    os.environ["TRIP_STORE"] = args.store
+    os.environ["TRIP_STORE_PATH"] = args.sqlite_path
+    os.environ["DYNAMODB_ENDPOINT"] = args.dynamodb_endpoint
+    # The benchmark doesn't enqueue jobs; keep the idle job workers from creating a queue file
+    os.environ.setdefault("JOB_QUEUE_PATH", ":memory:")
+
+    startup = profile_imports() if args.profile_startup else None
+    if startup is not None:
+        print(format_profile(startup), file=sys.stderr)
+
+    from backend import main as backend_main
+
+    def model_factory(model_id):
+        # Only the reasoning model emits reasoning tokens
+        reasoning = args.reasoning_tokens if model_id and "r1" in str(model_id) else 0
+        return FakeStreamingModel(
+            tokens=args.tokens,
+            reasoning_tokens=reasoning,
+            tokens_per_second=args.tokens_per_second,
+            first_token_latency=args.first_token_latency,
+        )
+
+    patch_backend(backend_main, model_factory)
+
+    server = BackgroundServer(backend_main.app, _free_port())
+    with server:
+        results = asyncio.run(run_benchmark(args, f"http://127.0.0.1:{server.config.port}"))
+    results["event_loop_lag"] = _summary(server.probe.samples)
+    if startup is not None:
+        results["startup"] = startup
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "parameters": vars(args),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text)
+    print(text)
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(json.load(handle), report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Deterministic stand-ins for Bedrock and the flights MCP server."""
+
+import asyncio
+from typing import Any, AsyncGenerator, Dict, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from strands import Agent
+from strands.models.model import Model
+
+WORDS = (
+    "Consider staying near the historic center where boutique hotels and guesthouses "
+    "keep you within walking distance of markets transit and evening dining options "
+).split()
+
+
+def _placeholder(annotation: Any) -> Any:
+    """Deterministic value for a required field of a structured output model."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        # Optional[X] and other unions take their first member
+        return _placeholder(get_args(annotation)[0])
+    if origin in (list, tuple, set):
+        return origin()
+    if origin is dict:
+        return {}
+    if isinstance(annotation, type):
+        if issubclass(annotation, bool):
+            return False
+        if issubclass(annotation, (int, float)):
+            return annotation(0)
+        if issubclass(annotation, str):
+            return " ".join(WORDS[:8])
+        if issubclass(annotation, BaseModel):
+            return annotation(**{
+                name: _placeholder(field.annotation)
+                for name, field in annotation.model_fields.items()
+                if field.is_required()
+            })
+    return None
+
+
+class FakeStreamingModel(Model):
+    """Strands model that streams a fixed response at a configurable token rate."""
+
+    def __init__(
+        self,
+        tokens: int = 200,
+        reasoning_tokens: int = 0,
+        tokens_per_second: float = 100.0,
+        first_token_latency: float = 0.3,
+    ):
+        self.config: Dict[str, Any] = {
+            "model_id": "fake-streaming-model",
+            "tokens": tokens,
+            "reasoning_tokens": reasoning_tokens,
+            "tokens_per_second": tokens_per_second,
+            "first_token_latency": first_token_latency,
+        }
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """Yields an instance of output_model with every required field set to a fixed placeholder."""
+        await asyncio.sleep(self.config["first_token_latency"])
+        values = {
+            name: _placeholder(field.annotation)
+            for name, field in output_model.model_fields.items()
+            if field.is_required()
+        }
+        yield {"output": output_model(**values)}
+
+    async def _tokens(self, count: int) -> AsyncGenerator[str, None]:
+        interval = 1 / self.config["tokens_per_second"] if self.config["tokens_per_second"] else 0
+        for index in range(count):
+            if interval:
+                await asyncio.sleep(interval)
+            yield WORDS[index % len(WORDS)] + " "
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        await asyncio.sleep(self.config["first_token_latency"])
+        yield {"messageStart": {"role": "assistant"}}
+
+        if self.config["reasoning_tokens"]:
+            yield {"contentBlockStart": {"start": {}}}
+            async for token in self._tokens(self.config["reasoning_tokens"]):
+                yield {"contentBlockDelta": {"delta": {"reasoningContent": {"text": token}}}}
+            yield {"contentBlockStop": {}}
+
+        yield {"contentBlockStart": {"start": {}}}
+        async for token in self._tokens(self.config["tokens"]):
+            yield {"contentBlockDelta": {"delta": {"text": token}}}
+        yield {"contentBlockStop": {}}
+
+        output_tokens = self.config["tokens"] + self.config["reasoning_tokens"]
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {"metadata": {
+            "usage": {"inputTokens": 400, "outputTokens": output_tokens, "totalTokens": 400 + output_tokens},
+            "metrics": {"latencyMs": 0},
+        }}
+
+
+class FakeMCPClient:
+    """MCPClient stand-in that exposes no tools and opens no connection."""
+
+    def __init__(self, transport_callable=None, **kwargs) -> None:
+        self.transport_callable = transport_callable
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+    def list_tools_sync(self, *args, **kwargs):
+        return []
+
+
+def patch_backend(main_module, model_factory, service=None) -> None:
+    """Route the backend's agents and MCP client to the fakes, optionally replacing its service."""
+
+    def agent(*args, **kwargs):
+        model = kwargs.get("model")
+        # The backend passes either a model id or a configured Bedrock model
+        model_id = model.get_config().get("model_id") if isinstance(model, Model) else model
+        kwargs["model"] = model_factory(model_id)
+        return Agent(*args, **kwargs)
+
+    main_module.Agent = agent
+    main_module.MCPClient = FakeMCPClient
+    if service is not None:
+        main_module.service = service
@@ -0,0 +1,44 @@
+"""Cold-start profile of the backend.
+
+Every scale-out task and gunicorn worker imports the app before it can serve,
+so its import time is part of how quickly the service absorbs load. The
+profiler itself ships with the flights MCP server (``flights-mcp
+--profile-startup``); this points it at the app, or at any other module.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup flights.server
+    python -m benchmarks.backend_bench --profile-startup
+"""
+
+import argparse
+from typing import Dict, Optional
+
+from flights import startup
+from flights.startup import format_profile, parse_importtime
+
+APP_MODULE = "backend.main"
+
+__all__ = ["APP_MODULE", "cold_start_seconds", "format_profile", "parse_importtime", "profile_imports"]
+
+
+def cold_start_seconds(module: str = APP_MODULE, env: Optional[Dict[str, str]] = None) -> float:
+    """Wall time for a fresh interpreter to start and import module."""
+    return startup.cold_start_seconds(module, env)
+
+
+def profile_imports(module: str = APP_MODULE, env: Optional[Dict[str, str]] = None) -> Dict:
+    """Import time of module in a fresh interpreter, with self time per top-level package."""
+    return startup.profile_imports(module, env)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default=APP_MODULE, help=f"module to import (default {APP_MODULE})")
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    args = parser.parse_args()
+    print(format_profile(profile_imports(args.module), top=args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Offline load test for the flights MCP tools.
+
+Drives ``search_flights`` and ``search_multi_city`` concurrently through the
+FastMCP tool layer against the local Duffel stand-in, then reports latency
+percentiles, throughput and memory use. By default the stand-in runs in
+process, so RSS includes the offers it keeps for lookups; pass --url to
+measure against a separately started server.
+
+Usage:
+    uv run python bench/load_test.py --requests 500 --concurrency 50 --offers 200
+    uv run python bench/load_test.py --url http://localhost:8765/air  # external fake server
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+os.environ.setdefault("DUFFEL_API_KEY_LIVE", "duffel_test_offline")
+
+import httpx
+
+from flights.api import DuffelClient
+from flights.config import RateLimitConfig, ResilienceConfig
+from flights.services import search
+from flights.testing import FakeDuffelConfig, create_app
+
+logger = logging.getLogger("flights.bench")
+
+
+def _scenario(tool: str, index: int) -> Dict:
+    """Arguments for the index-th call of a tool."""
+    departure = date.today() + timedelta(days=7 + index % 30)
+    if tool == "search_multi_city":
+        return {"params": {
+            "type": "multi_city",
+            "segments": [
+                {"origin": "SFO", "destination": "JFK", "departure_date": departure.isoformat()},
+                {"origin": "JFK", "destination": "ORD", "departure_date": (departure + timedelta(days=3)).isoformat()},
+                {"origin": "ORD", "destination": "SFO", "departure_date": (departure + timedelta(days=6)).isoformat()},
+            ],
+        }}
+    return {"params": {
+        "type": "round_trip",
+        "origin": "SFO",
+        "destination": "JFK",
+        "departure_date": departure.isoformat(),
+        "return_date": (departure + timedelta(days=5)).isoformat(),
+    }}
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MiB."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return 0.0
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(args) -> Dict:
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        fake = FakeDuffelConfig(
+            offer_count=args.offers,
+            max_segments=args.max_segments,
+            padding_bytes=args.padding_bytes,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        )
+        transport = httpx.ASGITransport(app=create_app(fake))
+        base_url = "http://fake-duffel/air"
+
+    # Rate limiting would measure the limiter, not the server
+    search.flight_client = DuffelClient(
+        logger,
+        resilience=ResilienceConfig(base_delay=0.01, max_delay=0.1),
+        transport=transport,
+        rate_limits=RateLimitConfig(limits={}),
+        base_url=base_url,
+    )
+
+    tools = ["search_flights", "search_multi_city"] if args.tool == "mixed" else [args.tool]
+    latencies: Dict[str, List[float]] = {tool: [] for tool in tools}
+    errors: Dict[str, int] = {tool: 0 for tool in tools}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    rss_before = _rss_mb()
+
+    async def call(index: int):
+        tool = tools[index % len(tools)]
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await search.mcp.call_tool(tool, _scenario(tool, index))
+            except Exception:
+                errors[tool] += 1
+                return
+            latencies[tool].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    await search.flight_client.aclose()
+
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "offers": args.offers,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 2),
+        "rss_start_mb": round(rss_before, 1),
+        "rss_end_mb": round(_rss_mb(), 1),
+        "rss_peak_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "tools": {},
+    }
+    for tool, samples in latencies.items():
+        report["tools"][tool] = {
+            "ok": len(samples),
+            "errors": errors[tool],
+            "p50_ms": round(_percentile(samples, 50) * 1000, 2),
+            "p95_ms": round(_percentile(samples, 95) * 1000, 2),
+            "p99_ms": round(_percentile(samples, 99) * 1000, 2),
+            "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the flights MCP tools offline")
+    parser.add_argument("--tool", choices=["search_flights", "search_multi_city", "mixed"], default="mixed")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--url", help="Base URL of an already running fake Duffel server")
+    parser.add_argument("--offers", type=int, default=50)
+    parser.add_argument("--max-segments", type=int, default=3)
+    parser.add_argument("--padding-bytes", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    # FastMCP installs an INFO handler on import; per-request logs would dominate the run
+    logging.getLogger().setLevel(logging.WARNING)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,32 @@
 """Flight search MCP package initialization."""
 
-from . import server
+import argparse
+
 
 def main():
     """Main entry point for the package."""
+    parser = argparse.ArgumentParser(prog="flights-mcp", description="Flight search MCP server over stdio")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print where the server's import time goes and exit",
+    )
+    args = parser.parse_args()
+    if args.profile_startup:
+        from . import startup
+        startup.main()
+        return
+
+    # Imported here so the metrics reporter and profiler don't load the MCP SDK
+    from . import server
     server.main()
 
-__all__ = ['main', 'server']
\ No newline at end of file
+
+def __getattr__(name):
+    if name == "server":
+        from . import server
+        return server
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['main', 'server']
@@ -1,5 +1,7 @@
 """Duffel API client package."""
 
 from .client import DuffelClient
+from .ratelimit import RateLimitTimeoutError
+from .resilience import CircuitOpenError, DeadlineExceededError
 
-__all__ = ['DuffelClient'] 
\ No newline at end of file
+__all__ = ['DuffelClient', 'CircuitOpenError', 'DeadlineExceededError', 'RateLimitTimeoutError'] 
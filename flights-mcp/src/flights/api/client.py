@@ -2,19 +2,31 @@
 
 import logging
 import httpx
-from typing import Dict, Any, List
-from ..config import get_api_token
+from typing import Dict, Any, List, Optional
+from ..config import get_api_token, get_base_url
+from ..config.ratelimit import RateLimitConfig
+from ..config.resilience import ResilienceConfig
 from .endpoints import OfferEndpoints
+from .ratelimit import RateLimiter
+from .resilience import ResiliencePolicy
 
 class DuffelClient:
     """Client for interacting with the Duffel API."""
 
-    def __init__(self, logger: logging.Logger, timeout: float = 30.0):
+    def __init__(
+        self,
+        logger: logging.Logger,
+        timeout: float = 30.0,
+        resilience: Optional[ResilienceConfig] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        rate_limits: Optional[RateLimitConfig] = None,
+        base_url: Optional[str] = None
+    ):
         """Initialize the Duffel API client."""
         self.logger = logger
         self.timeout = timeout
         self._token = get_api_token()
-        self.base_url = "https://api.duffel.com/air"
+        self.base_url = (base_url or get_base_url()).rstrip("/")
 
         # Headers setup
         self.headers = {
@@ -29,7 +41,11 @@ class DuffelClient:
         self.logger.info(f"Using base URL: {self.base_url}")
 
         # Initialize endpoints
-        self.offers = OfferEndpoints(self.base_url, self.headers, self.logger)
+        self.policy = ResiliencePolicy(self.logger, resilience or ResilienceConfig.from_env())
+        self.limiter = RateLimiter(self.logger, rate_limits or RateLimitConfig.from_env())
+        self.offers = OfferEndpoints(
+            self.base_url, self.headers, self.logger, self.policy, transport, self.limiter
+        )
 
     async def __aenter__(self):
         """Async context manager entry."""
@@ -39,6 +55,14 @@ class DuffelClient:
         """Async context manager exit."""
         pass
 
+    async def aclose(self):
+        """Close pooled HTTP connections."""
+        await self.offers.aclose()
+
+    def rate_limit_stats(self) -> Dict[str, Dict[str, float]]:
+        """Rate limiter wait-time metrics keyed by endpoint."""
+        return self.limiter.stats()
+
     async def create_offer_request(self, **kwargs) -> Dict[str, Any]:
         """Create an offer request."""
         return await self.offers.create_offer_request(**kwargs)
@@ -1,16 +1,51 @@
 """Duffel API endpoint handlers."""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import json
 import logging
 import httpx
 
+from ..telemetry import duffel_span
+from .ratelimit import RateLimiter
+from .resilience import ResiliencePolicy
+from .streaming import parse_offer_request
+
 class OfferEndpoints:
     """Offer-related API endpoints."""
-    
-    def __init__(self, base_url: str, headers: Dict, logger: logging.Logger):
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Dict,
+        logger: logging.Logger,
+        policy: Optional[ResiliencePolicy] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        limiter: Optional[RateLimiter] = None
+    ):
         self.base_url = base_url
         self.headers = headers
         self.logger = logger
+        self.policy = policy or ResiliencePolicy(logger)
+        self.limiter = limiter or RateLimiter(logger)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client so retries and hedges reuse pooled connections."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(60.0),
+                transport=self._transport
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def create_offer_request(
         self,
@@ -19,9 +54,20 @@ class OfferEndpoints:
         adult_count: int = 1,
         max_connections: int = None,
         return_offers: bool = True,
-        supplier_timeout: int = 15000
+        supplier_timeout: int = 15000,
+        cache_key: Optional[str] = None,
+        max_offers: Optional[int] = None
     ) -> Dict:
-        """Create a flight offer request."""
+        """Create a flight offer request.
+
+        cache_key identifies the request for the stale response cache; pass
+        the search's canonical form so equivalent searches share entries.
+
+        With max_offers the response is parsed as it streams in, keeping only
+        the first max_offers offers and the fields the search tools format
+        (streaming.OFFER_FIELDS); the rest of the body is never read, and
+        request_id is None if Duffel sends it after those offers.
+        """
         try:
             # Format request data
             request_data = {
@@ -40,27 +86,51 @@ class OfferEndpoints:
                 "supplier_timeout": supplier_timeout
             }
 
-            async with httpx.AsyncClient(timeout=httpx.Timeout(60.0)) as client:
-                self.logger.info(f"Creating offer request with data: {request_data}")
-                response = await client.post(
-                    f"{self.base_url}/offer_requests",
-                    headers=self.headers,
-                    params=params,
-                    json=request_data
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                request_id = data["data"]["id"]
-                offers = data["data"].get("offers", [])
-                
-                self.logger.info(f"Created offer request with ID: {request_id}")
-                self.logger.info(f"Received {len(offers)} offers")
-                
-                return {
-                    "request_id": request_id,
-                    "offers": offers
-                }
+            async def send(timeout: float) -> Dict:
+                await self.limiter.acquire("offer_requests", timeout)
+                url = f"{self.base_url}/offer_requests"
+                async with duffel_span("offer_requests", "POST", url) as span:
+                    if max_offers is not None:
+                        async with self.client.stream(
+                            "POST",
+                            url,
+                            params=params,
+                            json=request_data,
+                            timeout=timeout
+                        ) as response:
+                            span.set_attribute("http.response.status_code", response.status_code)
+                            response.raise_for_status()
+                            return await parse_offer_request(response.aiter_bytes(), max_offers)
+
+                    response = await self.client.post(
+                        url,
+                        params=params,
+                        json=request_data,
+                        timeout=timeout
+                    )
+                    span.set_attribute("http.response.status_code", response.status_code)
+                    response.raise_for_status()
+                    data = response.json()["data"]
+                    return {"request_id": data["id"], "offers": data.get("offers", [])}
+
+            route = " -> ".join(
+                [slices[0]["origin"]] + [s["destination"] for s in slices]
+            ) if slices else "no slices"
+            self.logger.info(
+                f"Creating offer request: {route}, {adult_count} adult(s), {cabin_class}"
+            )
+            self.logger.debug(f"Offer request body: {request_data}")
+            if cache_key is None:
+                cache_key = json.dumps(request_data, sort_keys=True)
+            # Summaries of different sizes are cached separately
+            result = await self.policy.execute(
+                "offer_requests", send, cache_key=f"offer_requests:{max_offers}:{cache_key}"
+            )
+
+            self.logger.info(f"Created offer request with ID: {result['request_id'] or 'unknown'}")
+            self.logger.info(f"Received {len(result['offers'])} offers")
+
+            return result
 
         except Exception as e:
             error_msg = f"Error creating offer request: {str(e)}"
@@ -72,14 +142,20 @@ class OfferEndpoints:
         try:
             if not offer_id.startswith("off_"):
                 raise ValueError("Invalid offer ID format - must start with 'off_'")
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/offers/{offer_id}",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                return response.json()
+
+            async def send(timeout: float) -> Dict:
+                await self.limiter.acquire("offers", timeout)
+                url = f"{self.base_url}/offers/{offer_id}"
+                async with duffel_span("offers", "GET", url) as span:
+                    response = await self.client.get(url, timeout=timeout)
+                    span.set_attribute("http.response.status_code", response.status_code)
+                    response.raise_for_status()
+                    return response.json()
+
+            # Offer lookups are idempotent, so they are safe to hedge
+            return await self.policy.execute(
+                "offers", send, cache_key=f"offers:{offer_id}", hedge=True
+            )
         except Exception as e:
             self.logger.error(f"Error getting offer {offer_id}: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
@@ -0,0 +1,184 @@
+"""Token-bucket rate limiting for outbound Duffel requests."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config.ratelimit import RateLimitConfig
+from ..telemetry import rate_limit_wait
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class RateLimitTimeoutError(Exception):
+    """Raised when a caller would wait longer than its timeout for a token."""
+
+
+class LocalBucketBackend:
+    """Bucket state held in this process only."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def reserve(self, key: str, rate: float, capacity: int, max_wait: float) -> Optional[float]:
+        """Take a token, returning how long to wait for it, or None if over max_wait."""
+        now = self._clock()
+        tokens, updated = self._buckets.get(key, (float(capacity), now))
+        tokens, wait = _take(tokens, updated, now, rate, capacity, max_wait)
+        if wait is not None:
+            self._buckets[key] = (tokens, now)
+        return wait
+
+    def refund(self, key: str, capacity: int) -> None:
+        """Return an unused reservation to the bucket."""
+        if key in self._buckets:
+            tokens, updated = self._buckets[key]
+            self._buckets[key] = (min(float(capacity), tokens + 1), updated)
+
+
+class FileBucketBackend:
+    """Bucket state in small lock-protected files shared by every process on the host.
+
+    The MCP server is forked once per connection by socat, so a purely
+    in-process bucket lets each process burst independently.
+    """
+
+    def __init__(self, state_dir: str, clock: Callable[[], float] = time.time):
+        if fcntl is None:
+            raise RuntimeError("Shared rate limit state requires fcntl (POSIX)")
+        os.makedirs(state_dir, exist_ok=True)
+        self.state_dir = state_dir
+        self._clock = clock
+
+    def _update(self, key: str, change: Callable[[float, float, float], Tuple[float, Optional[float]]]):
+        path = os.path.join(self.state_dir, f"{key}.bucket")
+        with open(path, "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                raw = handle.read()
+                now = self._clock()
+                state = json.loads(raw) if raw else None
+                tokens, updated = (state["tokens"], state["updated"]) if state else (None, now)
+                tokens, result = change(tokens, updated, now)
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps({"tokens": tokens, "updated": now}))
+                handle.flush()
+                return result
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def reserve(self, key: str, rate: float, capacity: int, max_wait: float) -> Optional[float]:
+        def change(tokens, updated, now):
+            if tokens is None:
+                tokens = float(capacity)
+            return _take(tokens, updated, now, rate, capacity, max_wait)
+
+        return self._update(key, change)
+
+    def refund(self, key: str, capacity: int) -> None:
+        def change(tokens, updated, now):
+            if tokens is None:
+                return float(capacity), None
+            return min(float(capacity), tokens + 1), None
+
+        self._update(key, change)
+
+
+def _take(tokens: float, updated: float, now: float, rate: float,
+          capacity: int, max_wait: float) -> Tuple[float, Optional[float]]:
+    """Refill a bucket and reserve one token from it.
+
+    The balance may go negative: each negative token is a queued caller, and
+    callers are served in the order they reserved, which keeps waits fair.
+    """
+    tokens = min(float(capacity), tokens + (now - updated) * rate)
+    wait = max(0.0, (1 - tokens) / rate)
+    if wait > max_wait:
+        return tokens, None
+    return tokens - 1, wait
+
+
+@dataclass
+class WaitStats:
+    """Wait-time metrics for a single endpoint."""
+    acquired: int = 0
+    delayed: int = 0
+    timeouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "timeouts": self.timeouts,
+            "total_wait": round(self.total_wait, 6),
+            "max_wait": round(self.max_wait, 6),
+            "mean_wait": round(self.total_wait / self.acquired, 6) if self.acquired else 0.0,
+        }
+
+
+class RateLimiter:
+    """Per-endpoint token buckets with FIFO waiting and timeouts."""
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        config: Optional[RateLimitConfig] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.logger = logger
+        self.config = config or RateLimitConfig()
+        self._sleep = sleep
+        if self.config.state_dir and fcntl is not None:
+            self.backend = FileBucketBackend(self.config.state_dir)
+        else:
+            self.backend = LocalBucketBackend()
+        self._stats: Dict[str, WaitStats] = {}
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Wait-time metrics keyed by endpoint."""
+        return {endpoint: stats.as_dict() for endpoint, stats in self._stats.items()}
+
+    async def acquire(self, endpoint: str, timeout: Optional[float] = None) -> float:
+        """Wait for a token for an endpoint and return how long we waited."""
+        limit = self.config.limits.get(endpoint)
+        if limit is None:
+            return 0.0
+
+        rate, capacity = limit
+        stats = self._stats.setdefault(endpoint, WaitStats())
+        max_wait = self.config.acquire_timeout if timeout is None else min(timeout, self.config.acquire_timeout)
+
+        wait = self.backend.reserve(endpoint, rate, capacity, max_wait)
+        if wait is None:
+            stats.timeouts += 1
+            raise RateLimitTimeoutError(
+                f"Rate limit for Duffel {endpoint} would exceed {max_wait:.1f}s wait"
+            )
+
+        if wait > 0:
+            stats.delayed += 1
+            try:
+                await self._sleep(wait)
+            except asyncio.CancelledError:
+                self.backend.refund(endpoint, capacity)
+                raise
+            if wait > 1:
+                self.logger.info(f"Waited {wait:.2f}s for Duffel {endpoint} rate limit")
+
+        rate_limit_wait.record(wait, {"duffel.endpoint": endpoint})
+        stats.acquired += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        return wait
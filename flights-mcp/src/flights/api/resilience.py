@@ -0,0 +1,309 @@
+"""Retry, circuit breaker, hedging and deadline policies for Duffel calls."""
+
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from ..config.resilience import ResilienceConfig
+from ..telemetry import stale_cache_lookups
+
+T = TypeVar("T")
+
+# An operation receives the per-attempt timeout in seconds
+Operation = Callable[[float], Awaitable[T]]
+
+
+class CircuitOpenError(Exception):
+    """Raised when Duffel is failing and no stale response is available."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when an endpoint has used up its share of the call budget."""
+
+
+class Deadline:
+    """Absolute deadline measured on a monotonic clock."""
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def _parse_delay(value: str, now: float) -> Optional[float]:
+    """Parse a header holding either delta-seconds, an epoch or an HTTP date."""
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, parsed.timestamp() - now)
+    # Large numbers are absolute epoch timestamps rather than deltas
+    if seconds > 1_000_000_000:
+        return max(0.0, seconds - now)
+    return max(0.0, seconds)
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds the server asked us to wait, from Retry-After or rate-limit headers."""
+    now = time.time()
+    header = response.headers.get("retry-after")
+    if header:
+        delay = _parse_delay(header, now)
+        if delay is not None:
+            return delay
+
+    # Duffel reports its rate-limit window through ratelimit-* headers
+    reset = response.headers.get("ratelimit-reset")
+    remaining = response.headers.get("ratelimit-remaining")
+    if reset and (response.status_code == 429 or remaining == "0"):
+        return _parse_delay(reset, now)
+    return None
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._state = self.CLOSED
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be sent right now."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probing = False
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """Give up a half-open probe that ended without saying anything about Duffel's health."""
+        if self._state == self.HALF_OPEN:
+            self._probing = False
+
+
+class StaleCache:
+    """Bounded LRU of last-known-good responses, served while Duffel is down."""
+
+    def __init__(self, max_entries: int = 128, ttl: float = 900.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self._clock() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+async def hedged(operation: Callable[[], Awaitable[T]], delay: float) -> T:
+    """Run an operation, starting a duplicate if the first is slower than delay.
+
+    The first attempt to succeed wins and the other one is cancelled. If both
+    fail, the error from the primary attempt is raised.
+    """
+    primary = asyncio.ensure_future(operation())
+    tasks = [primary]
+    try:
+        # Inside the try, so a caller's deadline expiring here also cancels the primary
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        tasks.append(asyncio.ensure_future(operation()))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+        return primary.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+class ResiliencePolicy:
+    """Applies deadlines, retries, circuit breaking and stale fallbacks."""
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        config: Optional[ResilienceConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.logger = logger
+        self.config = config or ResilienceConfig()
+        self._clock = clock
+        self._sleep = sleep
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.stale = StaleCache(self.config.stale_cache_size, self.config.stale_cache_ttl, clock)
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Circuit breaker for an endpoint, created on first use."""
+        if endpoint not in self._breakers:
+            self._breakers[endpoint] = CircuitBreaker(
+                self.config.breaker_failure_threshold,
+                self.config.breaker_reset_timeout,
+                self._clock,
+            )
+        return self._breakers[endpoint]
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Jittered exponential delay before the next attempt."""
+        if isinstance(error, httpx.HTTPStatusError):
+            requested = retry_after(error.response)
+            if requested is not None:
+                return requested + random.uniform(0, self.config.base_delay)
+        ceiling = min(self.config.max_delay, self.config.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.config.retry_statuses
+        return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+    async def execute(
+        self,
+        endpoint: str,
+        operation: Operation[T],
+        cache_key: Optional[str] = None,
+        hedge: bool = False,
+    ) -> T:
+        """Run an operation against an endpoint under the configured policies."""
+        breaker = self.breaker(endpoint)
+        deadline = Deadline(self.config.endpoint_deadline(endpoint), self._clock)
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.config.max_attempts):
+            timeout = deadline.remaining()
+            if timeout <= 0:
+                break
+
+            if not breaker.allow():
+                return self._fallback(endpoint, cache_key, CircuitOpenError(
+                    f"Circuit open for Duffel {endpoint} endpoint"
+                ))
+            # A half-open probe must settle or release the breaker however it ends,
+            # or every later call finds the probe still out and the circuit open
+            probing = breaker.state == breaker.HALF_OPEN
+            settled = False
+            try:
+                if hedge and self.config.hedge_delay:
+                    result = await asyncio.wait_for(
+                        hedged(lambda: operation(timeout), self.config.hedge_delay), timeout
+                    )
+                else:
+                    result = await asyncio.wait_for(operation(timeout), timeout)
+            except Exception as e:
+                if not self.is_retryable(e):
+                    if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+                        # A client error is still an answer, so Duffel is reachable
+                        breaker.record_success()
+                        settled = True
+                    raise
+                breaker.record_failure()
+                settled = True
+                last_error = e
+                delay = self.backoff(attempt, e)
+            else:
+                breaker.record_success()
+                settled = True
+                if cache_key is not None:
+                    self.stale.put(cache_key, result)
+                return result
+            finally:
+                if probing and not settled:
+                    # Cancelled, or failed before reaching Duffel (e.g. a local rate-limit timeout)
+                    breaker.release()
+
+            if attempt + 1 >= self.config.max_attempts or delay >= deadline.remaining():
+                break
+            self.logger.warning(
+                f"Duffel {endpoint} attempt {attempt + 1} failed ({last_error!r}), retrying in {delay:.2f}s"
+            )
+            await self._sleep(delay)
+
+        if last_error is None:
+            last_error = DeadlineExceededError(
+                f"Duffel {endpoint} deadline of {self.config.endpoint_deadline(endpoint):.1f}s exceeded"
+            )
+        return self._fallback(endpoint, cache_key, last_error)
+
+    def _fallback(self, endpoint: str, cache_key: Optional[str], error: Exception) -> Any:
+        """Serve a stale response if we have one, otherwise raise the error."""
+        if cache_key is not None:
+            stale = self.stale.get(cache_key)
+            result = "miss" if stale is None else "hit"
+            stale_cache_lookups.add(1, {"duffel.endpoint": endpoint, "result": result})
+            if stale is not None:
+                self.logger.warning(f"Serving stale Duffel {endpoint} response: {error!r}")
+                return stale
+        raise error
@@ -0,0 +1,104 @@
+"""Incremental parsing of offer request responses.
+
+An offer request response can hold hundreds of offers, each with nested
+segments, conditions and passenger data, while the search tools only show a
+few fields of the first offers. Parsing the body as it streams in keeps just
+those fields and stops reading once enough offers are in, so memory and parse
+time no longer grow with the size of the response.
+"""
+
+from typing import AsyncIterator, Dict, FrozenSet, Iterable, List, Optional
+
+import ijson
+
+OFFERS_PREFIX = "data.offers.item"
+REQUEST_ID_PREFIX = "data.id"
+
+# Offer fields read by the search tools' formatter (services.search._format_offer),
+# as ijson prefixes relative to an offer; list items are "item"
+OFFER_FIELDS = (
+    "id",
+    "total_amount",
+    "total_currency",
+    "slices.item.origin.iata_code",
+    "slices.item.destination.iata_code",
+    "slices.item.duration",
+    "slices.item.segments.item.departing_at",
+    "slices.item.segments.item.arriving_at",
+    "slices.item.segments.item.duration",
+    "slices.item.segments.item.destination.iata_code",
+    "slices.item.segments.item.marketing_carrier.name",
+)
+
+
+def kept_prefixes(fields: Iterable[str], root: str = OFFERS_PREFIX) -> FrozenSet[str]:
+    """Every prefix on the way from root to one of the fields, root included."""
+    kept = {root}
+    for field in fields:
+        parts = field.split(".")
+        for end in range(1, len(parts) + 1):
+            kept.add(f"{root}.{'.'.join(parts[:end])}")
+    return frozenset(kept)
+
+
+class _ChunkReader:
+    """File-like view of an async byte stream, as ijson's async parser reads it."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes the stream type with read(0), so short reads must not consume chunks
+        if size == 0:
+            return b""
+        if not self._buffer:
+            try:
+                self._buffer = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                return b""
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+async def parse_offer_request(
+    chunks: AsyncIterator[bytes],
+    max_offers: int,
+    fields: Iterable[str] = OFFER_FIELDS
+) -> Dict:
+    """Request ID and the first max_offers offers, pruned to fields, from a streamed response body.
+
+    Stops reading once max_offers offers are in. The request ID is only known
+    if it comes before that point (or the response has fewer offers), so it is
+    None when Duffel puts it after a long offers list.
+    """
+    kept = kept_prefixes(fields)
+    reader = _ChunkReader(chunks)
+    request_id: Optional[str] = None
+    offers: List[Dict] = []
+    builder: Optional[ijson.ObjectBuilder] = None
+
+    async for prefix, event, value in ijson.parse_async(reader, use_float=True):
+        if prefix == REQUEST_ID_PREFIX and event == "string":
+            request_id = value
+            continue
+        if not prefix.startswith(OFFERS_PREFIX):
+            continue
+        if event == "map_key":
+            if f"{prefix}.{value}" not in kept:
+                continue
+        elif prefix not in kept:
+            continue
+
+        if prefix == OFFERS_PREFIX and event == "start_map":
+            builder = ijson.ObjectBuilder()
+        builder.event(event, value)
+        if prefix == OFFERS_PREFIX and event == "end_map":
+            offers.append(builder.value)
+            builder = None
+            if len(offers) >= max_offers:
+                break
+
+    return {"request_id": request_id, "offers": offers}
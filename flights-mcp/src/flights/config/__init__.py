@@ -1,5 +1,7 @@
 """Configuration package."""
 
-from .api import DUFFEL_API_URL, DUFFEL_API_VERSION, get_api_token
+from .api import DUFFEL_API_URL, DUFFEL_API_VERSION, get_api_token, get_base_url
+from .ratelimit import RateLimitConfig
+from .resilience import ResilienceConfig
 
-__all__ = ['DUFFEL_API_URL', 'DUFFEL_API_VERSION', 'get_api_token'] 
\ No newline at end of file
+__all__ = ['DUFFEL_API_URL', 'DUFFEL_API_VERSION', 'get_api_token', 'get_base_url', 'RateLimitConfig', 'ResilienceConfig'] 
@@ -7,6 +7,10 @@ from typing import Final
 DUFFEL_API_URL: Final = "https://api.duffel.com"
 DUFFEL_API_VERSION: Final = "v2"
 
+def get_base_url() -> str:
+    """Get the Duffel Air API base URL, overridable to point at a local stand-in."""
+    return os.getenv("DUFFEL_BASE_URL", f"{DUFFEL_API_URL}/air").rstrip("/")
+
 def get_api_token() -> str:
     """Get Duffel API token from environment."""
     token = os.getenv("DUFFEL_API_KEY_LIVE")
@@ -0,0 +1,43 @@
+"""Rate limit configuration for outbound Duffel traffic."""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Final, Optional, Tuple
+
+# (requests per second, burst size) per Duffel endpoint
+DEFAULT_LIMITS: Final = {
+    "offer_requests": (2.0, 5),
+    "offers": (5.0, 10),
+}
+
+
+def _parse_limit(value: str) -> Tuple[float, int]:
+    """Parse a "rate/burst" pair such as "2/5"."""
+    try:
+        rate, _, burst = value.partition("/")
+        return float(rate), int(burst or max(1, round(float(rate))))
+    except ValueError:
+        raise ValueError(f"Rate limit must look like '<rate>/<burst>', got {value!r}")
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    """Token-bucket settings for each Duffel endpoint."""
+    limits: Dict[str, Tuple[float, int]] = field(default_factory=lambda: dict(DEFAULT_LIMITS))
+    acquire_timeout: float = 10.0
+    # Directory holding bucket state shared by every server process on the host
+    state_dir: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "RateLimitConfig":
+        """Build a configuration from FLIGHTS_RATE_LIMIT_* environment variables."""
+        limits = dict(DEFAULT_LIMITS)
+        for endpoint in limits:
+            value = os.getenv(f"FLIGHTS_RATE_LIMIT_{endpoint.upper()}")
+            if value:
+                limits[endpoint] = _parse_limit(value)
+        return cls(
+            limits=limits,
+            acquire_timeout=float(os.getenv("FLIGHTS_RATE_LIMIT_TIMEOUT", "10")),
+            state_dir=os.getenv("FLIGHTS_RATE_LIMIT_STATE_DIR") or None,
+        )
@@ -0,0 +1,66 @@
+"""Resilience configuration for outbound Duffel calls."""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Final, FrozenSet
+
+# Status codes that are safe to retry against Duffel
+RETRYABLE_STATUSES: Final = frozenset({408, 429, 500, 502, 503, 504})
+
+# Total time budget for a single MCP tool call, in seconds. The backend
+# agent gives up on a tool call well before the 60 s httpx default.
+DEFAULT_CALL_BUDGET: Final = 45.0
+
+# Share of the call budget each endpoint may consume
+DEFAULT_ENDPOINT_BUDGETS: Final = {
+    "offer_requests": 1.0,
+    "offers": 0.33,
+}
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float from the environment, falling back to a default."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}")
+
+
+@dataclass(frozen=True)
+class ResilienceConfig:
+    """Retry, circuit breaker, hedging and deadline settings."""
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    retry_statuses: FrozenSet[int] = RETRYABLE_STATUSES
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+    stale_cache_size: int = 128
+    stale_cache_ttl: float = 900.0
+    hedge_delay: float | None = None
+    call_budget: float = DEFAULT_CALL_BUDGET
+    endpoint_budgets: Dict[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_ENDPOINT_BUDGETS)
+    )
+
+    def endpoint_deadline(self, endpoint: str) -> float:
+        """Seconds an endpoint may spend, including retries."""
+        return self.call_budget * self.endpoint_budgets.get(endpoint, 1.0)
+
+    @classmethod
+    def from_env(cls) -> "ResilienceConfig":
+        """Build a configuration from FLIGHTS_* environment variables."""
+        hedge_delay = _env_float("FLIGHTS_HEDGE_DELAY", 0.0)
+        return cls(
+            max_attempts=int(_env_float("FLIGHTS_RETRY_ATTEMPTS", 3)),
+            base_delay=_env_float("FLIGHTS_RETRY_BASE_DELAY", 0.5),
+            max_delay=_env_float("FLIGHTS_RETRY_MAX_DELAY", 8.0),
+            breaker_failure_threshold=int(_env_float("FLIGHTS_BREAKER_THRESHOLD", 5)),
+            breaker_reset_timeout=_env_float("FLIGHTS_BREAKER_RESET", 30.0),
+            stale_cache_ttl=_env_float("FLIGHTS_STALE_CACHE_TTL", 900.0),
+            hedge_delay=hedge_delay or None,
+            call_budget=_env_float("FLIGHTS_CALL_BUDGET", DEFAULT_CALL_BUDGET),
+        )
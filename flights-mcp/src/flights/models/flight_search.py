@@ -4,10 +4,15 @@ from .search import FlightSearch
 from .multi_city import MultiCityRequest
 from .segments import FlightSegment
 from .offers import OfferDetails
+from .query import OfferQuery, SliceQuery
+from .time_specs import TimeSpec
 
 __all__ = [
     'FlightSearch',
     'MultiCityRequest',
     'FlightSegment',
     'OfferDetails',
-] 
\ No newline at end of file
+    'OfferQuery',
+    'SliceQuery',
+    'TimeSpec',
+]
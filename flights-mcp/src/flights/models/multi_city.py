@@ -1,16 +1,30 @@
 """Multi-city flight search models."""
 
 from typing import Optional, List, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from .query import OfferQuery
 from .time_specs import TimeSpec
 from .segments import FlightSegment
+from .types import CabinClass
 
 class MultiCityRequest(BaseModel):
     """Model for multi-city flight search."""
+    model_config = ConfigDict(frozen=True)
+
     type: Literal["multi_city"]
-    segments: List[FlightSegment] = Field(..., min_items=2, description="Flight segments")
-    cabin_class: str = Field("economy", description="Cabin class")
-    adults: int = Field(1, description="Number of adult passengers")
-    max_connections: int = Field(None, description="Maximum number of connections (0 for non-stop)")
+    segments: List[FlightSegment] = Field(..., min_length=2, description="Flight segments")
+    cabin_class: CabinClass = Field("economy", description="Cabin class")
+    adults: int = Field(1, ge=1, le=9, description="Number of adult passengers")
+    max_connections: Optional[int] = Field(None, ge=0, description="Maximum number of connections (0 for non-stop)")
     departure_time: TimeSpec | None = Field(None, description="Optional departure time range")
-    arrival_time: TimeSpec | None = Field(None, description="Optional arrival time range") 
\ No newline at end of file
+    arrival_time: TimeSpec | None = Field(None, description="Optional arrival time range")
+
+    def to_query(self) -> OfferQuery:
+        return OfferQuery.from_segments(
+            self.segments,
+            self.departure_time,
+            self.arrival_time,
+            cabin_class=self.cabin_class,
+            adults=self.adults,
+            max_connections=self.max_connections,
+        )
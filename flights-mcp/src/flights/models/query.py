@@ -0,0 +1,62 @@
+"""Normalized offer request shared by every search tool."""
+
+import json
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field
+from .segments import FlightSegment
+from .time_specs import ANY_TIME, TimeSpec
+from .types import CabinClass
+
+class SliceQuery(FlightSegment):
+    """One leg of an offer request, with explicit time windows."""
+    departure_time: TimeSpec = ANY_TIME
+    arrival_time: TimeSpec = ANY_TIME
+
+    def to_duffel(self) -> Dict:
+        """Slice in the shape Duffel's offer request expects."""
+        return {
+            "origin": self.origin,
+            "destination": self.destination,
+            "departure_date": self.departure_date.isoformat(),
+            "departure_time": {"from": self.departure_time.from_time, "to": self.departure_time.to_time},
+            "arrival_time": {"from": self.arrival_time.from_time, "to": self.arrival_time.to_time},
+        }
+
+
+class OfferQuery(BaseModel):
+    """Canonical form of a flight search.
+
+    Searches that ask Duffel the same question (whatever tool, letter case or
+    omitted defaults they came in with) normalize to equal queries with the
+    same cache key.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    slices: Tuple[SliceQuery, ...] = Field(..., min_length=1)
+    cabin_class: CabinClass = "economy"
+    adults: int = Field(1, ge=1, le=9)
+    max_connections: Optional[int] = Field(None, ge=0)
+
+    @classmethod
+    def from_segments(
+        cls,
+        segments: List[FlightSegment],
+        departure_time: Optional[TimeSpec],
+        arrival_time: Optional[TimeSpec],
+        **options,
+    ) -> "OfferQuery":
+        """Query for segments that share one pair of time windows."""
+        windows = {"departure_time": departure_time or ANY_TIME, "arrival_time": arrival_time or ANY_TIME}
+        return cls(
+            slices=tuple(SliceQuery(**segment.model_dump(), **windows) for segment in segments),
+            **options,
+        )
+
+    def duffel_slices(self) -> List[Dict]:
+        return [slice_query.to_duffel() for slice_query in self.slices]
+
+    @cached_property
+    def cache_key(self) -> str:
+        """Stable key for this query; equal queries share it."""
+        return json.dumps(self.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
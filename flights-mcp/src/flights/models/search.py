@@ -1,19 +1,52 @@
 """Flight search models."""
 
-from typing import Optional, List
-from pydantic import BaseModel, Field
+import datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from .query import OfferQuery
+from .segments import FlightSegment
 from .time_specs import TimeSpec
+from .types import AirportCode, CabinClass
 
 class FlightSearch(BaseModel):
     """Model for flight search parameters."""
-    type: str = Field(..., description="Type of flight: 'one_way', 'round_trip', or 'multi_city'")
-    origin: str = Field(..., description="Origin airport code")
-    destination: str = Field(..., description="Destination airport code")
-    departure_date: str = Field(..., description="Departure date (YYYY-MM-DD)")
-    return_date: str | None = Field(None, description="Return date for round trips (YYYY-MM-DD)")
+    model_config = ConfigDict(frozen=True)
+
+    type: Literal["one_way", "round_trip", "multi_city"] = Field(..., description="Type of flight: 'one_way', 'round_trip', or 'multi_city'")
+    origin: AirportCode = Field(..., description="Origin airport code")
+    destination: AirportCode = Field(..., description="Destination airport code")
+    departure_date: datetime.date = Field(..., description="Departure date (YYYY-MM-DD)")
+    return_date: datetime.date | None = Field(None, description="Return date for round trips (YYYY-MM-DD)")
     departure_time: TimeSpec | None = Field(None, description="Preferred departure time range")
     arrival_time: TimeSpec | None = Field(None, description="Preferred arrival time range")
-    cabin_class: str = Field("economy", description="Cabin class (economy, business, first)")
-    adults: int = Field(1, description="Number of adult passengers")
-    max_connections: int = Field(None, description="Maximum number of connections (0 for non-stop)")
-    additional_stops: Optional[List[dict]] = Field(None, description="Additional stops for multi-city trips") 
\ No newline at end of file
+    cabin_class: CabinClass = Field("economy", description="Cabin class (economy, premium_economy, business, first)")
+    adults: int = Field(1, ge=1, le=9, description="Number of adult passengers")
+    max_connections: Optional[int] = Field(None, ge=0, description="Maximum number of connections (0 for non-stop)")
+    additional_stops: Optional[List[FlightSegment]] = Field(None, description="Additional stops for multi-city trips")
+
+    @model_validator(mode="after")
+    def _check_legs(self) -> "FlightSearch":
+        if self.type == "round_trip" and not self.return_date:
+            raise ValueError("Return date required for round-trip flights")
+        if self.type == "multi_city" and not self.additional_stops:
+            raise ValueError("Additional stops required for multi-city flights")
+        return self
+
+    def segments(self) -> List[FlightSegment]:
+        """The legs of the trip, in order."""
+        first = FlightSegment(origin=self.origin, destination=self.destination, departure_date=self.departure_date)
+        if self.type == "round_trip":
+            return [first, FlightSegment(origin=self.destination, destination=self.origin, departure_date=self.return_date)]
+        if self.type == "multi_city":
+            return [first, *self.additional_stops]
+        return [first]
+
+    def to_query(self) -> OfferQuery:
+        return OfferQuery.from_segments(
+            self.segments(),
+            self.departure_time,
+            self.arrival_time,
+            cabin_class=self.cabin_class,
+            adults=self.adults,
+            max_connections=self.max_connections,
+        )
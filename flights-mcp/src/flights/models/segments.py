@@ -1,9 +1,13 @@
 """Flight segment models."""
 
-from pydantic import BaseModel, Field
+import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from .types import AirportCode
 
 class FlightSegment(BaseModel):
     """Model for a single flight segment in a multi-city trip."""
-    origin: str = Field(..., description="Origin airport code")
-    destination: str = Field(..., description="Destination airport code") 
-    departure_date: str = Field(..., description="Departure date (YYYY-MM-DD)") 
\ No newline at end of file
+    model_config = ConfigDict(frozen=True)
+
+    origin: AirportCode = Field(..., description="Origin airport code")
+    destination: AirportCode = Field(..., description="Destination airport code")
+    departure_date: datetime.date = Field(..., description="Departure date (YYYY-MM-DD)")
@@ -1,8 +1,20 @@
 """Time specification models."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 class TimeSpec(BaseModel):
     """Model for time range specification."""
+    model_config = ConfigDict(frozen=True)
+
     from_time: str = Field(..., description="Start time (HH:MM)", pattern="^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")
-    to_time: str = Field(..., description="End time (HH:MM)", pattern="^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$") 
\ No newline at end of file
+    to_time: str = Field(..., description="End time (HH:MM)", pattern="^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")
+
+    @field_validator("from_time", "to_time")
+    @classmethod
+    def _zero_pad(cls, value: str) -> str:
+        # "7:30" and "07:30" are the same window; Duffel expects the latter
+        return value.zfill(5)
+
+
+# The window used when a search does not restrict times
+ANY_TIME = TimeSpec(from_time="00:00", to_time="23:59")
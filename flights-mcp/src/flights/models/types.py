@@ -0,0 +1,11 @@
+"""Field types shared by the request models."""
+
+from typing import Annotated, Literal
+from pydantic import StringConstraints
+
+# IATA airport or city code, normalized to upper case
+AirportCode = Annotated[
+    str, StringConstraints(strip_whitespace=True, to_upper=True, pattern="^[A-Za-z]{3}$")
+]
+
+CabinClass = Literal["economy", "premium_economy", "business", "first"]
@@ -2,6 +2,7 @@
 
 import logging
 from .services.search import mcp
+from .telemetry import configure_telemetry
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -9,6 +10,7 @@ logger = logging.getLogger(__name__)
 def main():
     """Entry point for the find-flights-mcp application."""
     logger.info("Starting Find Flights MCP server")
+    configure_telemetry()
     try:
         mcp.run(transport='stdio')
         logger.info("Server initialized successfully")
@@ -1,280 +1,175 @@
 """Flight search tools using Duffel API."""
 
 import logging
-from typing import Dict
+from typing import Dict, List, Optional
 import json
 from mcp.server.fastmcp import FastMCP
+from mcp.types import Tool as MCPTool
 
 # Import all models through flight_search
 from ..models.flight_search import (
     FlightSearch,
     MultiCityRequest,
-    OfferDetails
+    OfferDetails,
+    OfferQuery
 )
-from ..models.time_specs import TimeSpec
 from ..api import DuffelClient
+from ..telemetry import traced_tool
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Initialize FastMCP server and API client
-mcp = FastMCP("find-flights-mcp")
-flight_client = DuffelClient(logger)
+class FlightsMCP(FastMCP):
+    """FastMCP server that builds its tool list once.
 
+    FastMCP rebuilds and revalidates every tool definition on each
+    tools/list request; ours only change when a tool is registered.
+    """
 
-def _create_slice(origin: str, destination: str, date: str, 
-                 departure_time: TimeSpec | None = None,
-                 arrival_time: TimeSpec | None = None) -> Dict:
-    """Helper to create a slice with time ranges."""
-    slice_data = {
-        "origin": origin,
-        "destination": destination,
-        "departure_date": date,
-        "departure_time": {
-            "from": "00:00",
-            "to": "23:59"
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._listed_tools: Optional[List[MCPTool]] = None
+
+    def add_tool(self, *args, **kwargs) -> None:
+        self._listed_tools = None
+        super().add_tool(*args, **kwargs)
+
+    def remove_tool(self, name: str) -> None:
+        self._listed_tools = None
+        super().remove_tool(name)
+
+    async def list_tools(self) -> List[MCPTool]:
+        if self._listed_tools is None:
+            self._listed_tools = await super().list_tools()
+        return self._listed_tools
+
+
+# Initialize FastMCP server
+mcp = FlightsMCP("find-flights-mcp")
+
+# The API client is built by the first tool call rather than at import, so a
+# session's handshake doesn't wait on it and a missing key fails the call, not the server
+flight_client: DuffelClient | None = None
+
+
+def get_flight_client() -> DuffelClient:
+    """Shared Duffel API client, created on first use."""
+    global flight_client
+    if flight_client is None:
+        flight_client = DuffelClient(logger)
+    return flight_client
+
+
+# (offers returned, supplier timeout in ms) per trip type; multi-city searches
+# take Duffel's suppliers longer and return larger offers
+SEARCH_LIMITS = {
+    "one_way": (50, 15000),
+    "round_trip": (50, 15000),
+    "multi_city": (10, 30000),
+}
+
+
+def _format_offer(offer: Dict) -> Dict:
+    """Essential details of an offer: price and a summary of each slice.
+
+    Only reads the fields in api.streaming.OFFER_FIELDS; keep the two in step.
+    """
+    offer_details = {
+        'offer_id': offer.get('id'),
+        'price': {
+            'amount': offer.get('total_amount'),
+            'currency': offer.get('total_currency')
         },
-        "arrival_time": {
-            "from": "00:00",
-            "to": "23:59"
-        }
+        'slices': []
     }
-    
-    if departure_time:
-        slice_data["departure_time"] = {
-            "from": departure_time.from_time,
-            "to": departure_time.to_time
-        }
-    
-    if arrival_time:
-        slice_data["arrival_time"] = {
-            "from": arrival_time.from_time,
-            "to": arrival_time.to_time
+
+    for slice in offer.get('slices', []):
+        segments = slice.get('segments', [])
+        if not segments:
+            continue
+        slice_details = {
+            'origin': slice['origin']['iata_code'],
+            'destination': slice['destination']['iata_code'],
+            'departure': segments[0].get('departing_at'),  # First segment departure
+            'arrival': segments[-1].get('arriving_at'),    # Last segment arrival
+            'duration': slice.get('duration'),
+            'carrier': segments[0].get('marketing_carrier', {}).get('name'),
+            'stops': len(segments) - 1,
+            'stops_description': 'Non-stop' if len(segments) == 1 else f'{len(segments) - 1} stop{"s" if len(segments) - 1 > 1 else ""}',
+            'connections': []
         }
-    
-    return slice_data
 
-@mcp.tool()
+        # Add connection information if there are multiple segments
+        for i in range(len(segments) - 1):
+            slice_details['connections'].append({
+                'airport': segments[i].get('destination', {}).get('iata_code'),
+                'arrival': segments[i].get('arriving_at'),
+                'departure': segments[i+1].get('departing_at'),
+                'duration': segments[i+1].get('duration')
+            })
+
+        offer_details['slices'].append(slice_details)
+
+    return offer_details
+
+
+async def _search(query: OfferQuery, trip_type: str) -> str:
+    """Run an offer request and format its offers for the agent."""
+    max_offers, supplier_timeout = SEARCH_LIMITS[trip_type]
+    async with get_flight_client() as client:
+        response = await client.create_offer_request(
+            slices=query.duffel_slices(),
+            cabin_class=query.cabin_class,
+            adult_count=query.adults,
+            max_connections=query.max_connections,
+            return_offers=True,
+            supplier_timeout=supplier_timeout,
+            cache_key=query.cache_key,
+            max_offers=max_offers
+        )
+
+    formatted_response = {
+        'offers': [_format_offer(offer) for offer in response.get('offers', [])[:max_offers]]
+    }
+    # Streamed responses stop at the first offers, so the ID is missing when Duffel sends it after them
+    if response['request_id'] is not None:
+        formatted_response = {'request_id': response['request_id'], **formatted_response}
+    return json.dumps(formatted_response, separators=(',', ':'))
+
+
+# Results are JSON text for the agent; a structured copy would double every
+# response and be revalidated against an output schema on each call
+@mcp.tool(structured_output=False)
+@traced_tool
 async def search_flights(params: FlightSearch) -> str:
     """Search for flights based on parameters."""
     try:
-        slices = []
-        
-        # Build slices based on flight type
-        if params.type == "one_way":
-            slices = [_create_slice(
-                params.origin, 
-                params.destination, 
-                params.departure_date,
-                params.departure_time,
-                params.arrival_time
-            )]
-        elif params.type == "round_trip":
-            if not params.return_date:
-                raise ValueError("Return date required for round-trip flights")
-            slices = [
-                _create_slice(
-                    params.origin,
-                    params.destination,
-                    params.departure_date,
-                    params.departure_time,
-                    params.arrival_time
-                ),
-                _create_slice(
-                    params.destination,
-                    params.origin,
-                    params.return_date,
-                    params.departure_time,
-                    params.arrival_time
-                )
-            ]
-        elif params.type == "multi_city":
-            if not params.additional_stops:
-                raise ValueError("Additional stops required for multi-city flights")
-            
-            # First leg
-            slices.append({
-                "origin": params.origin,
-                "destination": params.destination,
-                "departure_date": params.departure_date,
-                "departure_time": {
-                    "from": "00:00",
-                    "to": "23:59"
-                },
-                "arrival_time": {
-                    "from": "00:00",
-                    "to": "23:59"
-                }
-            })
-            
-            # Additional legs
-            for stop in params.additional_stops:
-                slices.append({
-                    "origin": stop["origin"],
-                    "destination": stop["destination"],
-                    "departure_date": stop["departure_date"],
-                    "departure_time": {
-                        "from": "00:00",
-                        "to": "23:59"
-                    },
-                    "arrival_time": {
-                        "from": "00:00",
-                        "to": "23:59"
-                    }
-                })
-        
-        # Use async context manager
-        async with flight_client as client:
-            response = await client.create_offer_request(
-                slices=slices,
-                cabin_class=params.cabin_class,
-                adult_count=params.adults,
-                max_connections=params.max_connections,
-                return_offers=True,
-                supplier_timeout=15000
-            )
-        
-        # Format the response
-        formatted_response = {
-            'request_id': response['request_id'],
-            'offers': []
-        }
-        
-        # Get all offers (limit to 10 to manage response size)
-        for offer in response.get('offers', [])[:50]:  # Keep the slice to limit offers
-            offer_details = {
-                'offer_id': offer.get('id'),
-                'price': {
-                    'amount': offer.get('total_amount'),
-                    'currency': offer.get('total_currency')
-                },
-                'slices': []
-            }
-            
-            # Only include essential slice details
-            for slice in offer.get('slices', []):
-                segments = slice.get('segments', [])
-                if segments:  # Check if there are any segments
-                    slice_details = {
-                        'origin': slice['origin']['iata_code'],
-                        'destination': slice['destination']['iata_code'],
-                        'departure': segments[0].get('departing_at'),  # First segment departure
-                        'arrival': segments[-1].get('arriving_at'),    # Last segment arrival
-                        'duration': slice.get('duration'),
-                        'carrier': segments[0].get('marketing_carrier', {}).get('name'),
-                        'stops': len(segments) - 1,
-                        'stops_description': 'Non-stop' if len(segments) == 1 else f'{len(segments) - 1} stop{"s" if len(segments) - 1 > 1 else ""}',
-                        'connections': []
-                    }
-                    
-                    # Add connection information if there are multiple segments
-                    if len(segments) > 1:
-                        for i in range(len(segments)-1):
-                            connection = {
-                                'airport': segments[i].get('destination', {}).get('iata_code'),
-                                'arrival': segments[i].get('arriving_at'),
-                                'departure': segments[i+1].get('departing_at'),
-                                'duration': segments[i+1].get('duration')
-                            }
-                            slice_details['connections'].append(connection)
-                    
-                    offer_details['slices'].append(slice_details)
-            
-            formatted_response['offers'].append(offer_details)
-        
-        return json.dumps(formatted_response, indent=2)
-            
+        return await _search(params.to_query(), params.type)
     except Exception as e:
         logger.error(f"Error searching flights: {str(e)}", exc_info=True)
         raise
 
-@mcp.tool()
+@mcp.tool(structured_output=False)
+@traced_tool
 async def get_offer_details(params: OfferDetails) -> str:
     """Get detailed information about a specific flight offer."""
     try:
-        async with flight_client as client:
+        async with get_flight_client() as client:
             response = await client.get_offer(
                 offer_id=params.offer_id
             )
-            return json.dumps(response, indent=2)
+            return json.dumps(response, separators=(',', ':'))
             
     except Exception as e:
         logger.error(f"Error getting offer details: {str(e)}", exc_info=True)
         raise
 
-@mcp.tool(name="search_multi_city")
+@mcp.tool(name="search_multi_city", structured_output=False)
+@traced_tool
 async def search_multi_city(params: MultiCityRequest) -> str:
     """Search for multi-city flights."""
     try:
-        slices = []
-        for segment in params.segments:
-            slices.append(_create_slice(
-                segment.origin,
-                segment.destination,
-                segment.departure_date,
-                None,
-                None
-            ))
-
-        # Use async context manager with shorter timeout
-        async with flight_client as client:
-            response = await client.create_offer_request(
-                slices=slices,
-                cabin_class=params.cabin_class,
-                adult_count=params.adults,
-                max_connections=params.max_connections,
-                return_offers=True,
-                supplier_timeout=30000  # Increased timeout for multi-city
-            )
-        
-            # Format response inside the context
-            formatted_response = {
-                'request_id': response['request_id'],
-                'offers': []
-            }
-            
-            # Process offers inside the context
-            for offer in response.get('offers', [])[:10]:
-                offer_details = {
-                    'offer_id': offer.get('id'),
-                    'price': {
-                        'amount': offer.get('total_amount'),
-                        'currency': offer.get('total_currency')
-                    },
-                    'slices': []
-                }
-                
-                for slice in offer.get('slices', []):
-                    segments = slice.get('segments', [])
-                    if segments:
-                        slice_details = {
-                            'origin': slice['origin']['iata_code'],
-                            'destination': slice['destination']['iata_code'],
-                            'departure': segments[0].get('departing_at'),
-                            'arrival': segments[-1].get('arriving_at'),
-                            'duration': slice.get('duration'),
-                            'carrier': segments[0].get('marketing_carrier', {}).get('name'),
-                            'stops': len(segments) - 1,
-                            'stops_description': 'Non-stop' if len(segments) == 1 else f'{len(segments) - 1} stop{"s" if len(segments) - 1 > 1 else ""}',
-                            'connections': []
-                        }
-                        
-                        if len(segments) > 1:
-                            for i in range(len(segments)-1):
-                                connection = {
-                                    'airport': segments[i].get('destination', {}).get('iata_code'),
-                                    'arrival': segments[i].get('arriving_at'),
-                                    'departure': segments[i+1].get('departing_at'),
-                                    'duration': segments[i+1].get('duration')
-                                }
-                                slice_details['connections'].append(connection)
-                        
-                        offer_details['slices'].append(slice_details)
-                
-                formatted_response['offers'].append(offer_details)
-            
-            return json.dumps(formatted_response, indent=2)
-            
+        return await _search(params.to_query(), params.type)
     except Exception as e:
         logger.error(f"Error searching flights: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
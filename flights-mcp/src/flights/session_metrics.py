@@ -0,0 +1,71 @@
+"""MCP session utilization reporter for autoscaling.
+
+socat forks one ``flights-mcp`` process per client connection, so the number
+of sessions a task is serving is the number of those processes. This reporter
+runs next to socat and writes the count, and its share of
+``MCP_MAX_SESSIONS``, to stdout every interval in CloudWatch Embedded Metric
+Format. The service's target tracking policy follows the utilization.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+NAMESPACE = "TripPlanner"
+SERVICE = "flights-mcp"
+SESSION_COMMAND = "flights-mcp"
+
+
+def count_sessions(proc: str = "/proc") -> int:
+    """Number of running MCP server processes, one per session."""
+    sessions = 0
+    for pid in os.listdir(proc):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(os.path.join(proc, pid, "cmdline"), "rb") as cmdline:
+                args = cmdline.read().split(b"\0")
+        except OSError:
+            # The process exited while we were looking
+            continue
+        if any(os.path.basename(arg.decode(errors="replace")) == SESSION_COMMAND for arg in args if arg):
+            sessions += 1
+    return sessions
+
+
+def emf_record(sessions: int, max_sessions: int, timestamp: Optional[float] = None) -> Dict:
+    """CloudWatch Embedded Metric Format document for one sample."""
+    return {
+        "_aws": {
+            "Timestamp": int((timestamp if timestamp is not None else time.time()) * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": NAMESPACE,
+                    "Dimensions": [["Service"]],
+                    "Metrics": [
+                        {"Name": "McpSessions", "Unit": "Count"},
+                        {"Name": "McpSessionUtilization", "Unit": "Percent"},
+                    ],
+                }
+            ],
+        },
+        "Service": SERVICE,
+        "McpSessions": sessions,
+        "McpSessionUtilization": round(100.0 * sessions / max_sessions, 2) if max_sessions else 0.0,
+    }
+
+
+def main() -> None:
+    """Entry point for ``flights-mcp-metrics``."""
+    max_sessions = int(os.getenv("MCP_MAX_SESSIONS", "32"))
+    interval = float(os.getenv("SCALING_METRICS_INTERVAL", "60"))
+    while True:
+        sys.stdout.write(json.dumps(emf_record(count_sessions(), max_sessions), separators=(',', ':')) + "\n")
+        sys.stdout.flush()
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Cold-start profile of the MCP server.
+
+socat starts a new ``flights-mcp`` process for every client connection, so
+the time to import the server is paid once per session. This runs the import
+in a fresh interpreter under ``-X importtime`` and reports where the time
+goes, grouped by top-level package. Run it with ``flights-mcp --profile-startup``;
+the backend's ``benchmarks/startup.py`` points the same functions at its app.
+"""
+
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+SERVER_MODULE = "flights.server"
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) for each line of ``-X importtime`` output."""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The header line
+            continue
+        entries.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return entries
+
+
+def cold_start_seconds(module: str = SERVER_MODULE, env: Optional[Dict[str, str]] = None) -> float:
+    """Wall time for a fresh interpreter to start and import module."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True, env=env)
+    return time.perf_counter() - started
+
+
+def profile_imports(module: str = SERVER_MODULE, env: Optional[Dict[str, str]] = None) -> Dict:
+    """Import time of module in a fresh interpreter, with self time per top-level package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True, capture_output=True, text=True, env=env,
+    )
+    packages: Dict[str, int] = {}
+    for name, self_us, _ in parse_importtime(result.stderr):
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "module": module,
+        "import_ms": round(sum(packages.values()) / 1000, 1),
+        "cold_start_ms": round(cold_start_seconds(module, env) * 1000, 1),
+        "packages": [[name, round(us / 1000, 1)] for name, us in ranked],
+    }
+
+
+def format_profile(profile: Dict, top: int = 15) -> str:
+    lines = [
+        f"Cold start of {profile['module']}: {profile['cold_start_ms']:.0f} ms "
+        f"({profile['import_ms']:.0f} ms importing)",
+        f"{'package':<32}{'self ms':>10}",
+    ]
+    for name, ms in profile["packages"][:top]:
+        lines.append(f"{name:<32}{ms:>10.1f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    print(format_profile(profile_imports()))
+
+
+if __name__ == "__main__":
+    main()
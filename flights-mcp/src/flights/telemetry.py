@@ -0,0 +1,125 @@
+"""OpenTelemetry tracing and metrics for the flights MCP server."""
+
+import functools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from opentelemetry import context, metrics, propagate, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "flights-mcp")
+
+# Bound to the real providers once configure_telemetry() runs
+tracer = trace.get_tracer("flights-mcp")
+meter = metrics.get_meter("flights-mcp")
+
+tool_duration = meter.create_histogram(
+    "flights.tool.duration", unit="s", description="MCP tool call latency"
+)
+duffel_duration = meter.create_histogram(
+    "flights.duffel.request.duration", unit="s", description="Duffel HTTP request latency per attempt"
+)
+rate_limit_wait = meter.create_histogram(
+    "flights.rate_limit.wait", unit="s", description="Time spent waiting for a rate limit token"
+)
+# Hit ratio is hits / (hits + misses) over this counter's "result" attribute
+stale_cache_lookups = meter.create_counter(
+    "flights.stale_cache.lookups", description="Stale-response fallbacks by result (hit/miss)"
+)
+
+
+def configure_telemetry() -> None:
+    """Export traces and metrics over OTLP/HTTP when a collector is configured.
+
+    Requires the ``telemetry`` extra. Without it, or without
+    OTEL_EXPORTER_OTLP_ENDPOINT, every instrument is a no-op.
+    """
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return
+
+    try:
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT is set but the telemetry extra is not installed")
+        return
+
+    resource = Resource.create({"service.name": SERVICE_NAME})
+    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(tracer_provider)
+    metrics.set_meter_provider(MeterProvider(
+        resource=resource,
+        metric_readers=[PeriodicExportingMetricReader(OTLPMetricExporter())],
+    ))
+
+
+def _incoming_context() -> Optional[context.Context]:
+    """Trace context the MCP client injected into the request's _meta field."""
+    from mcp.server.lowlevel.server import request_ctx
+
+    try:
+        meta = request_ctx.get().meta
+    except LookupError:
+        return None
+    if meta is None:
+        return None
+    carrier: Dict[str, Any] = meta.model_dump(exclude_none=True)
+    return propagate.extract(carrier)
+
+
+def traced_tool(fn: Callable) -> Callable:
+    """Wrap an MCP tool in a server span that continues the caller's trace."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        status = "ok"
+        with tracer.start_as_current_span(
+            f"mcp.tool {name}", context=_incoming_context(), kind=SpanKind.SERVER
+        ) as span:
+            span.set_attribute("mcp.tool.name", name)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                status = "error"
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                raise
+            finally:
+                tool_duration.record(time.perf_counter() - started, {"mcp.tool.name": name, "status": status})
+
+    return wrapper
+
+
+@asynccontextmanager
+async def duffel_span(endpoint: str, method: str, url: str):
+    """Client span and latency measurement for one Duffel HTTP attempt."""
+    started = time.perf_counter()
+    attributes = {"duffel.endpoint": endpoint, "http.request.method": method}
+    outcome = "ok"
+    with tracer.start_as_current_span(f"Duffel {method} {endpoint}", kind=SpanKind.CLIENT) as span:
+        span.set_attribute("url.full", url)
+        span.set_attributes(attributes)
+        try:
+            yield span
+        except BaseException as e:
+            outcome = "cancelled" if not isinstance(e, Exception) else "error"
+            response = getattr(e, "response", None)
+            if response is not None:
+                span.set_attribute("http.response.status_code", response.status_code)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            raise
+        finally:
+            duffel_duration.record(time.perf_counter() - started, {**attributes, "outcome": outcome})
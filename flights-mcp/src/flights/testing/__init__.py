@@ -0,0 +1,5 @@
+"""Offline testing helpers."""
+
+from .fake_duffel import FakeDuffel, FakeDuffelConfig, create_app
+
+__all__ = ['FakeDuffel', 'FakeDuffelConfig', 'create_app']
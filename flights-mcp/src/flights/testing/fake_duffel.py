@@ -0,0 +1,226 @@
+"""Local stand-in for the Duffel Air API.
+
+Serves synthetic offer requests and offers so the MCP server can be
+exercised and load tested without a Duffel key or network access. Point
+the server at it with ``DUFFEL_BASE_URL=http://localhost:8765/air``.
+"""
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+HUBS = ["ATL", "DEN", "DFW", "ORD", "PHX", "SEA", "IAH", "CLT", "MSP", "DTW"]
+CARRIERS = ["Duffel Airways", "United Airlines", "Delta Air Lines", "American Airlines", "Alaska Airlines"]
+
+
+@dataclass
+class FakeDuffelConfig:
+    """Shape and behaviour of the synthetic Duffel responses."""
+    offer_count: int = 50
+    max_segments: int = 3
+    padding_bytes: int = 0
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: int = 42
+    max_stored_offers: int = 10000
+
+
+class FakeDuffel:
+    """Generates deterministic synthetic offers and serves them over HTTP."""
+
+    def __init__(self, config: Optional[FakeDuffelConfig] = None):
+        self.config = config or FakeDuffelConfig()
+        self.rng = random.Random(self.config.seed)
+        self.requests_served = 0
+        self.errors_injected = 0
+        self._ids = itertools.count(1)
+        self._offers: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _segment(self, origin: str, destination: str, departing: datetime.datetime) -> Dict[str, Any]:
+        minutes = self.rng.randint(55, 360)
+        arriving = departing + datetime.timedelta(minutes=minutes)
+        carrier = self.rng.choice(CARRIERS)
+        return {
+            "id": f"seg_{next(self._ids):010d}",
+            "origin": {"iata_code": origin, "type": "airport", "name": f"{origin} International"},
+            "destination": {"iata_code": destination, "type": "airport", "name": f"{destination} International"},
+            "departing_at": departing.isoformat(timespec="seconds"),
+            "arriving_at": arriving.isoformat(timespec="seconds"),
+            "duration": f"PT{minutes // 60}H{minutes % 60}M",
+            "marketing_carrier": {"name": carrier, "iata_code": carrier[:2].upper()},
+            "operating_carrier": {"name": carrier, "iata_code": carrier[:2].upper()},
+            "marketing_carrier_flight_number": str(self.rng.randint(100, 9999)),
+            "aircraft": {"name": self.rng.choice(["Airbus A320", "Boeing 737", "Boeing 787-9"])},
+            "passengers": [{
+                "cabin_class": "economy",
+                "baggages": [{"type": "checked", "quantity": 1}, {"type": "carry_on", "quantity": 1}],
+            }],
+        }
+
+    def _slice(self, requested: Dict[str, Any]) -> Dict[str, Any]:
+        origin = requested["origin"]
+        destination = requested["destination"]
+        stops = self.rng.randint(0, max(0, self.config.max_segments - 1))
+        route = [origin] + self.rng.sample(HUBS, stops) + [destination]
+
+        departing = datetime.datetime.fromisoformat(requested["departure_date"]) + datetime.timedelta(
+            minutes=self.rng.randint(5 * 60, 22 * 60)
+        )
+        segments = []
+        for leg_origin, leg_destination in zip(route, route[1:]):
+            segment = self._segment(leg_origin, leg_destination, departing)
+            segments.append(segment)
+            departing = datetime.datetime.fromisoformat(segment["arriving_at"]) + datetime.timedelta(
+                minutes=self.rng.randint(40, 180)
+            )
+
+        total = datetime.datetime.fromisoformat(segments[-1]["arriving_at"]) - datetime.datetime.fromisoformat(
+            segments[0]["departing_at"]
+        )
+        minutes = int(total.total_seconds() // 60)
+        return {
+            "id": f"sli_{next(self._ids):010d}",
+            "origin": {"iata_code": origin, "type": "airport"},
+            "destination": {"iata_code": destination, "type": "airport"},
+            "duration": f"PT{minutes // 60}H{minutes % 60}M",
+            "segments": segments,
+            "conditions": {"change_before_departure": {"allowed": self.rng.random() < 0.5}},
+        }
+
+    def _offer(self, slices: List[Dict[str, Any]], passengers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        offer = {
+            "id": f"off_{next(self._ids):010d}",
+            "total_amount": f"{self.rng.uniform(89, 1800):.2f}",
+            "total_currency": "USD",
+            "expires_at": (datetime.datetime.now() + datetime.timedelta(minutes=30)).isoformat(timespec="seconds"),
+            "owner": {"name": self.rng.choice(CARRIERS)},
+            "slices": [self._slice(requested) for requested in slices],
+            "passengers": [{"id": f"pas_{i}", "type": p.get("type", "adult")} for i, p in enumerate(passengers)],
+            "conditions": {
+                "refund_before_departure": {"allowed": False},
+                "change_before_departure": {"allowed": True, "penalty_amount": "75.00"},
+            },
+        }
+        if self.config.padding_bytes:
+            offer["metadata"] = "x" * self.config.padding_bytes
+        return offer
+
+    def _store(self, offer: Dict[str, Any]) -> None:
+        self._offers[offer["id"]] = offer
+        while len(self._offers) > self.config.max_stored_offers:
+            self._offers.popitem(last=False)
+
+    async def _delay_or_fail(self) -> Optional[JSONResponse]:
+        """Apply injected latency and, occasionally, an injected error."""
+        self.requests_served += 1
+        delay = self.config.latency_ms + self.rng.uniform(0, self.config.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if self.rng.random() < self.config.error_rate:
+            self.errors_injected += 1
+            headers = {"retry-after": "0"} if self.config.error_status == 429 else None
+            return JSONResponse(
+                {"errors": [{"title": "Injected failure", "code": "fake_duffel_error"}]},
+                status_code=self.config.error_status,
+                headers=headers,
+            )
+        return None
+
+    async def create_offer_request(self, request: Request) -> JSONResponse:
+        error = await self._delay_or_fail()
+        if error:
+            return error
+
+        body = await request.json()
+        data = body.get("data", {})
+        slices = data.get("slices") or []
+        if not slices or any(len(s.get("origin", "")) != 3 or len(s.get("destination", "")) != 3 for s in slices):
+            return JSONResponse(
+                {"errors": [{"title": "Invalid slices", "code": "validation_error"}]}, status_code=422
+            )
+
+        passengers = data.get("passengers") or [{"type": "adult"}]
+        offers = []
+        if request.query_params.get("return_offers", "true") == "true":
+            offers = [self._offer(slices, passengers) for _ in range(self.config.offer_count)]
+            for offer in offers:
+                self._store(offer)
+
+        return JSONResponse({
+            "data": {
+                "id": f"orq_{next(self._ids):010d}",
+                "live_mode": False,
+                "cabin_class": data.get("cabin_class", "economy"),
+                "slices": slices,
+                "passengers": passengers,
+                "offers": offers,
+            }
+        }, status_code=201)
+
+    async def get_offer(self, request: Request) -> JSONResponse:
+        error = await self._delay_or_fail()
+        if error:
+            return error
+
+        offer = self._offers.get(request.path_params["offer_id"])
+        if offer is None:
+            return JSONResponse({"errors": [{"title": "Not found", "code": "not_found"}]}, status_code=404)
+        return JSONResponse({"data": offer})
+
+    def app(self) -> Starlette:
+        """ASGI application serving the Duffel Air routes under /air."""
+        return Starlette(routes=[
+            Route("/air/offer_requests", self.create_offer_request, methods=["POST"]),
+            Route("/air/offers/{offer_id}", self.get_offer, methods=["GET"]),
+        ])
+
+
+def create_app(config: Optional[FakeDuffelConfig] = None) -> Starlette:
+    """Build a fake Duffel ASGI app."""
+    return FakeDuffel(config).app()
+
+
+def main():
+    """Run the fake Duffel server."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Duffel Air API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--offers", type=int, default=50, help="Offers returned per offer request")
+    parser.add_argument("--max-segments", type=int, default=3, help="Maximum segments per slice")
+    parser.add_argument("--padding-bytes", type=int, default=0, help="Extra bytes added to each offer")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="Status code of injected failures")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = FakeDuffelConfig(
+        offer_count=args.offers,
+        max_segments=args.max_segments,
+        padding_bytes=args.padding_bytes,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
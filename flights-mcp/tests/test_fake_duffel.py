@@ -0,0 +1,101 @@
+"""Offline tests for the search tools against the local Duffel stand-in."""
+
+import os
+import json
+import logging
+
+import httpx
+import pytest
+
+os.environ.setdefault("DUFFEL_API_KEY_LIVE", "duffel_test_offline")
+
+from flights.api import DuffelClient
+from flights.config import RateLimitConfig, ResilienceConfig
+from flights.models.multi_city import MultiCityRequest
+from flights.models.search import FlightSearch
+from flights.services import search
+from flights.testing import FakeDuffel, FakeDuffelConfig
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def fake():
+    return FakeDuffel(FakeDuffelConfig(offer_count=60, max_segments=3))
+
+
+@pytest.fixture
+async def client(fake, monkeypatch):
+    """Point the search tools at the fake server."""
+    client = DuffelClient(
+        logger,
+        resilience=ResilienceConfig(base_delay=0.0, max_delay=0.0),
+        transport=httpx.ASGITransport(app=fake.app()),
+        rate_limits=RateLimitConfig(limits={}),
+        base_url="http://fake-duffel/air",
+    )
+    monkeypatch.setattr(search, "flight_client", client)
+    yield client
+    await client.aclose()
+
+
+async def test_search_flights_round_trip(client):
+    """Round trips are formatted into at most 50 offers with two slices each."""
+    result = json.loads(await search.search_flights(FlightSearch(
+        type="round_trip",
+        origin="SFO",
+        destination="JFK",
+        departure_date="2030-01-10",
+        return_date="2030-01-15",
+    )))
+
+    assert result["request_id"].startswith("orq_")
+    assert len(result["offers"]) == 50
+    offer = result["offers"][0]
+    assert [s["origin"] for s in offer["slices"]] == ["SFO", "JFK"]
+    for slice_details in offer["slices"]:
+        assert slice_details["stops"] == len(slice_details["connections"])
+
+
+async def test_search_multi_city(client):
+    """Multi-city searches are limited to 10 offers."""
+    result = json.loads(await search.search_multi_city(MultiCityRequest(
+        type="multi_city",
+        segments=[
+            {"origin": "SFO", "destination": "JFK", "departure_date": "2030-01-10"},
+            {"origin": "JFK", "destination": "LHR", "departure_date": "2030-01-14"},
+        ],
+    )))
+
+    assert len(result["offers"]) == 10
+    assert [s["destination"] for s in result["offers"][0]["slices"]] == ["JFK", "LHR"]
+
+
+async def test_get_offer_round_trip(client):
+    """Offers returned by a search can be fetched by ID."""
+    response = await client.create_offer_request(
+        slices=[{"origin": "SFO", "destination": "LAX", "departure_date": "2030-01-10"}]
+    )
+    offer_id = response["offers"][0]["id"]
+
+    details = await client.get_offer(offer_id)
+    assert details["data"]["id"] == offer_id
+
+
+async def test_injected_errors_are_retried(fake, client):
+    """Injected 5xx errors are absorbed by the retry policy."""
+    fake.config.error_rate = 0.5
+    for _ in range(5):
+        response = await client.create_offer_request(
+            slices=[{"origin": "SFO", "destination": "LAX", "departure_date": "2030-01-10"}]
+        )
+        assert response["offers"]
+    assert fake.errors_injected > 0
+
+
+async def test_invalid_airports_are_rejected(client):
+    """Malformed slices get a 422 like the real API."""
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.create_offer_request(
+            slices=[{"origin": "INVALID", "destination": "ALSO_INVALID", "departure_date": "2030-01-10"}]
+        )
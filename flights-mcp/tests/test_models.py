@@ -0,0 +1,88 @@
+"""Tests for request normalization and the tool definitions."""
+
+import os
+
+import pytest
+from pydantic import ValidationError
+
+os.environ.setdefault("DUFFEL_API_KEY_LIVE", "duffel_test_offline")
+
+from flights.models.flight_search import FlightSearch, MultiCityRequest
+from flights.services import search
+
+
+def _multi_city(**overrides):
+    return MultiCityRequest(**{
+        "type": "multi_city",
+        "segments": [
+            {"origin": "SFO", "destination": "JFK", "departure_date": "2030-01-10"},
+            {"origin": "JFK", "destination": "LHR", "departure_date": "2030-01-14"},
+        ],
+        **overrides,
+    })
+
+
+def test_equivalent_searches_share_a_cache_key():
+    explicit = FlightSearch(
+        type="one_way", origin="SFO", destination="JFK", departure_date="2030-01-10",
+        departure_time={"from_time": "07:00", "to_time": "12:00"},
+        arrival_time={"from_time": "00:00", "to_time": "23:59"},
+    ).to_query()
+    loose = FlightSearch(
+        type="one_way", origin=" sfo", destination="jfk", departure_date="2030-01-10",
+        departure_time={"from_time": "7:00", "to_time": "12:00"},
+    ).to_query()
+
+    assert loose == explicit
+    assert loose.cache_key == explicit.cache_key
+    assert loose.duffel_slices()[0]["departure_time"] == {"from": "07:00", "to": "12:00"}
+
+
+def test_multi_city_tools_normalize_to_the_same_query():
+    via_search = FlightSearch(
+        type="multi_city", origin="SFO", destination="JFK", departure_date="2030-01-10",
+        additional_stops=[{"origin": "JFK", "destination": "LHR", "departure_date": "2030-01-14"}],
+    ).to_query()
+
+    assert via_search.cache_key == _multi_city().to_query().cache_key
+
+
+def test_round_trip_returns_on_the_return_date():
+    query = FlightSearch(
+        type="round_trip", origin="SFO", destination="JFK",
+        departure_date="2030-01-10", return_date="2030-01-15",
+    ).to_query()
+
+    assert [(s["origin"], s["destination"], s["departure_date"]) for s in query.duffel_slices()] == [
+        ("SFO", "JFK", "2030-01-10"),
+        ("JFK", "SFO", "2030-01-15"),
+    ]
+
+
+@pytest.mark.parametrize("overrides", [
+    {"type": "round_trip"},
+    {"type": "multi_city"},
+    {"origin": "San Francisco"},
+    {"departure_date": "10/01/2030"},
+    {"cabin_class": "coach"},
+    {"adults": 0},
+])
+def test_invalid_searches_fail_validation(overrides):
+    with pytest.raises(ValidationError):
+        FlightSearch(**{
+            "type": "one_way", "origin": "SFO", "destination": "JFK", "departure_date": "2030-01-10",
+            **overrides,
+        })
+
+
+def test_multi_city_time_windows_apply_to_every_leg():
+    query = _multi_city(departure_time={"from_time": "06:00", "to_time": "10:00"}).to_query()
+    assert {s["departure_time"]["from"] for s in query.duffel_slices()} == {"06:00"}
+
+
+async def test_tool_list_is_built_once():
+    first = await search.mcp.list_tools()
+    assert await search.mcp.list_tools() is first
+    assert {tool.name for tool in first} == {"search_flights", "get_offer_details", "search_multi_city"}
+    # Results are returned as text only
+    assert all(tool.outputSchema is None for tool in first)
@@ -0,0 +1,108 @@
+"""Tests for the Duffel token-bucket rate limiter."""
+
+import os
+import asyncio
+import logging
+
+import pytest
+
+os.environ.setdefault("DUFFEL_API_KEY_LIVE", "duffel_test_offline")
+
+from flights.api import RateLimitTimeoutError
+from flights.api.ratelimit import FileBucketBackend, LocalBucketBackend, RateLimiter
+from flights.config import RateLimitConfig
+
+logger = logging.getLogger(__name__)
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_queues():
+    """A full bucket serves its burst immediately, then reserves in order."""
+    clock = FakeClock()
+    backend = LocalBucketBackend(clock)
+
+    waits = [backend.reserve("offers", rate=2.0, capacity=2, max_wait=10) for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.5, 1.0]
+
+
+def test_bucket_refills_over_time():
+    """Tokens refill at the configured rate up to capacity."""
+    clock = FakeClock()
+    backend = LocalBucketBackend(clock)
+    backend.reserve("offers", rate=1.0, capacity=1, max_wait=10)
+
+    clock.now += 5
+    assert backend.reserve("offers", rate=1.0, capacity=1, max_wait=10) == 0.0
+    assert backend.reserve("offers", rate=1.0, capacity=1, max_wait=10) == 1.0
+
+
+def test_reservation_over_timeout_is_not_taken():
+    """A caller that would wait too long is rejected without consuming a token."""
+    clock = FakeClock()
+    backend = LocalBucketBackend(clock)
+    backend.reserve("offers", rate=1.0, capacity=1, max_wait=10)
+
+    assert backend.reserve("offers", rate=1.0, capacity=1, max_wait=0.5) is None
+    assert backend.reserve("offers", rate=1.0, capacity=1, max_wait=10) == 1.0
+
+
+def test_file_backend_is_shared(tmp_path):
+    """Two backends pointed at the same directory share one bucket."""
+    clock = FakeClock()
+    first = FileBucketBackend(str(tmp_path), clock)
+    second = FileBucketBackend(str(tmp_path), clock)
+
+    assert first.reserve("offer_requests", rate=1.0, capacity=1, max_wait=10) == 0.0
+    assert second.reserve("offer_requests", rate=1.0, capacity=1, max_wait=10) == 1.0
+
+
+async def test_limiter_times_out_and_reports_stats():
+    """Waiting callers are timed out and wait times are reported."""
+    waited = []
+
+    async def sleep(delay):
+        waited.append(delay)
+
+    config = RateLimitConfig(limits={"offers": (1.0, 1)}, acquire_timeout=1.5)
+    limiter = RateLimiter(logger, config, sleep=sleep)
+
+    await limiter.acquire("offers")
+    await limiter.acquire("offers")
+    with pytest.raises(RateLimitTimeoutError):
+        await limiter.acquire("offers")
+
+    stats = limiter.stats()["offers"]
+    assert stats["acquired"] == 2
+    assert stats["delayed"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["max_wait"] == pytest.approx(waited[0])
+
+
+async def test_limiter_is_fifo():
+    """Concurrent callers are released in the order they arrived."""
+    config = RateLimitConfig(limits={"offers": (100.0, 1)})
+    limiter = RateLimiter(logger, config)
+    order = []
+
+    async def call(index):
+        await limiter.acquire("offers")
+        order.append(index)
+
+    await asyncio.gather(*(call(i) for i in range(5)))
+    assert order == list(range(5))
+
+
+async def test_unlimited_endpoint_passes_through():
+    """Endpoints without a configured limit are never delayed."""
+    limiter = RateLimiter(logger, RateLimitConfig(limits={}))
+    assert await limiter.acquire("offers") == 0.0
@@ -0,0 +1,237 @@
+"""Tests for the Duffel resilience layer."""
+
+import os
+import asyncio
+import logging
+
+import httpx
+import pytest
+
+os.environ.setdefault("DUFFEL_API_KEY_LIVE", "duffel_test_offline")
+
+from flights.api import DuffelClient, CircuitOpenError, RateLimitTimeoutError
+from flights.api.resilience import CircuitBreaker, ResiliencePolicy, hedged, retry_after
+from flights.config import ResilienceConfig
+
+logger = logging.getLogger(__name__)
+
+OFFER_REQUEST = {"data": {"id": "orq_1", "offers": [{"id": "off_1"}]}}
+SLICES = [{"origin": "SFO", "destination": "LAX", "departure_date": "2030-01-01"}]
+
+
+async def _no_sleep(_delay):
+    return None
+
+
+def _client(handler, **config) -> DuffelClient:
+    """Build a client whose HTTP traffic goes to a mock transport."""
+    settings = {"base_delay": 0.01, "max_delay": 0.01, **config}
+    client = DuffelClient(
+        logger,
+        resilience=ResilienceConfig(**settings),
+        transport=httpx.MockTransport(handler)
+    )
+    client.policy._sleep = _no_sleep
+    return client
+
+
+def test_retry_after_header():
+    """Retry-After seconds and ratelimit-reset dates are both honored."""
+    response = httpx.Response(429, headers={"retry-after": "3"})
+    assert retry_after(response) == 3.0
+
+    response = httpx.Response(200, headers={"ratelimit-remaining": "10", "ratelimit-reset": "5"})
+    assert retry_after(response) is None
+
+    response = httpx.Response(429, headers={"ratelimit-reset": "Thu, 01 Jan 1970 00:00:00 GMT"})
+    assert retry_after(response) == 0.0
+
+
+async def test_retries_server_errors():
+    """5xx responses are retried until one succeeds."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(201, json=OFFER_REQUEST)
+
+    client = _client(handler)
+    response = await client.create_offer_request(slices=SLICES)
+
+    assert response["request_id"] == "orq_1"
+    assert len(calls) == 3
+
+
+async def test_client_errors_are_not_retried():
+    """4xx responses other than 408/429 fail immediately."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(422, json={"errors": []})
+
+    client = _client(handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.create_offer_request(slices=SLICES)
+    assert len(calls) == 1
+
+
+async def test_circuit_breaker_serves_stale_response():
+    """An open circuit fails fast and falls back to the last good response."""
+    healthy = True
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if healthy:
+            return httpx.Response(201, json=OFFER_REQUEST)
+        return httpx.Response(500)
+
+    client = _client(handler, max_attempts=2, breaker_failure_threshold=2)
+    await client.create_offer_request(slices=SLICES)
+
+    healthy = False
+    response = await client.create_offer_request(slices=SLICES)
+    assert response["request_id"] == "orq_1"
+    assert client.policy.breaker("offer_requests").state == CircuitBreaker.OPEN
+
+    # Open circuit: no traffic reaches Duffel and uncached requests fail fast
+    sent = len(calls)
+    other = [{**SLICES[0], "destination": "JFK"}]
+    with pytest.raises(CircuitOpenError):
+        await client.create_offer_request(slices=other)
+    assert len(calls) == sent
+
+
+def test_circuit_breaker_half_open_probe():
+    """After the reset timeout a single probe is let through."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 11
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def _half_open_policy():
+    """Policy whose offers breaker was opened by a 503 and has waited out its reset timeout."""
+    now = [0.0]
+    config = ResilienceConfig(max_attempts=1, breaker_failure_threshold=1, breaker_reset_timeout=10)
+    policy = ResiliencePolicy(logger, config, clock=lambda: now[0], sleep=_no_sleep)
+    policy.breaker("offers").record_failure()
+    now[0] = 11
+    return policy
+
+
+def _status_error(status):
+    request = httpx.Request("GET", "https://api.duffel.com/air/offers")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+
+async def _succeed(timeout):
+    return "ok"
+
+
+async def test_client_error_probe_closes_the_breaker():
+    """A 4xx probe shows Duffel is reachable, so later calls go through."""
+    policy = _half_open_policy()
+
+    async def bad_request(timeout):
+        raise _status_error(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await policy.execute("offers", bad_request)
+    assert policy.breaker("offers").state == CircuitBreaker.CLOSED
+    assert await policy.execute("offers", _succeed) == "ok"
+
+
+async def test_cancelled_probe_lets_the_next_call_probe():
+    """A cancelled probe settles nothing, so the next call probes instead."""
+    policy = _half_open_policy()
+    started = asyncio.Event()
+
+    async def stall(timeout):
+        started.set()
+        await asyncio.sleep(60)
+
+    probe = asyncio.create_task(policy.execute("offers", stall))
+    await started.wait()
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert policy.breaker("offers").state == CircuitBreaker.HALF_OPEN
+
+    assert await policy.execute("offers", _succeed) == "ok"
+    assert policy.breaker("offers").state == CircuitBreaker.CLOSED
+
+
+async def test_probe_that_never_reaches_duffel_is_released():
+    """A probe failing locally, such as on the rate limiter, leaves the breaker half open."""
+    policy = _half_open_policy()
+
+    async def rate_limited(timeout):
+        raise RateLimitTimeoutError("no token")
+
+    with pytest.raises(RateLimitTimeoutError):
+        await policy.execute("offers", rate_limited)
+    assert policy.breaker("offers").state == CircuitBreaker.HALF_OPEN
+    assert await policy.execute("offers", _succeed) == "ok"
+
+
+async def test_hedged_request_uses_faster_attempt():
+    """A slow primary is raced by a backup started after the hedge delay."""
+    started = []
+
+    async def operation():
+        started.append(len(started))
+        if len(started) == 1:
+            await asyncio.sleep(1)
+            return "primary"
+        return "backup"
+
+    assert await hedged(operation, delay=0.01) == "backup"
+    assert len(started) == 2
+
+
+async def test_cancelled_hedge_cancels_the_primary():
+    """A caller's deadline expiring before the hedge delay does not leave the primary running."""
+    primary_cancelled = asyncio.Event()
+
+    async def operation():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            primary_cancelled.set()
+            raise
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(hedged(operation, delay=0.5), timeout=0.01)
+    await asyncio.wait_for(primary_cancelled.wait(), timeout=1)
+
+
+async def test_deadline_stops_retries():
+    """Retries stop once the endpoint deadline cannot fit another backoff."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"retry-after": "60"})
+
+    client = _client(handler, max_attempts=5, call_budget=1.0)
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.create_offer_request(slices=SLICES)
+    assert len(calls) == 1
+
+
+def test_endpoint_deadlines_follow_call_budget():
+    """Per-endpoint deadlines are a share of the MCP call budget."""
+    config = ResilienceConfig(call_budget=30.0)
+    assert config.endpoint_deadline("offer_requests") == 30.0
+    assert config.endpoint_deadline("offers") == pytest.approx(9.9)
+    assert ResiliencePolicy(logger, config).breaker("offers") is not None
@@ -0,0 +1,25 @@
+from flights.session_metrics import count_sessions, emf_record
+
+
+def _process(proc, pid, *args):
+    directory = proc / str(pid)
+    directory.mkdir()
+    (directory / "cmdline").write_bytes(b"\0".join(arg.encode() for arg in args) + b"\0")
+
+
+def test_counts_one_session_per_server_process(tmp_path):
+    _process(tmp_path, 1, "socat", "TCP-LISTEN:6000,reuseaddr,fork", "EXEC:flights-mcp")
+    _process(tmp_path, 10, "/app/.venv/bin/python", "/app/.venv/bin/flights-mcp")
+    _process(tmp_path, 11, "/app/.venv/bin/python", "/app/.venv/bin/flights-mcp")
+    _process(tmp_path, 12, "/app/.venv/bin/python", "/app/.venv/bin/flights-mcp-metrics")
+    (tmp_path / "self").mkdir()
+
+    assert count_sessions(str(tmp_path)) == 2
+
+
+def test_utilization_is_a_share_of_max_sessions():
+    record = emf_record(8, 32, timestamp=1.0)
+    assert record["McpSessions"] == 8
+    assert record["McpSessionUtilization"] == 25.0
+    assert record["_aws"]["Timestamp"] == 1000
+    assert record["_aws"]["CloudWatchMetrics"][0]["Namespace"] == "TripPlanner"
@@ -0,0 +1,36 @@
+"""Cold-start budget for the MCP server, which every socat connection pays."""
+
+import os
+import subprocess
+import sys
+
+from flights.startup import cold_start_seconds
+
+# About 0.8s on a laptop, nearly all of it the MCP SDK's own import
+COLD_START_BUDGET = 1.5
+
+
+def _env():
+    env = dict(os.environ)
+    env.pop("DUFFEL_API_KEY_LIVE", None)
+    return env
+
+
+def _loaded(code):
+    result = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True, env=_env())
+    return result.stdout.strip()
+
+
+def test_package_import_does_not_load_the_mcp_sdk():
+    # The metrics reporter and the CLI import the package without serving
+    assert _loaded("import sys, flights.session_metrics; print('mcp' in sys.modules)") == "False"
+
+
+def test_server_imports_without_api_settings():
+    # The Duffel client is built by the first tool call
+    assert _loaded("import flights.server as s; print(s.mcp.name)") == "find-flights-mcp"
+
+
+def test_cold_start_is_within_budget():
+    # The best of a few runs, so a busy machine doesn't fail the build
+    assert min(cold_start_seconds(env=_env()) for _ in range(3)) < COLD_START_BUDGET
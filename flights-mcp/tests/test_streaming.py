@@ -0,0 +1,69 @@
+"""Tests for the incremental offer request parser."""
+
+import json
+
+import pytest
+
+from flights.api.streaming import parse_offer_request
+from flights.services.search import _format_offer
+from flights.testing import FakeDuffel, FakeDuffelConfig
+
+
+def _body(offer_count=40, id_last=False):
+    fake = FakeDuffel(FakeDuffelConfig(offer_count=offer_count, max_segments=3))
+    slices = [{"origin": "SFO", "destination": "JFK", "departure_date": "2030-01-10"}]
+    data = {
+        "id": "orq_0000000001",
+        "slices": slices,
+        "offers": [fake._offer(slices, [{"type": "adult"}]) for _ in range(offer_count)],
+    }
+    if id_last:
+        data["id"] = data.pop("id")
+    return data, json.dumps({"data": data}).encode()
+
+
+class _Chunks:
+    """Async byte stream that records how much of the body was read."""
+
+    def __init__(self, body, size):
+        self.chunks = [body[i:i + size] for i in range(0, len(body), size)]
+        self.read = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.read == len(self.chunks):
+            raise StopAsyncIteration
+        self.read += 1
+        return self.chunks[self.read - 1]
+
+
+@pytest.mark.parametrize("id_last", [False, True])
+@pytest.mark.parametrize("chunk_size", [7, 4096])
+async def test_summary_formats_like_the_full_offers(id_last, chunk_size):
+    data, body = _body(id_last=id_last)
+    result = await parse_offer_request(_Chunks(body, chunk_size), max_offers=10)
+
+    # An ID after the offers is never reached
+    assert result["request_id"] == (None if id_last else "orq_0000000001")
+    assert [_format_offer(o) for o in result["offers"]] == [_format_offer(o) for o in data["offers"][:10]]
+
+
+@pytest.mark.parametrize("id_last", [False, True])
+async def test_stops_reading_after_the_first_offers(id_last):
+    _, body = _body(offer_count=200, id_last=id_last)
+    chunks = _Chunks(body, 4096)
+    result = await parse_offer_request(chunks, max_offers=5)
+
+    assert len(result["offers"]) == 5
+    assert chunks.read < len(chunks.chunks) / 10
+
+
+async def test_keeps_every_offer_of_a_short_response():
+    data, body = _body(offer_count=3, id_last=True)
+    result = await parse_offer_request(_Chunks(body, 4096), max_offers=50)
+    assert result["request_id"] == "orq_0000000001"
+    assert [o["id"] for o in result["offers"]] == [o["id"] for o in data["offers"]]
+    # Fields the formatter does not read are dropped
+    assert set(result["offers"][0]) == {"id", "total_amount", "total_currency", "slices"}
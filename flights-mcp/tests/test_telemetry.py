@@ -0,0 +1,63 @@
+"""Tests for MCP trace context propagation."""
+
+import os
+
+import pytest
+
+os.environ.setdefault("DUFFEL_API_KEY_LIVE", "duffel_test_offline")
+
+pytest.importorskip("opentelemetry.sdk")
+
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from mcp.types import RequestParams
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from flights.telemetry import traced_tool
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+exporter = InMemorySpanExporter()
+
+
+@pytest.fixture(autouse=True, scope="module")
+def tracer_provider():
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    yield provider
+
+
+@traced_tool
+async def lookup(value: str) -> str:
+    """Example tool."""
+    return value.upper()
+
+
+async def test_tool_span_continues_client_trace():
+    """A traceparent sent in the request _meta becomes the tool span's parent."""
+    exporter.clear()
+    meta = RequestParams.Meta(traceparent=f"00-{TRACE_ID}-{PARENT_ID}-01")
+    token = request_ctx.set(RequestContext(request_id=1, meta=meta, session=None, lifespan_context=None))
+    try:
+        assert await lookup("sfo") == "SFO"
+    finally:
+        request_ctx.reset(token)
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "mcp.tool lookup"
+    assert format(span.context.trace_id, "032x") == TRACE_ID
+    assert format(span.parent.span_id, "016x") == PARENT_ID
+
+
+async def test_tool_span_without_request_context():
+    """Tools called outside an MCP request start a new trace."""
+    exporter.clear()
+    assert await lookup("lax") == "LAX"
+
+    (span,) = exporter.get_finished_spans()
+    assert span.parent is None
@@ -1,4 +1,5 @@
 from aws_cdk import (
+    Duration,
     Stack, 
     aws_ecs_patterns as ecs_patterns, 
     aws_ecs as ecs
@@ -10,7 +11,7 @@ class Frontend(Stack):
         super().__init__(scope, construct_id, **kwargs)
 
         # ECS Fargate service to run Next.js frontend
-        ecs_patterns.ApplicationLoadBalancedFargateService(self, "NextJSService",
+        self.frontend_service = ecs_patterns.ApplicationLoadBalancedFargateService(self, "NextJSService",
             cluster=cluster,
             cpu=1024,
             memory_limit_mib=2048,
@@ -25,4 +26,14 @@ class Frontend(Stack):
                     "NEXT_PUBLIC_API_URL": f"http://{backend_service.load_balancer.load_balancer_dns_name}"
                 }
             )
-        )
\ No newline at end of file
+        )
+
+        # Page requests are short, so request count per task tracks load well
+        scaling = self.frontend_service.service.auto_scale_task_count(min_capacity=1, max_capacity=4)
+        scaling.scale_on_request_count(
+            "RequestCountScaling",
+            requests_per_target=500,
+            target_group=self.frontend_service.target_group,
+            scale_in_cooldown=Duration.minutes(5),
+            scale_out_cooldown=Duration.minutes(1),
+        )
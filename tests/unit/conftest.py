@@ -0,0 +1,29 @@
+import pytest
+
+from backend import main
+from backend.generation import GenerationManager
+from backend.jobs import JobWorker, SQLiteJobQueue
+from backend.service import TripPlan, TripPlanningService
+from backend.storage import MemoryTripStore
+
+
+@pytest.fixture
+def wire_app(monkeypatch):
+    """Point the app's module-level wiring at a fresh service holding trip "t1", and return that service.
+
+    Tests pass only what they need to differ: the store or cache behind the
+    service, the generation manager, or the job worker.
+    """
+
+    def wire(store=None, cache=None, generations=None, job_worker=None):
+        service = TripPlanningService(store if store is not None else MemoryTripStore(), cache=cache)
+        service.add_trip(TripPlan(id="t1"))
+        monkeypatch.setattr(main, "service", service)
+        # Another test's app shutdown leaves the module's manager closed
+        monkeypatch.setattr(main, "generations", generations if generations is not None else GenerationManager())
+        if job_worker is None:
+            job_worker = JobWorker(main.run_job, queue=SQLiteJobQueue(":memory:"))
+        monkeypatch.setattr(main, "job_worker", job_worker)
+        return service
+
+    return wire
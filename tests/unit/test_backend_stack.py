@@ -1,17 +1,101 @@
 import aws_cdk as core
 import aws_cdk.assertions as assertions
+import pytest
 
 from backend.component import Backend
+from frontend.component import Frontend
+from infrastructure.shared import Shared
 
 
-# example tests. To run these tests, uncomment this file along with the example
-# resource in aws_template/aws_template_stack.py
-def test_sqs_queue_created():
+@pytest.fixture(scope="module")
+def stacks():
     app = core.App()
-    stack = Backend(app, "backend")
-    template = assertions.Template.from_stack(stack)
+    shared = Shared(app, "Shared")
+    backend = Backend(app, "Backend", cluster=shared.cluster)
+    frontend = Frontend(app, "Frontend", cluster=shared.cluster, backend_service=backend.backend_service)
+    return assertions.Template.from_stack(backend), assertions.Template.from_stack(frontend)
 
 
-#     template.has_resource_properties("AWS::SQS::Queue", {
-#         "VisibilityTimeout": 300
-#     })
+def _custom_metric_policy(metric_name, service, target_value):
+    return {
+        "PolicyType": "TargetTrackingScaling",
+        "TargetTrackingScalingPolicyConfiguration": assertions.Match.object_like({
+            "TargetValue": target_value,
+            "CustomizedMetricSpecification": assertions.Match.object_like({
+                "Namespace": "TripPlanner",
+                "MetricName": metric_name,
+                "Dimensions": [{"Name": "Service", "Value": service}],
+                "Statistic": "Average",
+            }),
+        }),
+    }
+
+
+def test_backend_scales_on_stream_concurrency(stacks):
+    backend, _ = stacks
+    backend.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 2)
+    backend.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget", {"MinCapacity": 1, "MaxCapacity": 10}
+    )
+    # Targets are per task divided by the two workers that each report
+    backend.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy", _custom_metric_policy("ActiveStreams", "backend", 20)
+    )
+    backend.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy", _custom_metric_policy("BedrockQueueDepth", "backend", 4)
+    )
+    backend.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        _custom_metric_policy("McpSessionUtilization", "flights-mcp", 60),
+    )
+
+
+def test_backend_lets_long_streams_finish(stacks):
+    backend, _ = stacks
+    backend.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::LoadBalancer",
+        {
+            "LoadBalancerAttributes": assertions.Match.array_with(
+                [{"Key": "idle_timeout.timeout_seconds", "Value": "300"}]
+            )
+        },
+    )
+    backend.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::TargetGroup",
+        {
+            "Port": 80,
+            "TargetGroupAttributes": assertions.Match.array_with(
+                [{"Key": "deregistration_delay.timeout_seconds", "Value": "300"}]
+            ),
+        },
+    )
+    backend.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": [
+                assertions.Match.object_like({
+                    "StopTimeout": 120,
+                    "Environment": assertions.Match.array_with([
+                        {"Name": "WEB_CONCURRENCY", "Value": "2"},
+                        {"Name": "KEEPALIVE", "Value": "315"},
+                        {"Name": "GRACEFUL_TIMEOUT", "Value": "110"},
+                    ]),
+                })
+            ]
+        },
+    )
+
+
+def test_frontend_scales_on_request_count(stacks):
+    _, frontend = stacks
+    frontend.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingScalingPolicyConfiguration": assertions.Match.object_like({
+                "TargetValue": 500,
+                "PredefinedMetricSpecification": assertions.Match.object_like({
+                    "PredefinedMetricType": "ALBRequestCountPerTarget",
+                }),
+            })
+        },
+    )
@@ -0,0 +1,55 @@
+import asyncio
+import gzip
+
+import pytest
+
+from backend import compression
+from backend.compression import CompressedText, compress_text, decompress_text
+from backend.service import TripPlan, TripPlanningService
+from backend.storage import MemoryTripStore, SQLiteTripStore
+
+LONG_TEXT = "Stay near the old town, close to transit and markets. " * 40
+
+
+def test_short_text_is_stored_as_is():
+    assert compress_text("Eat tapas") == "Eat tapas"
+
+
+def test_long_text_round_trips_compressed():
+    encoded = compress_text(LONG_TEXT)
+    assert isinstance(encoded, bytes)
+    assert len(encoded) < len(LONG_TEXT) // 4
+    assert decompress_text(encoded) == LONG_TEXT
+
+
+def test_gzip_is_used_without_zstandard(monkeypatch):
+    monkeypatch.setattr(compression, "zstandard", None)
+    encoded = compress_text(LONG_TEXT)
+    assert encoded.startswith(compression.GZIP_MAGIC)
+    assert decompress_text(encoded) == LONG_TEXT
+
+
+def test_compressed_text_decompresses_lazily():
+    value = CompressedText(gzip.compress(LONG_TEXT.encode()))
+    assert value and value._text is None
+    assert str(value) == LONG_TEXT
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def service(request, tmp_path):
+    store = MemoryTripStore() if request.param == "memory" else SQLiteTripStore(str(tmp_path / "trips.db"))
+    service = TripPlanningService(store)
+    service.add_trip(TripPlan(id="t1"))
+    yield service
+    store.close()
+
+
+def test_reasoning_is_stored_apart_from_the_trip(service):
+    asyncio.run(service.save_trip_recommendation("t1", "lodging", LONG_TEXT, reasoning="Think " * 100))
+
+    trip = service.get_trip("t1")
+    assert isinstance(trip["lodging"], CompressedText)
+    assert "lodging_reasoning" not in trip
+    assert service.get_trip_recommendation("t1", "lodging") == LONG_TEXT
+    assert service.get_trip_reasoning("t1", "lodging") == "Think " * 100
+    assert service.get_trip_reasoning("t1", "food") is None
@@ -0,0 +1,80 @@
+import asyncio
+
+from backend.coordination import PeerLocks, WorkerBus
+from backend.generation import GenerationManager
+from backend.service import TripPlan, TripPlanningService
+from backend.storage import MemoryTripStore
+from backend.trip_cache import TripCache
+
+
+def test_trip_writes_invalidate_other_workers_caches(tmp_path):
+    store = MemoryTripStore()
+    # Two workers sharing a store, each with its own cache
+    first = TripPlanningService(store, cache=TripCache(), bus=WorkerBus(str(tmp_path)))
+    second = TripPlanningService(store, cache=TripCache(), bus=WorkerBus(str(tmp_path)))
+
+    async def scenario():
+        first.bus.start()
+        second.bus.start()
+        first.add_trip(TripPlan(id="t1"))
+        # Cached by the second worker before the first one writes
+        assert "food" not in second.get_trip("t1")
+        assert len(second.cache) == 1
+        await first.save_trip_recommendation("t1", "food", "Eat tapas")
+        await asyncio.sleep(0.05)
+        try:
+            return second.get_trip_recommendation("t1", "food")
+        finally:
+            first.bus.close()
+            second.bus.close()
+
+    assert asyncio.run(scenario()) == "Eat tapas"
+
+
+def test_peer_claims_wait_for_the_holder(tmp_path):
+    locks = PeerLocks(str(tmp_path), poll_interval=0.01)
+    events = []
+
+    async def worker(name, delay):
+        await asyncio.sleep(delay)
+        async with locks.claim("t1/food") as contended:
+            events.append((name, contended))
+            await asyncio.sleep(0.05)
+        events.append((name, "released"))
+
+    async def scenario():
+        await asyncio.gather(worker("first", 0), worker("second", 0.01))
+
+    asyncio.run(scenario())
+    assert events == [("first", False), ("first", "released"), ("second", True), ("second", "released")]
+
+
+def test_waiting_worker_serves_the_peers_stored_result(tmp_path):
+    produced = []
+
+    def producer(name):
+        async def produce(cancel_signal):
+            produced.append(name)
+            await asyncio.sleep(0.05)
+            yield name
+
+        return produce
+
+    stored = {}
+
+    async def settle():
+        stored["text"] = "first"
+
+    async def scenario():
+        # Separate managers stand in for separate worker processes
+        first = GenerationManager(peers=PeerLocks(str(tmp_path), poll_interval=0.01))
+        second = GenerationManager(peers=PeerLocks(str(tmp_path), poll_interval=0.01))
+        leader = first.start("t1", "food", producer("first"), stored=lambda: stored.get("text"), settle=settle)
+        await asyncio.sleep(0.01)
+        follower = second.start("t1", "food", producer("second"), stored=lambda: stored.get("text"))
+        await asyncio.gather(leader.task, follower.task)
+        return leader, follower
+
+    leader, follower = asyncio.run(scenario())
+    assert produced == ["first"]
+    assert leader.chunks == ["first"] and follower.chunks == ["first"]
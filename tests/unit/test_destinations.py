@@ -0,0 +1,59 @@
+import datetime
+
+import pytest
+
+from backend.destinations import DestinationIndex, destination_index, trip_facts
+
+
+def test_bundled_index_loads_every_city_with_twelve_months():
+    index = destination_index()
+    assert len(index) >= 40
+    assert index.lookup("  new   york ") is index.lookup("NYC")
+    assert index.lookup("Cancún") is index.lookup("cancun")
+    assert index.lookup("Atlantis") is None
+
+
+def test_climate_is_weighted_by_the_days_in_each_month():
+    index = destination_index()
+    new_york = index.lookup("New York")
+    # Five days in December, two in January
+    climate = index.climate(new_york, datetime.date(2026, 12, 27), datetime.date(2027, 1, 3))
+    assert climate.months == (12, 1)
+    assert climate.high_c == (7 * 5 + 4 * 2) / 7
+    assert climate.season == "winter"
+    assert "freezing nights" in climate.notes
+
+
+def test_seasons_follow_the_hemisphere_and_the_rain_in_the_tropics():
+    index = destination_index()
+    july = (datetime.date(2026, 7, 1), datetime.date(2026, 7, 8))
+    assert index.climate(index.lookup("Sydney"), *july).season == "winter"
+    assert index.climate(index.lookup("Bangkok"), *july).season == "wet season"
+    assert index.climate(index.lookup("Bali"), *july).season == "dry season"
+
+
+def test_budget_facts_are_computed_for_any_destination():
+    facts = trip_facts("Atlantis", "2030-01-01", "2030-01-08", 2000)
+    assert facts.climate is None
+    assert facts.lodging().splitlines() == [
+        "- Duration: 7 nights",
+        "- Lodging budget: $1,000 of $2,000 total (50%), about $143/night",
+    ]
+    assert "about $71/day" in facts.food()
+
+
+def test_known_destinations_add_weather_and_price_levels():
+    facts = trip_facts("Bali", "2030-07-01", "2030-07-11", 1500)
+    lodging = facts.lodging()
+    assert "Weather in Bali in July (dry season)" in lodging
+    assert "mid-range about $110/night; this budget affords budget to mid-range" in lodging
+    assert "this budget is generous" in facts.food()
+
+
+def test_index_rejects_rows_without_twelve_months():
+    row = {
+        "name": "Nowhere", "country": "", "latitude": "0", "aliases": "", "lodging_budget": "1",
+        "lodging_mid": "2", "food_daily": "3", "high_c": "1;2", "low_c": "0;0", "rain_mm": "0;0",
+    }
+    with pytest.raises(ValueError, match="12 high_c values"):
+        DestinationIndex([row])
@@ -0,0 +1,98 @@
+import asyncio
+
+from backend.generation import DisconnectPolicy, GenerationManager
+
+
+def _producer(chunks, interval=0.01, started=None):
+    """Yields chunks until done or cancelled, like the agent does on its cancel signal."""
+
+    async def produce(cancel_signal):
+        if started is not None:
+            started.append(cancel_signal)
+        for chunk in chunks:
+            if cancel_signal.is_set():
+                return
+            await asyncio.sleep(interval)
+            yield chunk
+
+    return produce
+
+
+async def _read(stream, count=None):
+    received = []
+    async for chunk in stream:
+        received.append(chunk)
+        if count is not None and len(received) == count:
+            break
+    return received
+
+
+def test_concurrent_requests_share_one_generation():
+    manager = GenerationManager()
+    started = []
+
+    async def scenario():
+        first = manager.start("t1", "food", _producer(["a", "b", "c"], started=started))
+        await asyncio.sleep(0.015)
+        # A late joiner still gets the chunks produced before it arrived
+        second = manager.start("t1", "food", _producer(["x"], started=started))
+        assert second is first
+        return await asyncio.gather(_read(manager.stream(first)), _read(manager.stream(second)))
+
+    assert asyncio.run(scenario()) == [["a", "b", "c"], ["a", "b", "c"]]
+    assert len(started) == 1
+    assert len(manager) == 0
+
+
+def test_last_client_disconnecting_cancels_the_generation():
+    manager = GenerationManager(cancel_grace=0.5)
+
+    async def scenario():
+        generation = manager.start("t1", "lodging", _producer(["a"] * 100))
+        stream = manager.stream(generation)
+        assert await _read(stream, count=2) == ["a", "a"]
+        await stream.aclose()
+        assert generation.cancel_signal.is_set()
+        await generation.task
+        return generation
+
+    generation = asyncio.run(scenario())
+    assert generation.cancel_reason == "client_disconnect"
+    assert len(generation.chunks) < 100
+
+
+def test_complete_policy_finishes_in_the_background():
+    manager = GenerationManager(disconnect_policy=DisconnectPolicy.COMPLETE)
+
+    async def scenario():
+        generation = manager.start("t1", "travel", _producer(["a"] * 5))
+        stream = manager.stream(generation)
+        await _read(stream, count=1)
+        await stream.aclose()
+        await generation.task
+        return generation
+
+    generation = asyncio.run(scenario())
+    assert not generation.cancel_signal.is_set()
+    assert generation.chunks == ["a"] * 5
+
+
+def test_drain_cancels_generations_past_the_deadline():
+    manager = GenerationManager(cancel_grace=0.05)
+
+    async def ignores_cancel_signal(cancel_signal):
+        yield "a"
+        await asyncio.sleep(60)
+        yield "b"
+
+    async def scenario():
+        quick = manager.start("t1", "food", _producer(["a", "b"]))
+        stuck = manager.start("t2", "food", ignores_cancel_signal)
+        await manager.drain(timeout=0.1)
+        return quick, stuck
+
+    quick, stuck = asyncio.run(scenario())
+    assert quick.chunks == ["a", "b"] and not quick.cancel_signal.is_set()
+    assert stuck.cancel_reason == "shutdown"
+    assert stuck.task.cancelled()
+    assert manager.closing
@@ -0,0 +1,53 @@
+import asyncio
+import socket
+
+import httpx
+from uvicorn import Config
+
+from backend import main
+from backend.workers import TripPlannerServer
+
+CHUNKS = ["Eat ", "tapas ", "in ", "the ", "old ", "town"]
+
+
+def test_streams_cut_off_by_shutdown_finish_in_the_background(monkeypatch, wire_app):
+    service = wire_app()
+
+    def food_producer(id, record, route):
+        async def generate(cancel_signal):
+            for chunk in CHUNKS:
+                if cancel_signal.is_set():
+                    return
+                await asyncio.sleep(0.1)
+                yield chunk
+            await service.save_trip_recommendation(id, "food", "".join(CHUNKS), tier=route.tier.value)
+
+        return generate
+
+    monkeypatch.setattr(main, "food_producer", food_producer)
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    # Streams outlive the graceful timeout, so the server cuts them off before the lifespan drain
+    server = TripPlannerServer(Config(main.app, lifespan="on", log_config=None, timeout_graceful_shutdown=0.2))
+
+    async def scenario():
+        serving = asyncio.create_task(server.serve(sockets=[listener]))
+        while not server.started:
+            await asyncio.sleep(0.01)
+        async with httpx.AsyncClient() as client:
+            async with client.stream("GET", f"http://127.0.0.1:{port}/plan/t1/recommendation/food") as response:
+                chunks = response.aiter_text()
+                await chunks.__anext__()
+                # SIGTERM, in the order uvicorn shuts down
+                server.should_exit = True
+                try:
+                    async for _ in chunks:
+                        pass
+                except httpx.HTTPError:
+                    pass
+        await serving
+
+    asyncio.run(scenario())
+    assert service.get_trip_recommendation("t1", "food") == "".join(CHUNKS)
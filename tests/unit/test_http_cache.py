@@ -0,0 +1,94 @@
+import gzip
+
+import brotli
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+
+LONG_TEXT = "Take the metro between neighbourhoods and walk the old town. " * 40
+
+
+@pytest.fixture
+def client(wire_app):
+    service = wire_app()
+    with TestClient(main.app) as client:
+        yield client, service
+
+
+async def _save(service, _id, recommendation_type, text, reasoning=None):
+    await service.save_trip_recommendation(_id, recommendation_type, text, reasoning=reasoning)
+
+
+def test_finished_recommendation_is_cacheable_and_revalidates(client):
+    client, service = client
+    client.portal.call(_save, service, "t1", "food", "Eat tapas")
+
+    response = client.get("/plan/t1/recommendation/food", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.text == "Eat tapas"
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+
+    revalidated = client.get("/plan/t1/recommendation/food", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+
+def test_large_recommendation_is_compressed(client):
+    client, service = client
+    client.portal.call(_save, service, "t1", "travel", LONG_TEXT)
+
+    response = client.get("/plan/t1/recommendation/travel", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["etag"].endswith('-br"')
+    assert response.text == LONG_TEXT
+
+    raw = client.get("/plan/t1/recommendation/travel", headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+    # An ETag for one encoding validates the others
+    revalidated = client.get(
+        "/plan/t1/recommendation/travel", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_lodging_etag_depends_on_reasoning(client):
+    client, service = client
+    client.portal.call(_save, service, "t1", "lodging", "<response>Hotel</response>", "Because")
+
+    full = client.get("/plan/t1/recommendation/lodging")
+    short = client.get("/plan/t1/recommendation/lodging", params={"include_reasoning": "false"})
+    assert full.text == "<reasoning>Because</reasoning><response>Hotel</response>"
+    assert short.text == "<response>Hotel</response>"
+    assert full.headers["etag"] != short.headers["etag"]
+
+
+def test_plan_etag_changes_when_recommendations_are_added(client):
+    client, service = client
+    first = client.get("/plan/t1")
+    assert first.json()["id"] == "t1"
+    assert first.headers["cache-control"] == "no-cache"
+    assert client.get("/plan/t1", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    client.portal.call(_save, service, "t1", "food", "Eat tapas")
+    second = client.get("/plan/t1", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()["food"] == "Eat tapas"
+    assert "food_etag" not in second.json()
+
+
+def test_plan_etag_ignores_bookkeeping_attributes(client):
+    client, service = client
+    first = client.get("/plan/t1")
+
+    # Job progress is written to the trip but is not part of the plan body
+    service.save_job("t1", "food", {"id": "j1", "state": "running"})
+    again = client.get("/plan/t1", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["etag"] == first.headers["etag"]
+
+
+def test_missing_trip_returns_404(client):
+    client, _ = client
+    assert client.get("/plan/missing/recommendation/food").status_code == 404
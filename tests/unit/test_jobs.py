@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.jobs import FatalJobError, Job, JobWorker, SQLiteJobQueue
+
+
+def test_a_leased_job_is_hidden_until_acked(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"))
+    queue.put(Job("t1", "food"))
+
+    job = queue.receive(visibility_timeout=60)
+    assert (job.trip_id, job.recommendation_type, job.attempts) == ("t1", "food", 1)
+    assert queue.receive(visibility_timeout=60) is None
+
+    queue.ack(job)
+    assert len(queue) == 0
+
+
+def test_jobs_survive_a_restart_and_come_back_when_the_lease_runs_out(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    queue = SQLiteJobQueue(path)
+    queue.put(Job("t1", "lodging", "deep"))
+    stale = queue.receive(visibility_timeout=0.05)
+    queue.close()
+
+    # The worker holding the lease died; the next one gets the job once the lease runs out
+    queue = SQLiteJobQueue(path)
+    time.sleep(0.06)
+    job = queue.receive(visibility_timeout=60)
+    assert (job.id, job.tier, job.attempts) == (stale.id, "deep", 2)
+
+    # Acking the stale delivery leaves the new lease alone
+    queue.ack(stale)
+    assert len(queue) == 1
+    queue.ack(job)
+    assert len(queue) == 0
+
+
+def test_released_jobs_wait_out_their_delay(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"), poll_interval=0.01)
+    queue.put(Job("t1", "travel"))
+    job = queue.receive(visibility_timeout=60)
+    queue.release(job, delay=0.1)
+
+    assert queue.receive(visibility_timeout=60) is None
+    assert queue.receive(visibility_timeout=60, wait=0.5).id == job.id
+
+
+def _worker(tmp_path, handler, **kwargs):
+    failures = []
+
+    async def on_failure(job, error, retry):
+        failures.append((job.attempts, str(error), retry))
+
+    worker = JobWorker(
+        handler,
+        queue=SQLiteJobQueue(str(tmp_path / "jobs.db"), poll_interval=0.01),
+        poll_interval=0.05,
+        retry_delay=0.01,
+        on_failure=on_failure,
+        **kwargs,
+    )
+    return worker, failures
+
+
+async def _until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_failed_jobs_are_retried_until_they_succeed(tmp_path):
+    done = []
+
+    async def handler(job):
+        if job.attempts < 3:
+            raise ConnectionError("model unavailable")
+        done.append(job.id)
+
+    worker, failures = _worker(tmp_path, handler, max_attempts=3)
+
+    async def scenario():
+        worker.start()
+        await worker.enqueue(Job("t1", "food"))
+        await _until(lambda: done)
+        await worker.stop()
+
+    asyncio.run(scenario())
+    assert failures == [(1, "model unavailable", True), (2, "model unavailable", True)]
+    assert len(worker.queue) == 0
+
+
+def test_jobs_fail_after_max_attempts_or_a_fatal_error(tmp_path):
+    async def handler(job):
+        if job.trip_id == "gone":
+            raise FatalJobError("Trip not found")
+        raise ConnectionError("model unavailable")
+
+    worker, failures = _worker(tmp_path, handler, max_attempts=2)
+
+    async def scenario():
+        worker.start()
+        await worker.enqueue(Job("gone", "food"))
+        await worker.enqueue(Job("t1", "food"))
+        await _until(lambda: len(failures) == 3)
+        await worker.stop()
+
+    asyncio.run(scenario())
+    assert sorted(failures) == [
+        (1, "Trip not found", False),
+        (1, "model unavailable", True),
+        (2, "model unavailable", False),
+    ]
+    assert len(worker.queue) == 0
+
+
+def test_stopping_releases_jobs_still_running(tmp_path):
+    started = []
+
+    async def handler(job):
+        started.append(job)
+        await asyncio.sleep(60)
+
+    worker, _ = _worker(tmp_path, handler, concurrency=1, visibility_timeout=60)
+
+    async def scenario():
+        worker.start()
+        await worker.enqueue(Job("t1", "lodging"))
+        await _until(lambda: started)
+        await worker.stop(timeout=0.05)
+
+    asyncio.run(scenario())
+    # Another worker can take it straight away instead of waiting out the lease
+    assert worker.queue.receive(visibility_timeout=60).id == started[0].id
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path, wire_app):
+    worker = JobWorker(
+        main.run_job,
+        queue=SQLiteJobQueue(str(tmp_path / "jobs.db"), poll_interval=0.01),
+        poll_interval=0.05,
+        on_failure=main.job_failed,
+    )
+    service = wire_app(job_worker=worker)
+    # Held until the test lets the job finish, so it stays pending meanwhile
+    release = threading.Event()
+
+    def food_producer(id, record, route):
+        async def generate(cancel_signal):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            yield "Eat "
+            yield "tapas"
+            await service.save_trip_recommendation(id, "food", "Eat tapas", tier=route.tier.value)
+
+        return generate
+
+    monkeypatch.setitem(main.PRODUCERS, "food", food_producer)
+    with TestClient(main.app) as client:
+        yield client, release
+        release.set()
+
+
+def _poll(client, location, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(location).json()
+        if job["state"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def test_enqueued_recommendation_is_generated_and_stored(client):
+    client, release = client
+    response = client.post("/plan/t1/recommendation/food/jobs?tier=fast")
+    assert response.status_code == 202
+    location = response.headers["location"]
+    assert response.json()["state"] == "queued"
+
+    # Asking again while it is pending joins the same job
+    again = client.post("/plan/t1/recommendation/food/jobs?tier=fast")
+    assert again.headers["location"] == location
+
+    release.set()
+    job = _poll(client, location)
+    assert job["state"] == "succeeded"
+    assert job["result"] == "/plan/t1/recommendation/food"
+    assert client.get(job["result"]).text == "Eat tapas"
+    assert "food_job" not in client.get("/plan/t1").json()
+
+    # A stored recommendation needs no job
+    done = client.post("/plan/t1/recommendation/food/jobs")
+    assert done.status_code == 200 and done.json()["state"] == "succeeded"
+
+
+def test_job_for_a_missing_trip_is_not_found(client):
+    client, _ = client
+    assert client.post("/plan/nope/recommendation/food/jobs").status_code == 404
+    assert client.get("/plan/t1/recommendation/food/jobs/unknown").status_code == 404
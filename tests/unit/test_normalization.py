@@ -0,0 +1,83 @@
+import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from backend.normalization import trip_keys
+from backend.service import TripPlan, TripPlanningService
+from backend.storage import MemoryTripStore, SQLiteTripStore
+
+JULY = (datetime.date(2030, 7, 1), datetime.date(2030, 7, 8))
+
+
+@pytest.mark.parametrize(
+    "text, canonical",
+    [
+        ("NYC", "New York"),
+        ("  new   york city ", "New York"),
+        ("Lisboa", "Lisbon"),
+        ("CANCÚN", "Cancun"),
+        ("paris", "Paris"),
+    ],
+)
+def test_names_and_aliases_get_their_canonical_destination(text, canonical):
+    assert trip_keys(text, *JULY, 1000)["destination_canonical"] == canonical
+
+
+@pytest.mark.parametrize("text", ["Paris, Texas", "Sydney, Nova Scotia", "Vancouver, WA", "Mexico", "barcel"])
+def test_places_that_only_start_like_a_known_one_stay_unknown(text):
+    keys = trip_keys(text, *JULY, 1000)
+    assert keys["destination_canonical"] is None
+    # Not Sydney's southern winter, nor any other known city's climate
+    assert keys["season"] == "summer"
+
+
+def test_default_dates_are_computed_per_plan():
+    plan = TripPlan(id="t1")
+    assert plan.from_date == datetime.date.today()
+    assert plan.to_date == plan.from_date + datetime.timedelta(days=7)
+    later = TripPlan(id="t2", from_date="2030-03-01")
+    assert later.to_date == datetime.date(2030, 3, 8)
+
+
+def test_invalid_plans_are_rejected():
+    with pytest.raises(ValidationError):
+        TripPlan(id="t1", from_date="2030-03-08", to_date="2030-03-01")
+    with pytest.raises(ValidationError):
+        TripPlan(id="t1", destination="   ")
+    with pytest.raises(ValidationError):
+        TripPlan(id="t1", budget=-1)
+
+
+def test_derived_keys_are_stored_with_the_trip():
+    service = TripPlanningService(MemoryTripStore())
+    service.add_trip(TripPlan(id="t1", origin="SF", destination="sydney", from_date="2030-07-01",
+                              to_date="2030-07-04", budget=300))
+    trip = service.get_trip("t1")
+    # The plan keeps what was typed, next to the derived keys
+    assert (trip["origin"], trip["destination"]) == ("SF", "sydney")
+    assert {name: trip[name] for name in ("destination_key", "destination_canonical", "duration_nights",
+                                           "duration_bucket", "season", "budget_bucket")} == {
+        "destination_key": "sydney",
+        "destination_canonical": "Sydney",
+        "duration_nights": 3,
+        "duration_bucket": "weekend",
+        "season": "winter",
+        "budget_bucket": "moderate",
+    }
+
+
+def test_unknown_destinations_get_a_calendar_season():
+    keys = trip_keys("Atlantis", datetime.date(2030, 1, 10), datetime.date(2030, 2, 10), 20000)
+    assert keys["season"] == "winter"
+    assert keys["duration_bucket"] == "extended"
+    assert keys["budget_bucket"] == "luxury"
+
+
+def test_unknown_destinations_are_stored_as_typed(tmp_path):
+    store = SQLiteTripStore(str(tmp_path / "trips.db"))
+    service = TripPlanningService(store)
+    service.add_trip(TripPlan(id="t1", destination="Paris, Texas"))
+    trip = service.get_trip("t1")
+    assert (trip["destination"], trip["destination_canonical"]) == ("Paris, Texas", None)
+    store.close()
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.generation import GenerationManager
+from backend.routing import Route, Tier
+from backend.storage import MemoryTripStore
+from backend.trip_cache import TripCache
+
+
+@pytest.fixture
+def client(wire_app):
+    service = wire_app(generations=GenerationManager(cancel_grace=0.05))
+    with TestClient(main.app) as client:
+        yield client, service
+
+
+def _start_food(service, chunks, interval):
+    async def start():
+        async def generate(cancel_signal):
+            for chunk in chunks:
+                await asyncio.sleep(interval)
+                yield chunk
+            await service.save_trip_recommendation("t1", "food", "".join(chunks), tier="fast")
+
+        route = Route(Tier.FAST, None)
+        return main.start_generation("t1", "food", route, generate)
+
+    return start
+
+
+def test_status_reports_each_recommendation_without_reading_it(client):
+    client, service = client
+    client.portal.call(service.save_trip_recommendation, "t1", "lodging", "Stay near the park", None, "deep")
+
+    response = client.get("/plan/t1/status")
+    assert response.status_code == 200
+    recommendations = response.json()["recommendations"]
+    assert recommendations["lodging"] == {
+        "state": "complete",
+        "etag": client.get("/plan/t1/recommendation/lodging").headers["etag"].strip('"'),
+        "size": len("Stay near the park"),
+        "tier": "deep",
+    }
+    assert recommendations["food"] == {"state": "absent"}
+    assert recommendations["travel"] == {"state": "absent"}
+    assert client.get("/plan/nope/status").status_code == 404
+
+
+def test_status_long_poll_returns_when_a_generation_finishes(client):
+    client, service = client
+    client.portal.call(_start_food(service, ["Eat ", "tapas"], interval=0.1))
+
+    pending = client.get("/plan/t1/status")
+    assert pending.json()["recommendations"]["food"]["state"] == "in_progress"
+    etag = pending.headers["etag"]
+
+    # Nothing changes within a short wait
+    unchanged = client.get("/plan/t1/status?wait=0.05", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    started = time.monotonic()
+    changed = client.get("/plan/t1/status?wait=10", headers={"If-None-Match": etag})
+    assert time.monotonic() - started < 5
+    assert changed.status_code == 200
+    food = changed.json()["recommendations"]["food"]
+    assert (food["state"], food["size"], food["tier"]) == ("complete", len("Eat tapas"), "fast")
+
+
+class CountingStore(MemoryTripStore):
+    def __init__(self):
+        super().__init__()
+        self.trip_reads = 0
+
+    def get_trip(self, _id):
+        self.trip_reads += 1
+        return super().get_trip(_id)
+
+
+def test_status_long_poll_reads_the_whole_trip_only_after_a_change(monkeypatch, wire_app):
+    store = CountingStore()
+    # Without a cache every trip read reaches the store
+    service = wire_app(store=store, cache=TripCache(max_bytes=0))
+    monkeypatch.setattr(main, "STATUS_POLL_INTERVAL", 0.02)
+
+    with TestClient(main.app) as client:
+        etag = client.get("/plan/t1/status").headers["etag"]
+        store.trip_reads = 0
+        assert client.get("/plan/t1/status?wait=0.3", headers={"If-None-Match": etag}).status_code == 304
+        assert store.trip_reads == 1
+
+        # Another worker stores a recommendation straight into the shared store
+        store.set_attributes("t1", {"food": "Eat tapas", "food_etag": "abc", "food_size": 9})
+        changed = client.get("/plan/t1/status?wait=5", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.json()["recommendations"]["food"]["state"] == "complete"
@@ -0,0 +1,113 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from strands.models import BedrockModel
+
+from backend.prompts import (
+    CLAUDE_SONNET,
+    DEEPSEEK_R1,
+    LODGING_PROMPT,
+    TRAVEL_PROMPT,
+    TRAVEL_SYSTEM_PROMPT,
+    ModelProfile,
+    PromptTooLong,
+    ToolResultBudget,
+    build_model,
+    estimate_tokens,
+    fit_text,
+    normalize,
+    profile,
+)
+
+
+def _offers(count):
+    return {
+        "request_id": "orq_1",
+        "offers": [
+            {
+                "offer_id": f"off_{index}",
+                "price": {"amount": str(400 + index), "currency": "USD"},
+                "slices": [{"origin": "SFO", "destination": "JFK", "stops": 1, "stops_description": "1 stop",
+                            "connections": [{"airport": "ORD", "duration": "PT1H"}]}],
+            }
+            for index in range(count)
+        ],
+    }
+
+
+def test_templates_are_whitespace_normalized():
+    assert normalize("\n    a\n        b  \n\n\n\n    c\n") == "a\nb\n\nc"
+    assert all(line == line.strip() for line in LODGING_PROMPT.text.splitlines())
+
+
+def test_trip_details_come_after_the_static_instructions():
+    prompt = TRAVEL_PROMPT.render(origin="SFO", destination="Paris", from_date="2030-01-01",
+                                  to_date="2030-01-08", budget=2000)
+    assert "Paris" in prompt
+    lodging = LODGING_PROMPT.render(destination="Paris", from_date="2030-01-01", to_date="2030-01-08", budget=2000,
+                                    facts="- Duration: 7 nights")
+    assert lodging.index("Paris") > lodging.index("Example response structure")
+    assert lodging.index("- Duration: 7 nights") > lodging.index("Paris")
+
+
+def test_small_json_is_only_compacted():
+    text = json.dumps(_offers(2), indent=2)
+    fitted = fit_text(text, 10_000)
+    assert json.loads(fitted) == _offers(2)
+    assert len(fitted) < len(text)
+
+
+def test_large_results_drop_detail_then_offers():
+    fitted = fit_text(json.dumps(_offers(50), indent=2), 600)
+    data = json.loads(fitted)
+    assert estimate_tokens(fitted) <= 600
+    assert "connections" not in data["offers"][0]["slices"][0]
+    assert 0 < len(data["offers"]) < 50
+    assert data["omitted_offers"] == 50 - len(data["offers"])
+
+
+def test_plain_text_is_truncated():
+    fitted = fit_text("x" * 10_000, 100)
+    assert estimate_tokens(fitted) <= 100
+    assert fitted.endswith("characters]")
+
+
+def test_tool_result_hook_rewrites_text_blocks():
+    event = SimpleNamespace(result={
+        "toolUseId": "t1", "status": "success",
+        "content": [{"text": json.dumps(_offers(50), indent=2)}],
+    })
+    ToolResultBudget(500)._after(event)
+    assert estimate_tokens(event.result["content"][0]["text"]) <= 500
+    assert event.result["status"] == "success"
+
+
+def test_prompt_caching_only_for_supported_models():
+    sonnet = build_model(CLAUDE_SONNET)
+    assert isinstance(sonnet, BedrockModel)
+    assert sonnet.get_config().get("cache_config") is not None
+    assert build_model(DEEPSEEK_R1).get_config().get("cache_config") is None
+    # Models are built once and shared
+    assert build_model(CLAUDE_SONNET) is sonnet
+
+
+def test_models_without_system_prompts_get_it_in_the_user_turn():
+    prompt = "Flights from SFO to Paris"
+    assert profile(CLAUDE_SONNET).prompts(TRAVEL_SYSTEM_PROMPT.text, prompt) == (TRAVEL_SYSTEM_PROMPT.text, prompt)
+
+    system, user = profile(DEEPSEEK_R1).prompts(TRAVEL_SYSTEM_PROMPT.text, prompt)
+    assert system is None
+    assert user.startswith(TRAVEL_SYSTEM_PROMPT.text) and user.endswith(prompt)
+
+
+def test_prompts_over_the_input_budget_are_rejected():
+    model = ModelProfile("small", max_input_tokens=800)
+    prompt = "x" * 2600
+    assert model.prompts(None, prompt) == (None, prompt)
+    # With tools, a tool result's worth of the budget stays free
+    with pytest.raises(PromptTooLong):
+        model.prompts(None, prompt, tools=True)
+    with pytest.raises(PromptTooLong):
+        model.prompts("y" * 1000, prompt)
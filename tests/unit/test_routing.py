@@ -0,0 +1,47 @@
+from backend import main
+from backend.prompts import CLAUDE_HAIKU, CLAUDE_SONNET, DEEPSEEK_R1
+from backend.routing import ModelRouter, Tier
+
+
+def test_explicit_tiers_pick_their_models():
+    router = ModelRouter()
+    assert router.route("lodging", Tier.DEEP).model.model_id == DEEPSEEK_R1
+    assert router.route("travel", Tier.DEEP).model.model_id == CLAUDE_SONNET
+    assert router.route("lodging", Tier.FAST).model.model_id == CLAUDE_HAIKU
+
+
+def test_auto_tier_degrades_under_load_with_hysteresis():
+    router = ModelRouter(high_watermark=2, low_watermark=1)
+    assert router.route("food").tier == Tier.DEEP
+
+    with router.track(), router.track():
+        assert router.in_flight == 2
+        assert router.route("food").tier == Tier.FAST
+        with router.track():
+            # Explicit requests are honoured whatever the load
+            assert router.route("food", Tier.DEEP).tier == Tier.DEEP
+
+    with router.track(), router.track():
+        pass
+    assert router.in_flight == 0
+    assert router.route("food").tier == Tier.DEEP
+
+
+def test_auto_tier_stays_fast_until_low_watermark():
+    router = ModelRouter(high_watermark=3, low_watermark=1)
+    with router.track(), router.track():
+        with router.track():
+            assert router.route("travel").tier == Tier.FAST
+        # Between the watermarks the previous decision sticks
+        assert router.route("travel").tier == Tier.FAST
+    assert router.route("travel").tier == Tier.DEEP
+
+
+def test_deep_request_regenerates_fast_recommendation():
+    record = {"food": "Eat tapas", "food_tier": "fast", "lodging": "Stay central"}
+    assert main.has_recommendation(record, "food", Tier.AUTO)
+    assert main.has_recommendation(record, "food", Tier.FAST)
+    assert not main.has_recommendation(record, "food", Tier.DEEP)
+    # Recommendations saved before tiers existed came from the deep models
+    assert main.has_recommendation(record, "lodging", Tier.DEEP)
+    assert not main.has_recommendation(record, "travel", Tier.AUTO)
@@ -0,0 +1,46 @@
+import asyncio
+import io
+import json
+
+from backend.scaling_metrics import ScalingMetricsReporter
+from backend.telemetry import bedrock_queue_depth, instrumented_stream
+
+
+def test_reporter_writes_embedded_metric_format():
+    stream = io.StringIO()
+    reporter = ScalingMetricsReporter("backend", {"ActiveStreams": lambda: 3}, stream=stream)
+    reporter.report()
+
+    record = json.loads(stream.getvalue())
+    directive = record["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Namespace"] == "TripPlanner"
+    assert directive["Dimensions"] == [["Service"]]
+    assert directive["Metrics"] == [{"Name": "ActiveStreams", "Unit": "Count"}]
+    assert record["Service"] == "backend"
+    assert record["ActiveStreams"] == 3
+
+
+def test_bedrock_queue_depth_counts_streams_before_their_first_token():
+    depths = []
+
+    async def events():
+        depths.append(bedrock_queue_depth())
+        yield {"data": "Hello"}
+        depths.append(bedrock_queue_depth())
+
+    async def abandoned():
+        yield {"start": True}
+        raise ConnectionError("throttled")
+
+    async def scenario():
+        async for _ in instrumented_stream(events(), "food", "model"):
+            pass
+        try:
+            async for _ in instrumented_stream(abandoned(), "food", "model"):
+                pass
+        except ConnectionError:
+            pass
+
+    asyncio.run(scenario())
+    assert depths == [1, 0]
+    assert bedrock_queue_depth() == 0
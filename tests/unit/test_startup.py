@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.startup import cold_start_seconds, parse_importtime
+
+# Fresh interpreter plus the app import; about 0.7s on a laptop, over 1.5s with strands and mcp loaded eagerly
+COLD_START_BUDGET = 1.2
+
+ENV = {**os.environ, "TRIP_STORE": "memory"}
+
+
+def test_app_import_defers_agent_dependencies():
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, backend.main; print(' '.join(m for m in ('strands', 'mcp', 'boto3') if m in sys.modules))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=ENV,
+    ).stdout.split()
+    assert loaded == []
+
+
+def test_cold_start_is_within_budget():
+    # The best of a few runs, so a busy machine doesn't fail the build
+    assert min(cold_start_seconds(env=ENV) for _ in range(3)) < COLD_START_BUDGET
+
+
+def test_parse_importtime_skips_the_header():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   backend.lazy\n"
+        "import time:      2000 |       5000 | backend.main\n"
+    )
+    assert parse_importtime(output) == [("backend.lazy", 120, 120), ("backend.main", 2000, 5000)]
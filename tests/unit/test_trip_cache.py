@@ -0,0 +1,97 @@
+from backend.service import TripPlan, TripPlanningService
+from backend.storage import MemoryTripStore
+from backend.trip_cache import CachedTripStore, TripCache, item_size
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingStore(MemoryTripStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads = 0
+
+    def get_trip(self, _id):
+        self.reads += 1
+        return super().get_trip(_id)
+
+
+def _trip(_id, **attributes):
+    return {"id": _id, "origin": "SFO", "from_date": "2030-01-01", "to_date": "2030-01-08",
+            "destination": "Paris", "budget": 1000, **attributes}
+
+
+def test_repeated_reads_hit_the_cache():
+    store = CountingStore()
+    service = TripPlanningService(store, cache=TripCache())
+    service.add_trip(TripPlan(id="t1"))
+
+    for _ in range(4):
+        assert service.get_trip("t1")["id"] == "t1"
+    assert store.reads == 0
+    assert service.cache.stats()["hits"] == 4
+
+
+def test_writes_update_the_cached_trip():
+    store = CountingStore()
+    service = TripPlanningService(store, cache=TripCache())
+    service.add_trip(TripPlan(id="t1"))
+
+    service.set_trip_recommendation("t1", "food", "Eat tapas")
+    assert service.get_trip_recommendation("t1", "food") == "Eat tapas"
+
+    service.add_trip(TripPlan(id="t1", destination="Rome"))
+    trip = service.get_trip("t1")
+    assert trip["destination"] == "Rome"
+    assert "food" not in trip
+    assert store.reads == 0
+
+
+def test_entries_expire():
+    clock = Clock()
+    store = CountingStore()
+    cached = CachedTripStore(store, TripCache(ttl=10, clock=clock))
+    store.put_trip(_trip("t1"))
+
+    cached.get_trip("t1")
+    cached.get_trip("t1")
+    clock.now = 11
+    cached.get_trip("t1")
+    assert store.reads == 2
+    assert cached.cache.evictions == 1
+
+
+def test_cache_is_bounded_by_bytes():
+    large = _trip("large", lodging="x" * 10_000)
+    cache = TripCache(max_bytes=item_size(large) + item_size(_trip("a")) + 10)
+
+    cache.put("a", _trip("a"))
+    cache.put("b", _trip("b"))
+    cache.get("a")
+    # Evicts the least recently used small trip to make room
+    cache.put("large", large)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size <= cache.max_bytes
+
+    cache.put("huge", _trip("huge", lodging="x" * 100_000))
+    assert cache.get("huge") is None
+
+
+def test_reads_racing_a_write_are_not_cached():
+    store = CountingStore()
+    cache = TripCache()
+    cached = CachedTripStore(store, cache)
+    store.put_trip(_trip("t1"))
+
+    generation = cache.generation
+    stale = store.get_trip("t1")
+    cached.set_attributes("t1", {"food": "Eat tapas"})
+    cache.put("t1", stale, generation)
+
+    assert cached.get_trip("t1")["food"] == "Eat tapas"
@@ -0,0 +1,74 @@
+import pytest
+from pydantic import ValidationError
+
+from backend.service import TripPlan, TripPlanningService
+from backend.storage import MemoryTripStore, SQLiteTripStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def service(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryTripStore()
+    else:
+        store = SQLiteTripStore(str(tmp_path / "trips.db"))
+    yield TripPlanningService(store)
+    store.close()
+
+
+def test_add_and_get_trip(service):
+    service.add_trip(TripPlan(id="t1", destination="Paris", budget=2500))
+
+    trip = service.get_trip("t1")
+    assert trip["destination"] == "Paris"
+    assert trip["budget"] == 2500
+    assert isinstance(trip["from_date"], str)
+    assert service.get_trip("missing") is None
+
+
+def test_recommendations_round_trip(service):
+    service.add_trip(TripPlan(id="t1"))
+    assert service.get_trip_recommendation("t1", "food") is None
+
+    service.set_trip_recommendation("t1", "food", "Eat tapas")
+    assert service.get_trip_recommendation("t1", "food") == "Eat tapas"
+    assert service.get_trip("t1")["food"] == "Eat tapas"
+
+
+def test_recommendation_for_missing_trip_is_ignored(service):
+    service.set_trip_recommendation("missing", "food", "Eat tapas")
+    assert service.get_trip("missing") is None
+
+
+def test_replacing_a_trip_drops_its_recommendations(service):
+    service.add_trip(TripPlan(id="t1", destination="Paris"))
+    service.set_trip_recommendation("t1", "lodging", "Stay in the Marais")
+
+    service.add_trip(TripPlan(id="t1", destination="Rome"))
+    assert service.get_trip("t1")["destination"] == "Rome"
+    assert service.get_trip_recommendation("t1", "lodging") is None
+
+
+def test_replacing_a_trip_drops_its_details(service):
+    service.add_trip(TripPlan(id="t1"))
+    service.store.set_detail("t1", "lodging_reasoning", "Close to the museums")
+
+    service.add_trip(TripPlan(id="t1"))
+    assert service.get_trip_reasoning("t1", "lodging") is None
+
+
+def test_trip_ids_cannot_name_a_detail():
+    with pytest.raises(ValidationError):
+        TripPlan(id="t1#lodging_reasoning")
+
+
+def test_sqlite_store_uses_wal(tmp_path):
+    path = str(tmp_path / "trips.db")
+    store = SQLiteTripStore(path)
+    store.put_trip({"id": "t1", "origin": "SFO", "from_date": "2030-01-01",
+                    "to_date": "2030-01-08", "destination": "Paris", "budget": 1000})
+    store.close()
+
+    reopened = SQLiteTripStore(path)
+    assert reopened._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert reopened.get_trip("t1")["destination"] == "Paris"
+    reopened.close()
@@ -0,0 +1,148 @@
+import asyncio
+
+from backend.persistence import Checkpointer, WriteBehindQueue
+from backend.service import TripPlan, TripPlanningService
+from backend.storage import MemoryTripStore
+
+
+class RecordingStore(MemoryTripStore):
+    def __init__(self, failures: int = 0) -> None:
+        super().__init__()
+        self.writes = []
+        self.failures = failures
+
+    def set_attributes(self, _id, attributes):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("store unavailable")
+        self.writes.append((_id, dict(attributes)))
+        return super().set_attributes(_id, attributes)
+
+
+def _service(store, **kwargs):
+    service = TripPlanningService(store)
+    # Flushes go through the service's cached store
+    service.writer = WriteBehindQueue(service.store, **kwargs)
+    service.add_trip(TripPlan(id="t1"))
+    return service
+
+
+def test_writes_for_a_trip_are_coalesced():
+    store = RecordingStore()
+    service = _service(store, flush_interval=0.05)
+
+    async def scenario():
+        service.writer.start()
+        await asyncio.gather(
+            service.save_trip_recommendation("t1", "lodging", "hotel"),
+            service.save_trip_recommendation("t1", "food", "tapas"),
+            service.save_trip_recommendation("t1", "travel", "train"),
+        )
+        # Visible to readers before the flush lands
+        assert service.get_trip_recommendation("t1", "food") == "tapas"
+        await service.writer.drain()
+
+    asyncio.run(scenario())
+    assert len(store.writes) == 1
+    _id, attributes = store.writes[0]
+    assert {name: attributes[name] for name in ("lodging", "food", "travel")} == {
+        "lodging": "hotel", "food": "tapas", "travel": "train"
+    }
+    assert store.get_trip("t1")["travel"] == "train"
+
+
+def test_failed_writes_are_retried():
+    store = RecordingStore(failures=2)
+    service = _service(store, flush_interval=0, retry_delay=0.01)
+
+    async def scenario():
+        service.writer.start()
+        await service.save_trip_recommendation("t1", "food", "tapas")
+        await service.writer.drain(timeout=5)
+
+    asyncio.run(scenario())
+    assert store.get_trip("t1")["food"] == "tapas"
+
+
+def test_writes_are_dropped_after_max_attempts():
+    store = RecordingStore(failures=10)
+    service = _service(store, flush_interval=0, retry_delay=0.001, max_attempts=3)
+
+    async def scenario():
+        service.writer.start()
+        await service.save_trip_recommendation("t1", "food", "tapas")
+        await service.writer.drain(timeout=5)
+
+    asyncio.run(scenario())
+    assert store.failures == 7
+    assert "food" not in store.get_trip("t1")
+
+
+def test_put_waits_when_buffer_is_full():
+    store = MemoryTripStore()
+    writer = WriteBehindQueue(store, max_pending=1, flush_interval=0.05)
+    for _id in ("t1", "t2"):
+        store.put_trip({"id": _id, "origin": "SFO", "from_date": "2030-01-01",
+                        "to_date": "2030-01-08", "destination": "Paris", "budget": 1000})
+
+    async def scenario():
+        writer.start()
+        await writer.put("t1", {"food": "tapas"})
+        second = asyncio.create_task(writer.put("t2", {"food": "sushi"}))
+        await asyncio.sleep(0.01)
+        assert not second.done()
+        await asyncio.wait_for(second, 1)
+        await writer.drain()
+
+    asyncio.run(scenario())
+    assert store.get_trip("t2")["food"] == "sushi"
+
+
+def test_put_writes_through_without_a_running_flusher():
+    store = RecordingStore()
+    service = _service(store)
+
+    asyncio.run(service.save_trip_recommendation("t1", "food", "tapas"))
+    assert [(_id, attributes["food"]) for _id, attributes in store.writes] == [("t1", "tapas")]
+
+
+def test_checkpoints_are_rate_limited_and_coalesced_per_trip():
+    store = RecordingStore()
+    service = _service(store, flush_interval=0.05)
+    saved = []
+
+    async def save(text):
+        saved.append(text)
+        await service.checkpoint_recommendation("t1", "food", text)
+
+    async def scenario():
+        service.writer.start()
+        checkpoints = Checkpointer(save, interval=0.02)
+        text = ""
+        for word in ["Eat ", "tapas ", "and ", "paella"]:
+            text += word
+            await checkpoints.update(text)
+            await asyncio.sleep(0.015)
+        # An interrupted stream saves whatever it had, once
+        await checkpoints.flush(text)
+        await checkpoints.flush(text)
+        await service.writer.drain()
+
+    asyncio.run(scenario())
+    assert 1 < len(saved) < 5
+    assert saved[-1] == "Eat tapas and paella"
+    assert service.get_recommendation_checkpoint("t1", "food") == "Eat tapas and paella"
+    # Details only, so the trip itself still has no food recommendation
+    assert "food" not in store.get_trip("t1")
+
+
+def test_finished_recommendation_clears_its_checkpoint():
+    service = _service(RecordingStore())
+
+    async def scenario():
+        await service.checkpoint_recommendation("t1", "travel", "Fly to")
+        assert service.get_recommendation_checkpoint("t1", "travel") == "Fly to"
+        await service.save_trip_recommendation("t1", "travel", "Fly to Paris")
+
+    asyncio.run(scenario())
+    assert service.get_recommendation_checkpoint("t1", "travel") is None